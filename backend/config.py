@@ -40,21 +40,212 @@ setup_gcp_credentials()
 
 
 
+# LLM backend: "gemini", or "fake" for the deterministic in-process stand-in
+# (services/fake_llm.py) used for load and latency testing without a Gemini key
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY", "lognormal:800,0.6")  # see services/fake_llm.py
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "0"))
+
 # Gemini API configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
+if LLM_BACKEND == "gemini" and not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable is not set")
 
 # Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-1.5-pro', 
-    generation_config=genai.types.GenerationConfig(
-        temperature=0.2,
-        max_output_tokens=2048,
-        top_k=40,
-        top_p=0.8,
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "max_output_tokens": 2048,
+    "top_k": 40,
+    "top_p": 0.8,
+}
+# Model tiers: cheap, fast "flash" for short extraction-style tasks, "pro" for long-form writing
+GEMINI_MODEL_TIERS = {
+    "flash": os.getenv("GEMINI_FLASH_MODEL", "gemini-1.5-flash"),
+    "pro": os.getenv("GEMINI_PRO_MODEL", "gemini-1.5-pro"),
+}
+GEMINI_DEFAULT_TIER = "pro"
+GEMINI_MODEL_NAME = GEMINI_MODEL_TIERS[GEMINI_DEFAULT_TIER]
+# USD per million tokens (input, output, cached input) for cost reporting; <=128k-token prompt pricing
+GEMINI_TIER_PRICES = {
+    "flash": (0.075, 0.30, 0.01875),
+    "pro": (1.25, 5.00, 0.3125),
+}
+# Gateway route -> model tier and output budget (services/llm_gateway.py). Override per route
+# with e.g. LLM_ROUTING="match_explanation=pro:512,cover_letter=flash:1024"
+LLM_ROUTING = {
+    "skill_extraction": {"tier": "flash", "max_output_tokens": 512},
+    "match_explanation": {"tier": "flash", "max_output_tokens": 512},
+    "resume_analysis": {"tier": "pro", "max_output_tokens": 2048},
+    # All three analysis sections from one schema-constrained call (RESUME_ANALYSIS_MODE="structured")
+    "resume_analysis_structured": {"tier": "pro", "max_output_tokens": 6144},
+    "cover_letter": {"tier": "pro", "max_output_tokens": 1024},
+    "enhance_resume": {"tier": "pro", "max_output_tokens": 2048},
+}
+for _route, _, _spec in (entry.partition("=") for entry in os.getenv("LLM_ROUTING", "").split(",") if "=" in entry):
+    _tier, _, _tokens = _spec.partition(":")
+    LLM_ROUTING[_route.strip()] = {
+        "tier": _tier.strip(),
+        "max_output_tokens": int(_tokens) if _tokens else GEMINI_GENERATION_CONFIG["max_output_tokens"]
+    }
+for _route, _routing in LLM_ROUTING.items():
+    if _routing["tier"] not in GEMINI_MODEL_TIERS:
+        raise ValueError(f"Unknown model tier {_routing['tier']!r} for LLM route {_route}")
+
+if LLM_BACKEND == "fake":
+    from services.fake_llm import FakeGenerativeModel
+    models = {
+        tier: FakeGenerativeModel(
+            latency=LLM_FAKE_LATENCY, error_rate=LLM_FAKE_ERROR_RATE, seed=LLM_FAKE_SEED, model_name=model_name
+        )
+        for tier, model_name in GEMINI_MODEL_TIERS.items()
+    }
+else:
+    genai.configure(api_key=GEMINI_API_KEY)
+    models = {
+        tier: genai.GenerativeModel(model_name,
+            generation_config=genai.types.GenerationConfig(**GEMINI_GENERATION_CONFIG)
+        )
+        for tier, model_name in GEMINI_MODEL_TIERS.items()
+    }
+# Default model for callers outside the routing table
+model = models[GEMINI_DEFAULT_TIER]
+
+# Context caching of the resume per (resume version, model), see services/context_cache.py.
+# "off" or "local" (in-process stand-in for offline testing).
+LLM_CONTEXT_CACHE_MODE = os.getenv("LLM_CONTEXT_CACHE_MODE", "off")
+# Tier whose model serves calls with a cached resume
+LLM_CONTEXT_CACHE_TIER = os.getenv("LLM_CONTEXT_CACHE_TIER", "pro")
+# Smallest context worth caching, in estimated tokens
+LLM_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "0"))
+LLM_CONTEXT_CACHE_TTL_S = int(os.getenv("LLM_CONTEXT_CACHE_TTL_S", "1800"))  # idle lifetime, extended on use
+
+# Resume analysis: "structured" asks for all sections in one JSON call (falls back to
+# per-section calls on failure); "sections" always makes one call per section
+RESUME_ANALYSIS_MODE = os.getenv("RESUME_ANALYSIS_MODE", "structured")
+
+# Hybrid (lexical + semantic) job search tuning
+HYBRID_SEARCH_CANDIDATES = int(os.getenv("HYBRID_SEARCH_CANDIDATES", "100"))  # results pulled from each retriever
+HYBRID_SEARCH_BUDGET_MS = int(os.getenv("HYBRID_SEARCH_BUDGET_MS", "400"))  # max extra latency for the semantic leg
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))  # reciprocal rank fusion damping constant
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))  # seconds
+
+# Match explanation fan-out
+EXPLANATION_CONCURRENCY = int(os.getenv("EXPLANATION_CONCURRENCY", "5"))  # parallel Gemini calls per batch
+EXPLANATION_TIMEOUT_S = float(os.getenv("EXPLANATION_TIMEOUT_S", "15"))  # per-explanation deadline
+COVER_LETTER_BATCH_CONCURRENCY = int(os.getenv("COVER_LETTER_BATCH_CONCURRENCY", "4"))  # letters generated at once per batch
+MATCH_EXPLANATION_TTL_S = int(os.getenv("MATCH_EXPLANATION_TTL_S", str(7 * 24 * 3600)))  # cached explanation lifetime
+
+# LLM gateway (services/llm_gateway.py): every Gemini call goes through these limits
+LLM_GLOBAL_CONCURRENCY = int(os.getenv("LLM_GLOBAL_CONCURRENCY", "16"))  # in-flight calls per worker
+LLM_ROUTE_CONCURRENCY = int(os.getenv("LLM_ROUTE_CONCURRENCY", "8"))  # default per-route limit
+# Per-route overrides, e.g. "match_explanation=5,cover_letter=4"
+LLM_ROUTE_LIMITS = {
+    route.strip(): int(limit)
+    for route, _, limit in (
+        entry.partition("=") for entry in os.getenv("LLM_ROUTE_LIMITS", "").split(",") if "=" in entry
     )
-)
+}
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))  # default deadline per call, retries included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures that open the circuit
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))  # open time before a trial call
+
+# Per-user LLM usage accounting and budgets (services/llm_usage.py). Budgets count prompt +
+# output tokens per user per UTC day; 0 means unlimited.
+LLM_USER_DAILY_TOKEN_BUDGET = int(os.getenv("LLM_USER_DAILY_TOKEN_BUDGET", "1000000"))
+# Per-endpoint budgets per user, e.g. "resume_analysis=200000,cover_letter=100000"
+LLM_ENDPOINT_DAILY_TOKEN_BUDGETS = {
+    endpoint.strip(): int(budget)
+    for endpoint, _, budget in (
+        entry.partition("=") for entry in os.getenv("LLM_ENDPOINT_DAILY_TOKEN_BUDGETS", "").split(",") if "=" in entry
+    )
+}
+# Usage is recorded per LLM_ROUTING route; routes listed here count toward another endpoint's budget
+LLM_BUDGET_ENDPOINTS = {"resume_analysis_structured": "resume_analysis"}
+LLM_USER_CONCURRENCY = int(os.getenv("LLM_USER_CONCURRENCY", "4"))  # in-flight calls per user per worker; more queue
+LLM_USAGE_FLUSH_S = float(os.getenv("LLM_USAGE_FLUSH_S", "5"))  # buffered usage is written to Mongo this often
+LLM_USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "90"))
+
+# LLM response cache: endpoints listed here reuse responses for identical prompts
+LLM_CACHE_ENDPOINTS = {
+    endpoint.strip()
+    for endpoint in os.getenv("LLM_CACHE_ENDPOINTS", "cover_letter,enhance_resume,resume_analysis,match_explanation").split(",")
+    if endpoint.strip()
+}
+LLM_CACHE_TTL_S = int(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))  # entries kept in-process per worker
+
+# Resume digest (services/resume_digest.py): token budget for the resume text sent in prompts
+RESUME_DIGEST_MAX_TOKENS = int(os.getenv("RESUME_DIGEST_MAX_TOKENS", "1500"))
+
+# Resume skill extraction (services/skill_extraction.py): taxonomy first, Gemini only when needed.
+# Gemini is awaited at upload when fewer skills than this are found locally...
+SKILL_EXTRACTION_MIN_LOCAL_SKILLS = int(os.getenv("SKILL_EXTRACTION_MIN_LOCAL_SKILLS", "8"))
+# ...or when less than this share of the resume's own skills section is in the taxonomy
+SKILL_EXTRACTION_MIN_COVERAGE = float(os.getenv("SKILL_EXTRACTION_MIN_COVERAGE", "0.5"))
+# "background" queues a Gemini pass that adds skills the taxonomy missed; "off" keeps the local list
+SKILL_ENRICHMENT_MODE = os.getenv("SKILL_ENRICHMENT_MODE", "background")
+
+# Background task queue (services/task_queue.py) for long-running AI endpoints.
+# Workers run inside the API process, so on Cloud Run this needs CPU allocated outside requests.
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))  # concurrent tasks per API process
+TASK_LEASE_S = float(os.getenv("TASK_LEASE_S", "120"))  # a task is reclaimed if its worker stops renewing this
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_POLL_INTERVAL_S = float(os.getenv("TASK_POLL_INTERVAL_S", "1.0"))
+TASK_TTL_S = int(os.getenv("TASK_TTL_S", str(24 * 3600)))  # finished tasks (and their results) are kept this long
+
+# Vector search re-ranking weights (features are scaled to [0, 1]; weights should sum to 1)
+RERANK_WEIGHT_SIMILARITY = float(os.getenv("RERANK_WEIGHT_SIMILARITY", "0.6"))
+RERANK_WEIGHT_SKILLS = float(os.getenv("RERANK_WEIGHT_SKILLS", "0.25"))
+RERANK_WEIGHT_RECENCY = float(os.getenv("RERANK_WEIGHT_RECENCY", "0.1"))
+RERANK_WEIGHT_LOCATION = float(os.getenv("RERANK_WEIGHT_LOCATION", "0.05"))
+RERANK_RECENCY_HALF_LIFE_DAYS = float(os.getenv("RERANK_RECENCY_HALF_LIFE_DAYS", "14"))
+
+# IVF-style coarse filter: probe the N nearest job clusters in vector search (0 = search all jobs)
+VECTOR_SEARCH_NPROBE = int(os.getenv("VECTOR_SEARCH_NPROBE", "0"))
+
+# Memory-mapped job embedding matrix shared by all workers (written by scripts/refresh_job_vectors.py)
+JOB_VECTOR_STORE_DIR = os.getenv("JOB_VECTOR_STORE_DIR", "/tmp/jobassist/job_vectors")
+
+async def _ensure_ttl_index(collection, field: str, expire_after_seconds: int):
+    """Create a TTL index on `field`, or change its expiry in place when the configured TTL changed."""
+    existing = (await collection.index_information()).get(f"{field}_1")
+    if existing is None:
+        await collection.create_index(field, expireAfterSeconds=expire_after_seconds)
+    elif existing.get("expireAfterSeconds") != expire_after_seconds:
+        # create_index would raise IndexOptionsConflict for the same key with a new TTL
+        await collection.database.command(
+            "collMod", collection.name,
+            index={"keyPattern": {field: 1}, "expireAfterSeconds": expire_after_seconds}
+        )
+
+
+async def ensure_indexes(db):
+    """Create the app's indexes; run once at startup rather than on every get_database call."""
+    # Indexes for job search
+    await db.jobs.create_index([("title", "text"), ("description", "text"), ("requirements", "text")])
+    await db.jobs.create_index("location")
+    await db.jobs.create_index("company")
+    await db.jobs.create_index("postedDate")
+
+    # Cached match explanations and LLM responses expire on their own
+    await _ensure_ttl_index(db.match_explanations, "created_at", MATCH_EXPLANATION_TTL_S)
+    await _ensure_ttl_index(db.llm_cache, "created_at", LLM_CACHE_TTL_S)
+
+    # Task queue: claim order, one active task per dedupe key, finished tasks expire
+    await db.tasks.create_index([("status", 1), ("available_at", 1)])
+    await db.tasks.create_index([("status", 1), ("lease_expires_at", 1)])
+    await db.tasks.create_index(
+        "dedupe_key", unique=True, partialFilterExpression={"active": True}
+    )
+    await _ensure_ttl_index(db.tasks, "finished_at", TASK_TTL_S)
+
+    # LLM usage rollups: one document per (user, endpoint, day)
+    await db.llm_usage.create_index([("user_email", 1), ("day", 1)])
+    await _ensure_ttl_index(db.llm_usage, "created_at", LLM_USAGE_RETENTION_DAYS * 24 * 3600)
+
 
 async def get_database():
     try:
@@ -68,12 +259,6 @@ async def get_database():
         await client.admin.command('ping')
         print("Successfully connected to MongoDB")
         
-        # Create indexes for job search
-        await db.jobs.create_index([("title", "text"), ("description", "text"), ("requirements", "text")])
-        await db.jobs.create_index("location")
-        await db.jobs.create_index("company")
-        await db.jobs.create_index("postedDate")
-        
         return db
     except ConnectionFailure as e:
         print(f"Error connecting to MongoDB: {str(e)}")
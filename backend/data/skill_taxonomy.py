@@ -0,0 +1,140 @@
+"""Canonical skill taxonomy used to match resumes and jobs by skill ID"""
+
+# Bump when entries are added or aliases change so stored skill_ids can be backfilled
+TAXONOMY_VERSION = 2
+
+# IDs are persisted on resumes and jobs: never renumber or reuse an ID, only append.
+SKILLS = [
+    # Programming languages
+    {"id": 1, "name": "Python", "aliases": ["python3", "python 3", "py"]},
+    {"id": 2, "name": "Java", "aliases": ["java 8", "java 11", "java 17", "core java"]},
+    {"id": 3, "name": "JavaScript", "aliases": ["javascript", "js", "ecmascript", "es6"]},
+    {"id": 4, "name": "TypeScript", "aliases": ["ts"]},
+    {"id": 5, "name": "C++", "aliases": ["cpp", "c plus plus"]},
+    {"id": 6, "name": "C#", "aliases": ["c sharp", "csharp"]},
+    {"id": 7, "name": "Go", "aliases": ["golang"]},
+    {"id": 8, "name": "Rust", "aliases": []},
+    {"id": 9, "name": "Scala", "aliases": []},
+    {"id": 10, "name": "R", "aliases": ["r programming", "rstudio"]},
+    {"id": 11, "name": "SQL", "aliases": ["structured query language", "t-sql", "tsql", "pl/sql", "plsql", "ansi sql"]},
+    {"id": 12, "name": "Bash", "aliases": ["shell scripting", "shell", "bash scripting", "unix shell"]},
+    {"id": 13, "name": "Kotlin", "aliases": []},
+    {"id": 14, "name": "Swift", "aliases": []},
+    {"id": 15, "name": "Ruby", "aliases": []},
+    {"id": 16, "name": "PHP", "aliases": []},
+    {"id": 17, "name": "MATLAB", "aliases": []},
+    {"id": 18, "name": "Julia", "aliases": []},
+
+    # Web and backend frameworks
+    {"id": 30, "name": "React", "aliases": ["react.js", "reactjs", "react js"]},
+    {"id": 31, "name": "Angular", "aliases": ["angularjs", "angular.js"]},
+    {"id": 32, "name": "Vue", "aliases": ["vue.js", "vuejs"]},
+    {"id": 33, "name": "Node.js", "aliases": ["node", "nodejs", "node js"]},
+    {"id": 34, "name": "Django", "aliases": []},
+    {"id": 35, "name": "Flask", "aliases": []},
+    {"id": 36, "name": "FastAPI", "aliases": ["fast api"]},
+    {"id": 37, "name": "Spring", "aliases": ["spring boot", "springboot", "spring framework"]},
+    {"id": 38, "name": "HTML", "aliases": ["html5"]},
+    {"id": 39, "name": "CSS", "aliases": ["css3", "sass", "scss"]},
+    {"id": 40, "name": "REST APIs", "aliases": ["rest", "restful", "rest api", "restful apis", "restful api"]},
+    {"id": 41, "name": "GraphQL", "aliases": []},
+    {"id": 42, "name": "Express", "aliases": ["express.js", "expressjs"]},
+
+    # Data stores
+    {"id": 60, "name": "PostgreSQL", "aliases": ["postgres", "postgresql", "psql"]},
+    {"id": 61, "name": "MySQL", "aliases": []},
+    {"id": 62, "name": "MongoDB", "aliases": ["mongo", "mongo db"]},
+    {"id": 63, "name": "Redis", "aliases": []},
+    {"id": 64, "name": "Elasticsearch", "aliases": ["elastic search", "elk", "opensearch"]},
+    {"id": 65, "name": "Cassandra", "aliases": ["apache cassandra"]},
+    {"id": 66, "name": "Snowflake", "aliases": []},
+    {"id": 67, "name": "BigQuery", "aliases": ["big query", "google bigquery"]},
+    {"id": 68, "name": "Redshift", "aliases": ["amazon redshift", "aws redshift"]},
+    {"id": 69, "name": "DynamoDB", "aliases": ["dynamo db", "amazon dynamodb"]},
+    {"id": 70, "name": "NoSQL", "aliases": ["no sql", "nosql databases"]},
+    {"id": 71, "name": "Databricks", "aliases": []},
+    {"id": 72, "name": "Oracle Database", "aliases": ["oracle", "oracle db"]},
+    {"id": 73, "name": "SQL Server", "aliases": ["mssql", "ms sql", "microsoft sql server"]},
+
+    # Cloud and infrastructure
+    {"id": 90, "name": "AWS", "aliases": ["amazon web services", "aws cloud"]},
+    {"id": 91, "name": "Azure", "aliases": ["microsoft azure", "azure cloud"]},
+    {"id": 92, "name": "Google Cloud", "aliases": ["gcp", "google cloud platform"]},
+    {"id": 93, "name": "Docker", "aliases": ["containers", "containerization"]},
+    {"id": 94, "name": "Kubernetes", "aliases": ["k8s", "eks", "gke", "aks", "openshift"]},
+    {"id": 95, "name": "Terraform", "aliases": ["infrastructure as code", "iac"]},
+    {"id": 96, "name": "CI/CD", "aliases": ["ci cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"]},
+    {"id": 97, "name": "Jenkins", "aliases": []},
+    {"id": 98, "name": "GitHub Actions", "aliases": []},
+    {"id": 99, "name": "Git", "aliases": ["github", "gitlab", "version control", "bitbucket"]},
+    {"id": 100, "name": "Linux", "aliases": ["unix"]},
+    {"id": 101, "name": "Ansible", "aliases": []},
+    {"id": 102, "name": "Microservices", "aliases": ["microservice architecture", "micro services"]},
+    {"id": 103, "name": "Serverless", "aliases": ["aws lambda", "lambda", "cloud functions"]},
+
+    # Data engineering
+    {"id": 120, "name": "Apache Spark", "aliases": ["spark", "pyspark", "spark sql"]},
+    {"id": 121, "name": "Apache Kafka", "aliases": ["kafka"]},
+    {"id": 122, "name": "Apache Airflow", "aliases": ["airflow"]},
+    {"id": 123, "name": "Hadoop", "aliases": ["apache hadoop", "hdfs", "mapreduce", "hive"]},
+    {"id": 124, "name": "ETL", "aliases": ["elt", "etl pipelines", "data pipelines", "data pipeline"]},
+    {"id": 125, "name": "dbt", "aliases": ["data build tool"]},
+    {"id": 126, "name": "Data Warehousing", "aliases": ["data warehouse", "data warehouses", "dwh"]},
+    {"id": 127, "name": "Data Modeling", "aliases": ["data modelling", "dimensional modeling"]},
+    {"id": 128, "name": "Apache Flink", "aliases": ["flink"]},
+
+    # Data science and machine learning
+    {"id": 150, "name": "Machine Learning", "aliases": ["ml", "machine-learning"]},
+    {"id": 151, "name": "Deep Learning", "aliases": ["dl", "neural networks", "neural network"]},
+    {"id": 152, "name": "Natural Language Processing", "aliases": ["nlp", "text mining"]},
+    {"id": 153, "name": "Computer Vision", "aliases": ["cv", "image processing"]},
+    {"id": 154, "name": "TensorFlow", "aliases": ["tensor flow", "tf", "keras"]},
+    {"id": 155, "name": "PyTorch", "aliases": ["torch"]},
+    {"id": 156, "name": "scikit-learn", "aliases": ["sklearn", "scikit learn"]},
+    {"id": 157, "name": "Pandas", "aliases": []},
+    {"id": 158, "name": "NumPy", "aliases": []},
+    {"id": 159, "name": "Statistics", "aliases": ["statistical analysis", "statistical modeling", "statistical modelling"]},
+    {"id": 160, "name": "Data Analysis", "aliases": ["data analytics", "analytics"]},
+    {"id": 161, "name": "Data Visualization", "aliases": ["data visualisation", "dataviz"]},
+    {"id": 162, "name": "Tableau", "aliases": []},
+    {"id": 163, "name": "Power BI", "aliases": ["powerbi"]},
+    {"id": 164, "name": "Large Language Models", "aliases": ["llm", "llms", "generative ai", "genai", "gen ai"]},
+    {"id": 165, "name": "MLOps", "aliases": ["ml ops", "model deployment"]},
+    {"id": 166, "name": "A/B Testing", "aliases": ["ab testing", "a/b tests", "experimentation"]},
+    {"id": 167, "name": "Time Series Analysis", "aliases": ["time series", "forecasting"]},
+    {"id": 168, "name": "Recommender Systems", "aliases": ["recommendation systems", "recommendation engines"]},
+    {"id": 169, "name": "Hugging Face", "aliases": ["huggingface", "transformers"]},
+    {"id": 170, "name": "Excel", "aliases": ["microsoft excel", "ms excel", "spreadsheets"]},
+    {"id": 171, "name": "Vertex AI", "aliases": []},
+    {"id": 172, "name": "SageMaker", "aliases": ["amazon sagemaker", "aws sagemaker"]},
+    {"id": 173, "name": "XGBoost", "aliases": ["lightgbm", "gradient boosting"]},
+    {"id": 174, "name": "Reinforcement Learning", "aliases": ["rl"]},
+    {"id": 175, "name": "MLflow", "aliases": ["ml flow"]},
+
+    # Practices and soft skills
+    {"id": 200, "name": "Agile", "aliases": ["agile methodologies", "agile methodology", "kanban"]},
+    {"id": 201, "name": "Scrum", "aliases": []},
+    {"id": 202, "name": "Communication", "aliases": ["communication skills", "verbal communication", "written communication"]},
+    {"id": 203, "name": "Leadership", "aliases": ["team leadership", "technical leadership"]},
+    {"id": 204, "name": "Teamwork", "aliases": ["collaboration", "team player", "cross-functional collaboration"]},
+    {"id": 205, "name": "Problem Solving", "aliases": ["problem-solving", "analytical skills", "critical thinking"]},
+    {"id": 206, "name": "Project Management", "aliases": ["program management"]},
+    {"id": 207, "name": "Time Management", "aliases": []},
+    {"id": 208, "name": "Mentoring", "aliases": ["coaching"]},
+    {"id": 209, "name": "Stakeholder Management", "aliases": ["stakeholder communication"]},
+    {"id": 210, "name": "Unit Testing", "aliases": ["testing", "pytest", "junit", "test automation", "tdd"]},
+    {"id": 211, "name": "System Design", "aliases": ["distributed systems", "software architecture"]},
+    {"id": 212, "name": "Data Structures and Algorithms", "aliases": ["data structures", "algorithms", "dsa"]},
+]
+
+# Aliases too ambiguous to trust inside free text ("shell company", "express delivery",
+# "the rest of the team", "excel in a fast-paced role", "close collaboration with product").
+# They still resolve when a skill string consists of the alias alone.
+FREE_TEXT_EXCLUDED_ALIASES = {
+    "shell", "node", "testing", "lambda", "analytics", "containers", "oracle", "torch",
+    "coaching", "forecasting", "transformers", "express", "spring", "swift", "experimentation",
+    "rest", "excel", "julia", "communication", "collaboration", "leadership", "mentoring",
+}
+
+# Aliases at or below this length (e.g. "r", "go", "ml") are only matched as whole skill strings
+MIN_FREE_TEXT_ALIAS_LENGTH = 3
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes import user_routes, resume_routes
-from routes import job_market_routes
+from routes import job_market_routes, task_routes
+from config import get_database, ensure_indexes
+from services.task_queue import get_task_worker_pool
+from services.llm_usage import get_llm_usage_tracker
 from dotenv import load_dotenv
 import os
 
@@ -29,6 +32,25 @@ app.add_middleware(
 app.include_router(user_routes.router, prefix="/api/users", tags=["users"])
 app.include_router(job_market_routes.router, prefix="/api", tags=["jobs"])
 app.include_router(resume_routes.router, prefix="/resumes", tags=["resumes"])
+app.include_router(task_routes.router, prefix="/api/tasks", tags=["tasks"])
+
+@app.on_event("startup")
+async def start_task_workers():
+    db = await get_database()
+    # Indexes are created once per process; get_database stays a plain handle
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        print(f"Failed to create indexes: {str(e)}")
+    # Workers process queued AI tasks (analysis, cover letters, enhancements) in this process
+    await get_task_worker_pool().start(db)
+    # Buffered per-user LLM usage is flushed to llm_usage in the background
+    await get_llm_usage_tracker().start(db)
+
+@app.on_event("shutdown")
+async def stop_task_workers():
+    await get_task_worker_pool().stop()
+    await get_llm_usage_tracker().stop()
 
 @app.get("/")
 async def root():
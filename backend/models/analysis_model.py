@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+class ResumeAnalysisSections(BaseModel):
+    """All three resume analysis sections, returned by a single structured Gemini call."""
+    resume_feedback: str = Field(..., min_length=1, description="Overall feedback, suggestions, strengths and areas to enhance")
+    upskilling_suggestions: str = Field(..., min_length=1, description="Skills, courses, emerging technologies and soft skills to develop")
+    matching_roles: str = Field(..., min_length=1, description="Top 5 matching roles with existing and missing skills and progression paths")
+
+# OpenAPI-style schema passed to Gemini as response_schema (mirrors ResumeAnalysisSections)
+RESUME_ANALYSIS_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        name: {"type": "string", "description": field.description}
+        for name, field in ResumeAnalysisSections.model_fields.items()
+    },
+    "required": list(ResumeAnalysisSections.model_fields)
+}
@@ -0,0 +1,54 @@
+import re
+from typing import List
+from pydantic import BaseModel, Field, field_validator
+
+_BULLET = re.compile(r"^\s*([•●▪*\-–—]|\d+[.)])\s*")
+
+class ResumeEnhancement(BaseModel):
+    """Resume enhancement suggestions for a job; every section is a list of suggestions."""
+    bullet_points: List[str] = Field(default_factory=list, description="Suggested bullet points for relevant experience sections that better align with the job requirements")
+    skills: List[str] = Field(default_factory=list, description="Skills to emphasize or add based on the job requirements")
+    achievements: List[str] = Field(default_factory=list, description="Specific achievements to highlight or reword")
+    keywords: List[str] = Field(default_factory=list, description="Important keywords from the job description to incorporate")
+    sections: List[str] = Field(default_factory=list, description="Sections to add or modify, each with an explanation")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def repair_items(cls, value):
+        """Coerce near-misses from the model into a clean list of strings instead of rejecting them."""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = value.splitlines()
+        elif not isinstance(value, list):
+            value = [value]
+        items, seen = [], set()
+        for item in value:
+            if isinstance(item, dict):
+                # e.g. {"section": "Projects", "explanation": "..."}
+                item = ": ".join(str(part) for part in item.values() if part)
+            item = _BULLET.sub("", str(item)).strip()
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                items.append(item)
+        return items
+
+    def missing_sections(self) -> List[str]:
+        return [name for name in type(self).model_fields if not getattr(self, name)]
+
+ENHANCEMENT_SECTIONS = list(ResumeEnhancement.model_fields)
+
+def enhancement_response_schema(sections: List[str] = ENHANCEMENT_SECTIONS) -> dict:
+    """OpenAPI-style schema passed to Gemini as response_schema, limited to `sections`."""
+    return {
+        "type": "object",
+        "properties": {
+            name: {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": ResumeEnhancement.model_fields[name].description
+            }
+            for name in sections
+        },
+        "required": list(sections)
+    }
@@ -4,14 +4,40 @@ from  data.locations import get_all_locations, get_states, get_major_cities, get
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pydantic import BaseModel, Field
 from models.job_model import Job
-from config import get_database
+from config import get_database, VECTOR_SEARCH_NPROBE, COVER_LETTER_BATCH_CONCURRENCY
+from services.job_search_service import JobSearchService, build_text_search_stage
+from services.embedding_service import get_embedding_service
+from services.job_vector_store import JobVectorStore, get_job_vector_store
+from services.reranking import build_feature_matrix, rerank_scores
+from services.job_clusters import get_cluster_centroids, nearest_clusters, cluster_search_filter
+from services.match_explanation_cache import MatchExplanationCache
+from services.llm_cache import LLMCache, cache_stats
+from services.llm_gateway import get_llm_gateway
+from services.task_queue import register_task_handler, submit_task, task_view
+from services.llm_usage import llm_budget, llm_budget_status, set_llm_user
+from services.resume_digest import ensure_resume_digest
+from services.context_cache import get_resume_context, get_context_cache, resume_prompt_text
+from utils.skill_matching import SkillMatcher, normalize_skill
+from utils.skill_taxonomy import job_skill_ids, skill_id_fields, skill_names
 from fastapi.responses import JSONResponse
+import asyncio
+import numpy as np
 from utils.job_analysis import (
     generate_job_match_analysis,
+    generate_job_match_analyses,
     generate_cover_letter,
-    enhance_resume
+    enhance_resume,
+    stream_generation,
+    build_cover_letter_prompt,
+    build_enhance_resume_prompt,
+    enhancement_generation_config,
+    complete_enhancement,
+    COVER_LETTER_PROMPT_VERSION,
+    ENHANCE_RESUME_PROMPT_VERSION
 )
+from utils.sse import sse_event, sse_response
 
 router = APIRouter()
 scraper = JobMarketScraper()
@@ -119,65 +145,20 @@ async def get_jobs(
     search: Optional[str] = None,
     location: Optional[str] = None,
     company: Optional[str] = None,
-    email: Optional[str] = None
+    email: Optional[str] = None,
+    mode: str = Query("text", pattern="^(text|hybrid)$", description="Search mode: Atlas text only or hybrid text + vector")
 ):
     try:
         db = await get_database()
         # Calculate skip for pagination
         skip = (page - 1) * limit
         
-        # Build search pipeline
-        pipeline = []
-        
-        # Add search stage if search term is provided
-        if search:
-            pipeline.append({
-                "$search": {
-                    "index": "job_search",  # Make sure to create this index in MongoDB Atlas
-                    "compound": {
-                        "should": [
-                            {
-                                "text": {
-                                    "query": search,
-                                    "path": ["title", "description", "requirements"],
-                                    "score": { "boost": { "value": 3 } }
-                                }
-                            },
-                            {
-                                "text": {
-                                    "query": search,
-                                    "path": ["company", "location"],
-                                    "score": { "boost": { "value": 2 } }
-                                }
-                            }
-                        ]
-                    },
-                    "highlight": {
-                        "path": ["title", "description"]
-                    }
-                }
-            })
-            # Add a field for the search score
-            pipeline.append({
-                "$addFields": {
-                    "searchScore": {
-                        "$meta": "searchScore"
-                    }
-                }
-            })
-            # Sort by the added searchScore field
-            pipeline.append({
-                "$sort": {
-                    "searchScore": -1
-                }
-            })
-        else:
-            # If no search, sort by posted date
-            pipeline.append({"$sort": {"postedDate": -1}})
+        # Build filter stages shared by the text and hybrid search paths
+        filters = []
 
         # Add location filter if provided
         if location:
-            pipeline.append({
+            filters.append({
                 "$match": {
                     "location": {"$regex": location, "$options": "i"}
                 }
@@ -185,7 +166,7 @@ async def get_jobs(
 
         # Add company filter if provided
         if company:
-            pipeline.append({
+            filters.append({
                 "$match": {
                     "company": {"$regex": company, "$options": "i"}
                 }
@@ -195,26 +176,63 @@ async def get_jobs(
         if email:
             user = await db.users.find_one({"email": email})
             if user and user.get("applied_jobs"):
-                pipeline.append({
+                filters.append({
                     "$match": {
                         "_id": {"$nin": [ObjectId(job_id) for job_id in user["applied_jobs"]]}
                     }
                 })
 
-        # Add facet stage to get total count and paginated results in one query
-        pipeline.append({
-            "$facet": {
-                "total": [{"$count": "count"}],
-                "jobs": [
-                    {"$skip": skip},
-                    {"$limit": limit}
-                ]
-            }
-        })
+        search_mode = "text"
+        total_capped = False
+        if search and mode == "hybrid":
+            # Fuse Atlas text search with semantic vector search; the total only counts
+            # the fused candidates, so it is flagged when the candidate limit was reached
+            search_service = JobSearchService(db)
+            hybrid_jobs, hybrid_total, search_mode, total_capped = await search_service.hybrid_search(
+                search, filters, skip, limit
+            )
+            result = {"total": [{"count": hybrid_total}], "jobs": hybrid_jobs}
+        else:
+            # Build search pipeline
+            pipeline = []
+
+            # Add search stage if search term is provided
+            if search:
+                pipeline.append(build_text_search_stage(search))
+                # Add a field for the search score
+                pipeline.append({
+                    "$addFields": {
+                        "searchScore": {
+                            "$meta": "searchScore"
+                        }
+                    }
+                })
+                # Sort by the added searchScore field
+                pipeline.append({
+                    "$sort": {
+                        "searchScore": -1
+                    }
+                })
+            else:
+                # If no search, sort by posted date
+                pipeline.append({"$sort": {"postedDate": -1}})
 
-        # Execute the pipeline
-        result = await db.jobs.aggregate(pipeline).to_list(1)
-        result = result[0] if result else {"total": [{"count": 0}], "jobs": []}
+            pipeline.extend(filters)
+
+            # Add facet stage to get total count and paginated results in one query
+            pipeline.append({
+                "$facet": {
+                    "total": [{"$count": "count"}],
+                    "jobs": [
+                        {"$skip": skip},
+                        {"$limit": limit}
+                    ]
+                }
+            })
+
+            # Execute the pipeline
+            result = await db.jobs.aggregate(pipeline).to_list(1)
+            result = result[0] if result else {"total": [{"count": 0}], "jobs": []}
 
         total = result["total"][0]["count"] if result["total"] else 0
         jobs = []
@@ -253,7 +271,9 @@ async def get_jobs(
             "total": total,
             "page": page,
             "limit": limit,
-            "totalPages": (total + limit - 1) // limit
+            "totalPages": (total + limit - 1) // limit,
+            "totalCapped": total_capped,
+            "searchMode": search_mode
         }
 
     except Exception as e:
@@ -265,12 +285,75 @@ async def create_job(job: Job):
     try:
         db = await get_database()
         job_dict = job.dict()
+        # Resolve canonical skill IDs at write time so matching is a set intersection
+        job_dict.update(skill_id_fields(job_skill_ids(job_dict)))
         result = await db.jobs.insert_one(job_dict)
         job_dict["_id"] = str(result.inserted_id)
         return job_dict
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/clusters")
+async def get_job_clusters():
+    """Role families from embedding-space clustering (scripts/cluster_jobs.py), largest first."""
+    try:
+        db = await get_database()
+        clusters = await db.job_clusters.find(
+            {},
+            {"label": 1, "size": 1, "top_skills": 1}
+        ).sort("size", -1).to_list(length=None)
+        return {
+            "clusters": [
+                {
+                    "id": cluster["_id"],
+                    "label": cluster.get("label"),
+                    "size": cluster.get("size", 0),
+                    "topSkills": cluster.get("top_skills", [])
+                }
+                for cluster in clusters
+            ]
+        }
+    except Exception as e:
+        print(f"Error in get_job_clusters: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/clusters/{cluster_id}")
+async def get_job_cluster(
+    cluster_id: int,
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=50, description="Items per page"),
+):
+    """Browse a role family from its pre-aggregated members, nearest to the cluster centre first."""
+    try:
+        db = await get_database()
+        skip = (page - 1) * limit
+        cluster = await db.job_clusters.find_one(
+            {"_id": cluster_id},
+            {"label": 1, "size": 1, "top_skills": 1, "members": {"$slice": [skip, limit]}}
+        )
+        if not cluster:
+            raise HTTPException(status_code=404, detail="Cluster not found")
+        return {
+            "cluster": {
+                "id": cluster["_id"],
+                "label": cluster.get("label"),
+                "size": cluster.get("size", 0),
+                "topSkills": cluster.get("top_skills", [])
+            },
+            "jobs": [
+                {"_id": member["job_id"],
+                 **{key: value for key, value in member.items() if key != "job_id"}}
+                for member in cluster.get("members", [])
+            ],
+            "page": page,
+            "limit": limit
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error in get_job_cluster: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/jobs/{job_id}")
 async def get_job(job_id: str):
     try:
@@ -311,11 +394,40 @@ async def get_job(job_id: str):
         print(f"Error in get_job: {str(e)}")  # Add logging
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/{job_id}/similar")
+async def get_similar_jobs(job_id: str, limit: int = Query(5, ge=1, le=20, description="Number of similar jobs")):
+    """
+    Jobs most similar to this one, precomputed by scripts/precompute_similar_jobs.py.
+
+    Neighbours are stored denormalized in `similar_jobs`, so this is a single read.
+    Jobs added since the last precompute run return an empty list.
+    """
+    try:
+        db = await get_database()
+        entry = await db.similar_jobs.find_one(
+            {"_id": job_id},
+            {"neighbours": {"$slice": limit}, "computed_at": 1}
+        )
+        neighbours = entry.get("neighbours", []) if entry else []
+        return {
+            "jobs": [
+                {"_id": neighbour["job_id"], "similarity": neighbour["score"],
+                 **{key: value for key, value in neighbour.items() if key not in ("job_id", "score")}}
+                for neighbour in neighbours
+            ],
+            "computedAt": entry.get("computed_at") if entry else None
+        }
+    except Exception as e:
+        print(f"Error in get_similar_jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/jobs/{job_id}")
 async def update_job(job_id: str, job_update: Job):
     try:
         db = await get_database()
         job_dict = job_update.dict(exclude_unset=True)
+        if "requirements" in job_dict or "description" in job_dict:
+            job_dict.update(skill_id_fields(job_skill_ids(job_dict)))
         result = await db.jobs.update_one(
             {"_id": ObjectId(job_id)},
             {"$set": job_dict}
@@ -332,66 +444,251 @@ async def update_job(job_id: str, job_update: Job):
 async def delete_job(job_id: str):
     try:
         db = await get_database()
-        result = await db.jobs.delete_one({"_id": ObjectId(job_id)})
-        if result.deleted_count:
+        job = await db.jobs.find_one_and_delete({"_id": ObjectId(job_id)}, {"cluster_id": 1})
+        if job:
+            # Remove the job from precomputed similar-job lists and its cluster
+            await db.similar_jobs.delete_one({"_id": job_id})
+            await db.similar_jobs.update_many(
+                {"neighbours.job_id": job_id},
+                {"$pull": {"neighbours": {"job_id": job_id}}}
+            )
+            if job.get("cluster_id") is not None:
+                await db.job_clusters.update_one(
+                    {"_id": job["cluster_id"]},
+                    {"$pull": {"members": {"job_id": job_id}}, "$inc": {"size": -1}}
+                )
             return {"message": "Job deleted successfully"}
         raise HTTPException(status_code=404, detail="Job not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _match_job_skills(job: dict, job_skills: list, skill_matcher: SkillMatcher, resume_skill_ids: frozenset):
+    """
+    Match a job's skills against the resume. Returns (exact_matches, partial_matches, required_count).
+
+    When both sides carry canonical taxonomy IDs (stored at write time) the overlap is a
+    set intersection; otherwise the free-text requirements go through the SkillMatcher.
+    """
+    job_skill_ids = job.get("skill_ids")
+    if job_skill_ids and resume_skill_ids:
+        shared = resume_skill_ids.intersection(job_skill_ids)
+        return skill_names(sorted(shared)), [], len(job_skill_ids)
+    exact_matches, partial_matches = skill_matcher.match(job_skills)
+    return exact_matches, partial_matches, len(job_skills)
+
+def _cosine_similarities(jobs: list, resume: dict, vector_store: Optional[JobVectorStore] = None) -> np.ndarray:
+    """
+    Cosine similarity of each job to the resume (NaN when a job has no usable embedding).
+
+    Jobs present in `vector_store` (the request's snapshot of the shared store) are scored
+    with a single matrix product over their mapped rows; the rest fall back to the
+    embedding stored on the job document.
+    """
+    resume_vector = np.asarray(resume["embedding"], dtype=np.float32)
+    resume_norm = np.linalg.norm(resume_vector)
+    similarities = np.full(len(jobs), np.nan, dtype=np.float32)
+    if resume_norm == 0 or not jobs:
+        return similarities
+    resume_unit = resume_vector / resume_norm
+    
+    vector_store = vector_store or get_job_vector_store()
+    stored_positions, stored_rows = [], []
+    if vector_store.dim == len(resume_unit):
+        for position, job in enumerate(jobs):
+            row = vector_store.index.get(str(job["_id"]))
+            if row is not None:
+                stored_positions.append(position)
+                stored_rows.append(row)
+    if stored_rows:
+        similarities[stored_positions] = vector_store.vectors[stored_rows] @ resume_unit
+    
+    stored = set(stored_positions)
+    for position, job in enumerate(jobs):
+        if position in stored:
+            continue
+        job_embedding = job.get("embedding")
+        if not job_embedding:
+            print(f"Warning: Job {job.get('_id')} has no embedding, skipping...")
+            continue
+        if len(job_embedding) != len(resume_unit):
+            print(f"Warning: Embedding dimension mismatch - Job: {len(job_embedding)}, Resume: {len(resume_unit)}")
+            continue
+        job_vector = np.asarray(job_embedding, dtype=np.float32)
+        job_norm = np.linalg.norm(job_vector)
+        if job_norm > 0:
+            similarities[position] = (job_vector @ resume_unit) / job_norm
+    return similarities
+
+def _rank_jobs_for_resume(jobs: list, resume: dict, preferences: Optional[dict],
+                          vector_store: Optional[JobVectorStore] = None) -> list:
+    """
+    Score jobs against a resume with the re-ranking stage.
+
+    Returns [(job, match_score, job_skills, matching_skills)] in input order, dropping jobs
+    without a usable embedding. The score blends embedding similarity, skill overlap,
+    recency and location preference (weights in config.RERANK_WEIGHT_*).
+    """
+    similarities = _cosine_similarities(jobs, resume, vector_store)
+    skill_matcher = SkillMatcher(resume.get("skills", []))
+    resume_skill_ids = frozenset(resume.get("skill_ids") or [])
+    
+    scored_jobs, skill_overlaps = [], []
+    for job, similarity in zip(jobs, similarities):
+        if np.isnan(similarity):
+            continue
+        # Normalize job skills and match them against the pre-indexed resume skills
+        job_skills = [normalize_skill(skill) for skill in job.get("requirements", []) if skill]
+        exact_matches, partial_matches, required_count = _match_job_skills(job, job_skills, skill_matcher, resume_skill_ids)
+        matching_skills = exact_matches + partial_matches
+        skill_overlaps.append(len(matching_skills) / required_count if required_count else None)
+        scored_jobs.append((job, float(similarity), job_skills, matching_skills))
+    
+    if not scored_jobs:
+        return []
+    features = build_feature_matrix(
+        [similarity for _, similarity, _, _ in scored_jobs],
+        skill_overlaps,
+        [job.get("posted_date") or job.get("postedDate") for job, _, _, _ in scored_jobs],
+        [job.get("location") for job, _, _, _ in scored_jobs],
+        preferences
+    )
+    scores = rerank_scores(features)
+    return [
+        (job, float(score), job_skills, matching_skills)
+        for (job, _, job_skills, matching_skills), score in zip(scored_jobs, scores)
+    ]
+
+def _build_match_highlights(match_score: float, job_skills: list, matching_skills: list, match_explanation: Optional[str]) -> dict:
+    """Summarize a job/resume match for the UI."""
+    return {
+        "overall_match": match_score,
+        "key_skills": job_skills[:5],
+        "matching_skills": matching_skills[:5],
+        "seniority_match": "High" if match_score > 85 else "Medium" if match_score > 70 else "Low",
+        "role_alignment": "Strong" if match_score > 90 else "Good" if match_score > 75 else "Moderate",
+        "match_explanation": match_explanation
+    }
+
+async def _get_latest_resume_with_embedding(db, email: str) -> dict:
+    """Fetch the user's latest resume version, generating its embedding if missing."""
+    resume = await db.resumes.find_one(
+        {"user_email": email},
+        sort=[("version", -1)]  # Sort by version descending to get latest
+    )
+    
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+        
+    print(f"Found latest resume (version {resume.get('version')}) for {email}")
+        
+    if not resume.get("embedding"):
+        # Try to generate embedding if missing
+        print(f"Embedding missing for resume version {resume.get('version')}, attempting to generate...")
+        if "extracted_text" in resume and resume["extracted_text"]:
+            resume["embedding"] = await get_embedding_service().generate_resume_embedding(resume["extracted_text"])
+            if not resume["embedding"]:
+                raise HTTPException(status_code=500, detail="Failed to generate resume embedding")
+            
+            # Update resume with new embedding
+            await db.resumes.update_one(
+                {"_id": resume["_id"]},
+                {"$set": {"embedding": resume["embedding"]}}
+            )
+            print("Successfully generated and stored new embedding")
+        else:
+            raise HTTPException(status_code=400, detail="Resume text extraction required before vector search")
+    
+    return resume
+
+async def _explain_matches(db, candidates: list, resume: dict) -> None:
+    """Fill in matchDetails.match_explanation for (job_data, job_skills, matching_skills) candidates."""
+    cache = MatchExplanationCache(db)
+    cached = await cache.get_many([job_data["_id"] for job_data, _, _ in candidates], resume)
+    
+    pending = []
+    for candidate in candidates:
+        job_data = candidate[0]
+        if job_data["_id"] in cached:
+            job_data["matchDetails"].update({
+                "match_explanation": cached[job_data["_id"]],
+                "explanation_status": "complete"
+            })
+        else:
+            pending.append(candidate)
+    print(f"Match explanations: {len(cached)} cached, {len(pending)} to generate")
+    if not pending:
+        return
+    
+    resume_text = await ensure_resume_digest(db, resume)
+    # One cached resume context serves every explanation in the batch
+    context = await get_resume_context(resume, resume_text)
+    results = await generate_job_match_analyses([
+        {
+            "job_title": job_data.get("title") or "",
+            "job_description": job_data.get("description") or "",
+            "job_requirements": job_skills,
+            "resume_text": resume_text,
+            "match_score": job_data["matchScore"],
+            "matching_skills": matching_skills,
+            "context": context
+        }
+        for job_data, job_skills, matching_skills in pending
+    ])
+    
+    fresh = {}
+    for (job_data, _, _), result in zip(pending, results):
+        job_data["matchDetails"].update(result)
+        # Fallback summaries are not cached so the next view retries Gemini
+        if result["explanation_status"] == "complete":
+            fresh[job_data["_id"]] = result["match_explanation"]
+    await cache.put_many(fresh, resume)
+
 @router.get("/jobs/vector-search/{email}")
 async def vector_search_jobs(
     email: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(5, ge=1, le=20, description="Items per page"),
+    include_explanations: bool = Query(False, description="Generate AI match explanations for the returned page"),
+    nprobe: Optional[int] = Query(None, ge=0, le=64, description="Restrict search to the N nearest job clusters (0 = all jobs)"),
 ):
-    """Search for jobs using vector similarity with the user's resume and provide AI-curated matching details."""
+    """
+    Search for jobs using vector similarity with the user's resume.
+
+    Returns ranked match scores immediately. AI explanations are only generated for
+    the returned page when include_explanations is set; otherwise fetch them from
+    POST /jobs/vector-search/{email}/explanations or /jobs/{job_id}/match-analysis/{email}.
+    """
     try:
         db = await get_database()
         
         # Get user's latest resume version and applied jobs
-        resume = await db.resumes.find_one(
-            {"user_email": email},
-            sort=[("version", -1)]  # Sort by version descending to get latest
-        )
-        
+        resume = await _get_latest_resume_with_embedding(db, email)
         user = await db.users.find_one({"email": email})
         applied_job_ids = [ObjectId(job_id) for job_id in user.get("applied_jobs", [])] if user else []
-        
-        if not resume:
-            raise HTTPException(status_code=404, detail="Resume not found")
-            
-        print(f"Found latest resume (version {resume.get('version')}) for {email}")
-            
-        if "embedding" not in resume:
-            # Try to generate embedding if missing
-            print(f"Embedding missing for resume version {resume.get('version')}, attempting to generate...")
-            if "extracted_text" in resume and resume["extracted_text"]:
-                from ..services.embedding_service import EmbeddingService
-                embedding_service = EmbeddingService()
-                resume["embedding"] = await embedding_service.generate_resume_embedding(resume["extracted_text"])
-                
-                # Update resume with new embedding
-                await db.resumes.update_one(
-                    {"_id": resume["_id"]},
-                    {"$set": {"embedding": resume["embedding"]}}
-                )
-                print("Successfully generated and stored new embedding")
-            else:
-                raise HTTPException(status_code=400, detail="Resume text extraction required before vector search")
             
         print(f"Using resume embedding with dimension: {len(resume['embedding'])}")
         
         # Find jobs with vector similarity search using MongoDB Atlas Search
+        knn = {
+            "vector": resume["embedding"],
+            "path": "embedding",
+            "k": page * limit * 4  # Get more results for better filtering
+        }
+        
+        # Coarse filter: only search the clusters nearest the resume
+        nprobe = VECTOR_SEARCH_NPROBE if nprobe is None else nprobe
+        if nprobe:
+            centroid_table = await get_cluster_centroids(db)
+            probed = nearest_clusters(centroid_table, resume["embedding"], nprobe) if centroid_table else []
+            if probed:
+                knn["filter"] = cluster_search_filter(probed)
+                print(f"Probing job clusters {probed}")
+        
         pipeline = [
             {
                 "$search": {
                     "index": "job_vector_index",
-                    "knnBeta": {
-                        "vector": resume["embedding"],
-                        "path": "embedding",
-                        "k": limit * 4  # Get more results for better filtering
-                    },
+                    "knnBeta": knn,
                     "scoreDetails": True  # Get similarity scores
                 }
             },
@@ -409,13 +706,33 @@ async def vector_search_jobs(
             }
         ]
         
+        # Score against the shared memory-mapped matrix instead of shipping every job's embedding.
+        # One snapshot serves the whole request, so a generation swap cannot split it; a store
+        # of another dimension than the resume embedding is ignored and jobs keep their embedding
+        vector_store = get_job_vector_store()
+        use_store = vector_store.dim == len(resume["embedding"])
+        if use_store:
+            pipeline.append({"$project": {"embedding": 0}})
+        
         print(f"Executing vector search pipeline for resume version {resume.get('version')}...")
-        cursor = db.jobs.aggregate(pipeline)
-        jobs = []
+        jobs_found = await db.jobs.aggregate(pipeline).to_list(length=None)
         
-        async for job in cursor:
-            print(f"Processing job: {job.get('title')} with similarity score: {job.get('similarity_score', 0)}")
-            
+        # Jobs added since the last export still need their stored embedding
+        if use_store:
+            missing = [job["_id"] for job in jobs_found if vector_store.vector(str(job["_id"])) is None]
+            if missing:
+                embeddings = {
+                    job["_id"]: job.get("embedding")
+                    async for job in db.jobs.find({"_id": {"$in": missing}}, {"embedding": 1})
+                }
+                for job in jobs_found:
+                    if job["_id"] in embeddings:
+                        job["embedding"] = embeddings[job["_id"]]
+        
+        preferences = user.get("preferences") if user else None
+        candidates = []
+        
+        for job, match_score, job_skills, matching_skills in _rank_jobs_for_resume(jobs_found, resume, preferences, vector_store):
             # Format the job data
             posted_date = None
             if "posted_date" in job:
@@ -425,81 +742,8 @@ async def vector_search_jobs(
                 else:
                     posted_date = job["posted_date"]
             
-            # Verify job has embedding
-            if "embedding" not in job or not job["embedding"]:
-                print(f"Warning: Job {job.get('_id')} has no embedding, skipping...")
-                continue
-                
-            # Calculate match score using cosine similarity
-            job_embedding = job["embedding"]
-            resume_embedding = resume["embedding"]
-            
-            if len(job_embedding) != len(resume_embedding):
-                print(f"Warning: Embedding dimension mismatch - Job: {len(job_embedding)}, Resume: {len(resume_embedding)}")
-                continue
-            
-            # Calculate cosine similarity
-            dot_product = sum(a * b for a, b in zip(job_embedding, resume_embedding))
-            job_norm = sum(x * x for x in job_embedding) ** 0.5
-            resume_norm = sum(x * x for x in resume_embedding) ** 0.5
-            
-            if job_norm > 0 and resume_norm > 0:
-                match_score = round((dot_product / (job_norm * resume_norm)) * 100, 1)
-            else:
-                print(f"Warning: Invalid norms - Job: {job_norm}, Resume: {resume_norm}")
-                continue
-            
-            print(f"Calculated match score: {match_score}")
-            
-            # Extract and normalize skills
-            job_skills = [skill.lower().strip() for skill in job.get("requirements", []) if skill]
-            resume_skills = [skill.lower().strip() for skill in resume.get("skills", []) if skill]
-            
-            # Find exact and partial skill matches
-            exact_matches = set(job_skills) & set(resume_skills)
-            partial_matches = set()
-            
-            for job_skill in job_skills:
-                for resume_skill in resume_skills:
-                    if (job_skill in resume_skill or resume_skill in job_skill) and \
-                       job_skill not in exact_matches and \
-                       resume_skill not in exact_matches:
-                        partial_matches.add(job_skill)
-            
-            matching_skills = list(exact_matches) + list(partial_matches)
-            print(f"Found {len(matching_skills)} matching skills")
-            
-            # Adjust match score based on skill matches
-            skill_match_weight = 0.3  # 30% weight for skill matches
-            if job_skills:  # Avoid division by zero
-                skill_match_score = (len(matching_skills) / len(job_skills)) * 100
-                match_score = round(
-                    (match_score * (1 - skill_match_weight)) + 
-                    (skill_match_score * skill_match_weight), 
-                    1
-                )
-            
-            print(f"Final adjusted match score: {match_score}")
-            
-            # Generate AI analysis using Gemini
-            match_explanation = await generate_job_match_analysis(
-                job_title=job.get("title", ""),
-                job_description=job.get("description", ""),
-                job_requirements=job_skills,
-                resume_text=resume.get("text", ""),
-                match_score=match_score,
-                matching_skills=matching_skills
-            )
-            
-            # Generate match highlights
-            match_highlights = {
-                "overall_match": match_score,
-                "key_skills": job_skills[:5],
-                "matching_skills": matching_skills[:5],
-                "seniority_match": "High" if match_score > 85 else "Medium" if match_score > 70 else "Low",
-                "role_alignment": "Strong" if match_score > 90 else "Good" if match_score > 75 else "Moderate",
-                "match_explanation": match_explanation
-            }
+            # Explanations are filled in later, and only for the returned page
+            match_highlights = _build_match_highlights(match_score, job_skills, matching_skills, None)
             
             # Format job data
             job_data = {
@@ -515,28 +759,96 @@ async def vector_search_jobs(
                 "matchScore": match_score,
                 "matchDetails": match_highlights
             }
-            jobs.append(job_data)
+            candidates.append((job_data, job_skills, matching_skills))
         
         # Sort jobs by match score in descending order
-        jobs.sort(key=lambda x: x["matchScore"], reverse=True)
+        candidates.sort(key=lambda candidate: candidate[0]["matchScore"], reverse=True)
+        total = len(candidates)
+        
+        # Take only the requested page
+        skip = (page - 1) * limit
+        candidates = candidates[skip:skip + limit]
         
-        # Take only the top 'limit' jobs
-        jobs = jobs[:limit]
+        if include_explanations:
+            set_llm_user(email)
+            # Over budget: still return the ranked jobs, just without explanations
+            if (await llm_budget_status(db, email, "match_explanation"))["exceeded"]:
+                print(f"Skipping match explanations for {email}: LLM budget exceeded")
+            else:
+                await _explain_matches(db, candidates, resume)
         
+        jobs = [job_data for job_data, _, _ in candidates]
         print(f"Returning {len(jobs)} jobs with match scores: {[job['matchScore'] for job in jobs]}")
         
         return {
             "jobs": jobs,
-            "total": len(jobs),
+            "total": total,
             "page": page,
             "limit": limit
         }
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         print(f"Error in vector search: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/jobs/{job_id}/match-analysis/{email}")
+@router.get("/jobs/vector-store/stats")
+async def get_job_vector_store_stats():
+    """Report the shared job vector store generation and this worker's resident memory."""
+    return get_job_vector_store().stats()
+
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats():
+    """LLM response cache hit/miss counters per endpoint for this worker."""
+    return cache_stats()
+
+@router.get("/llm-gateway/stats")
+async def get_llm_gateway_stats():
+    """Gemini gateway breaker state, limits, per-route latency/error counters and context cache stats for this worker."""
+    return {**get_llm_gateway().stats(), "context_cache": get_context_cache().summary()}
+
+class MatchExplanationRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, max_length=20)
+
+@router.post("/jobs/vector-search/{email}/explanations", dependencies=[Depends(llm_budget("match_explanation"))])
+async def explain_vector_search_jobs(email: str, request: MatchExplanationRequest):
+    """Generate AI match explanations for a page of jobs returned by vector search."""
+    try:
+        db = await get_database()
+        resume = await _get_latest_resume_with_embedding(db, email)
+        
+        job_ids = [ObjectId(job_id) for job_id in request.job_ids]
+        found = await db.jobs.find({"_id": {"$in": job_ids}}).to_list(len(job_ids))
+        jobs_by_id = {str(job["_id"]): job for job in found}
+        
+        user = await db.users.find_one({"email": email}, {"preferences": 1})
+        jobs = [jobs_by_id[job_id] for job_id in request.job_ids if job_id in jobs_by_id]
+        candidates = []
+        for job, match_score, job_skills, matching_skills in _rank_jobs_for_resume(jobs, resume, user.get("preferences") if user else None):
+            job_id = str(job["_id"])
+            job_data = {
+                "_id": job_id,
+                "title": job.get("title"),
+                "description": job.get("description"),
+                "matchScore": match_score,
+                "matchDetails": _build_match_highlights(match_score, job_skills, matching_skills, None)
+            }
+            candidates.append((job_data, job_skills, matching_skills))
+        
+        await _explain_matches(db, candidates, resume)
+        
+        return {
+            "explanations": {job_data["_id"]: job_data["matchDetails"] for job_data, _, _ in candidates}
+        }
+        
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error generating match explanations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/jobs/{job_id}/match-analysis/{email}", dependencies=[Depends(llm_budget("match_explanation"))])
 async def generate_job_match_analysis_endpoint(job_id: str, email: str):
     """Generate AI-curated match analysis for a specific job and user's resume."""
     try:
@@ -544,7 +856,7 @@ async def generate_job_match_analysis_endpoint(job_id: str, email: str):
         
         # Get the job and resume
         job = await db.jobs.find_one({"_id": ObjectId(job_id)})
-        resume = await db.resumes.find_one({"user_email": email})
+        resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -555,7 +867,7 @@ async def generate_job_match_analysis_endpoint(job_id: str, email: str):
         print(f"Job found: {job.get('title')}")
         print(f"Job requirements: {job.get('requirements', [])}")
         print(f"Resume skills: {resume.get('skills', [])}")
-        print(f"Resume text length: {len(resume.get('text', ''))}")
+        print(f"Resume text length: {len(resume.get('extracted_text') or '')}")
             
         # Calculate vector similarity score if embeddings exist
         match_score = 0
@@ -577,42 +889,39 @@ async def generate_job_match_analysis_endpoint(job_id: str, email: str):
         else:
             print("Warning: Embeddings not found - Job:", "embedding" in job, "Resume:", "embedding" in resume)
         
-        # Extract key skills and find matching ones
-        job_skills = job.get("requirements", [])
-        resume_skills = resume.get("skills", [])
-        
-        # Normalize skills for better matching
-        job_skills = [skill.lower().strip() for skill in job_skills if skill]
-        resume_skills = [skill.lower().strip() for skill in resume_skills if skill]
+        # Normalize job skills and match them against the indexed resume skills
+        job_skills = [normalize_skill(skill) for skill in job.get("requirements", []) if skill]
+        exact_matches, partial_matches, required_count = _match_job_skills(
+            job,
+            job_skills,
+            SkillMatcher(resume.get("skills", [])),
+            frozenset(resume.get("skill_ids") or [])
+        )
         
-        # Find matching skills
-        matching_skills = list(set(job_skills) & set(resume_skills))
+        # Fall back to partial matches only when nothing matches exactly
+        matching_skills = exact_matches or partial_matches
         print(f"Matching skills found: {matching_skills}")
         
-        # If no exact matches, try partial matching
-        if not matching_skills:
-            for job_skill in job_skills:
-                for resume_skill in resume_skills:
-                    if (job_skill in resume_skill) or (resume_skill in job_skill):
-                        matching_skills.append(job_skill)
-            matching_skills = list(set(matching_skills))
-            print(f"Skills after partial matching: {matching_skills}")
-        
         # Adjust match score based on skills match if no embedding score
-        if match_score == 0 and job_skills:
-            skill_match_ratio = len(matching_skills) / len(job_skills)
+        if match_score == 0 and required_count:
+            skill_match_ratio = len(matching_skills) / required_count
             match_score = round(skill_match_ratio * 100, 1)
             print(f"Adjusted match score based on skills: {match_score}")
         
-        # Generate AI analysis using Gemini
-        match_explanation = await generate_job_match_analysis(
-            job_title=job.get("title", ""),
-            job_description=job.get("description", ""),
-            job_requirements=job_skills,
-            resume_text=resume.get("text", ""),
-            match_score=match_score,
-            matching_skills=matching_skills
-        )
+        # Serve a cached explanation for this job and resume version, otherwise ask Gemini
+        cache = MatchExplanationCache(db)
+        match_explanation = await cache.get(job_id, resume)
+        if match_explanation is None:
+            resume_text = await ensure_resume_digest(db, resume)
+            match_explanation = await generate_job_match_analysis(
+                job_title=job.get("title", ""),
+                job_description=job.get("description", ""),
+                job_requirements=job_skills,
+                resume_text=resume_text,
+                matching_skills=matching_skills,
+                context=await get_resume_context(resume, resume_text)
+            )
+            await cache.put(job_id, resume, match_explanation)
         
         # Generate match highlights
         match_details = {
@@ -729,64 +1038,310 @@ async def get_applied_jobs(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/jobs/{job_id}/cover-letter/{email}")
+def _cover_letter_prompt_inputs(job: dict, user: dict, resume_text: str) -> dict:
+    return {
+        "job_title": job.get("title", ""),
+        "company": job.get("company", ""),
+        "job_description": job.get("description", ""),
+        "resume_text": resume_text,
+        "user_name": user.get("name", "")
+    }
+
+async def _save_cover_letter(db, email: str, job_id: str, resume: dict, cover_letter: str) -> None:
+    """Persist a finished letter so it can be reopened without regenerating."""
+    await db.cover_letters.replace_one(
+        {"_id": f"{email}:{job_id}"},
+        {
+            "user_email": email,
+            "job_id": job_id,
+            "resume_id": resume["_id"],
+            "resume_version": resume.get("version"),
+            "cover_letter": cover_letter,
+            "created_at": datetime.utcnow()
+        },
+        upsert=True
+    )
+
+def _job_object_id(job_id: str) -> ObjectId:
+    """Parse a job id from the path, answering 400 for a malformed one."""
+    try:
+        return ObjectId(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid job id")
+
+async def _load_cover_letter_inputs(db, job_id: str, email: str):
+    """Prompt inputs for a cover letter and the resume they came from; 400/404 for a bad id or missing data."""
+    job = await db.jobs.find_one({"_id": _job_object_id(job_id)})
+    user = await db.users.find_one({"email": email})
+    resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    prompt_inputs = _cover_letter_prompt_inputs(job, user, await ensure_resume_digest(db, resume))
+    return prompt_inputs, resume
+
+async def _cover_letter_task(db, payload: dict) -> dict:
+    """Generate a cover letter, reusing the last one for an unchanged job, resume and prompt."""
+    prompt_inputs, resume = await _load_cover_letter_inputs(db, payload["job_id"], payload["email"])
+    cache = LLMCache(db, "cover_letter", COVER_LETTER_PROMPT_VERSION)
+    
+    async def generate():
+        context = await get_resume_context(resume, prompt_inputs["resume_text"])
+        return await generate_cover_letter(**prompt_inputs, context=context)
+    
+    cover_letter = await cache.get_or_generate(prompt_inputs, generate)
+    return {"cover_letter": cover_letter}
+
+register_task_handler("cover_letter", _cover_letter_task)
+
+@router.post("/jobs/{job_id}/cover-letter/{email}", dependencies=[Depends(llm_budget("cover_letter"))])
 async def generate_job_cover_letter(job_id: str, email: str):
     """Generate a cover letter for a specific job using the user's resume."""
     try:
         db = await get_database()
+        return await _cover_letter_task(db, {"job_id": job_id, "email": email})
         
-        # Get the job and user data
-        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
-        user = await db.users.find_one({"email": email})
-        resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
-        
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        if not resume:
-            raise HTTPException(status_code=404, detail="Resume not found")
-            
-        # Generate cover letter
-        cover_letter = await generate_cover_letter(
-            job_title=job.get("title", ""),
-            company=job.get("company", ""),
-            job_description=job.get("description", ""),
-            resume_text=resume.get("extracted_text", ""),
-            user_name=user.get("name", "")
-        )
-        
-        return {"cover_letter": cover_letter}
-        
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error generating cover letter: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/jobs/{job_id}/enhance-resume/{email}")
-async def get_resume_enhancements(job_id: str, email: str):
-    """Get suggestions to enhance the resume for a specific job."""
+@router.post("/jobs/{job_id}/cover-letter/{email}/tasks", status_code=202, dependencies=[Depends(llm_budget("cover_letter"))])
+async def submit_cover_letter_task(job_id: str, email: str):
+    """Queue cover letter generation; poll GET /api/tasks/{task_id} or subscribe to its events."""
+    db = await get_database()
+    await _load_cover_letter_inputs(db, job_id, email)
+    task = await submit_task(db, "cover_letter", {"job_id": job_id, "email": email}, user_email=email)
+    return task_view(task)
+
+@router.post("/jobs/{job_id}/cover-letter/{email}/stream", dependencies=[Depends(llm_budget("cover_letter"))])
+async def stream_job_cover_letter(job_id: str, email: str):
+    """
+    Stream a cover letter as server-sent events while Gemini generates it.
+
+    Emits `token` events ({"text": chunk}), then `done` ({"cover_letter": full_text})
+    once the letter is saved to `cover_letters`, or `error` ({"detail": message}).
+    """
+    # Load inputs before the stream opens so a bad id or missing data gets a proper status code
     try:
         db = await get_database()
-        
-        # Get the job and resume
-        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
-        resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
-        
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        if not resume:
-            raise HTTPException(status_code=404, detail="Resume not found")
+        prompt_inputs, resume = await _load_cover_letter_inputs(db, job_id, email)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error generating cover letter: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    cache = LLMCache(db, "cover_letter", COVER_LETTER_PROMPT_VERSION)
+    
+    async def events():
+        try:
+            cover_letter = await cache.get(prompt_inputs)
+            if cover_letter is not None:
+                yield sse_event("token", {"text": cover_letter})
+            else:
+                chunks = []
+                context = await get_resume_context(resume, prompt_inputs["resume_text"])
+                prompt = build_cover_letter_prompt(
+                    **{**prompt_inputs, "resume_text": resume_prompt_text(context, prompt_inputs["resume_text"])}
+                )
+                async for text in stream_generation(prompt, "cover_letter", context):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+                cover_letter = "".join(chunks).strip()
+                if not cover_letter:
+                    raise Exception("No response received from Gemini")
+                await cache.put(prompt_inputs, cover_letter)
             
-        # Get enhancement suggestions
-        suggestions = await enhance_resume(
-            resume_text=resume.get("extracted_text", ""),
-            job_title=job.get("title", ""),
-            job_description=job.get("description", ""),
-            job_requirements=job.get("requirements", [])
-        )
+            await _save_cover_letter(db, email, job_id, resume, cover_letter)
+            yield sse_event("done", {"cover_letter": cover_letter})
+        except Exception as e:
+            print(f"Error streaming cover letter: {str(e)}")
+            yield sse_event("error", {"detail": f"Failed to generate cover letter: {str(e)}"})
+    
+    return sse_response(events())
+
+class CoverLetterBatchRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, max_length=20)
+
+@router.post("/jobs/cover-letters/{email}", dependencies=[Depends(llm_budget("cover_letter"))])
+async def stream_cover_letter_batch(email: str, request: CoverLetterBatchRequest):
+    """
+    Generate cover letters for a shortlist of jobs, streamed as server-sent events.
+
+    The user, resume and resume digest are loaded once and all jobs in one query; letters
+    are generated concurrently (COVER_LETTER_BATCH_CONCURRENCY at a time) and each is sent
+    as soon as it is ready: `letter` ({"job_id", "cover_letter"}) or `letter_error`
+    ({"job_id", "detail"}), in completion order, then `done` ({"completed", "failed"}).
+    """
+    db = await get_database()
+    user = await db.users.find_one({"email": email})
+    resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    job_ids = list(dict.fromkeys(request.job_ids))
+    object_ids = [_job_object_id(job_id) for job_id in job_ids]
+    found = await db.jobs.find(
+        {"_id": {"$in": object_ids}},
+        projection={"title": 1, "company": 1, "description": 1}
+    ).to_list(len(object_ids))
+    jobs_by_id = {str(job["_id"]): job for job in found}
+    
+    resume_text = await ensure_resume_digest(db, resume)
+    cache = LLMCache(db, "cover_letter", COVER_LETTER_PROMPT_VERSION)
+    semaphore = asyncio.Semaphore(max(COVER_LETTER_BATCH_CONCURRENCY, 1))
+    
+    async def letter_for(job_id: str) -> dict:
+        if job_id not in jobs_by_id:
+            return {"job_id": job_id, "error": "Job not found"}
+        prompt_inputs = _cover_letter_prompt_inputs(jobs_by_id[job_id], user, resume_text)
         
-        return suggestions
+        async def generate():
+            # One cached context per resume version, shared by every letter in the batch
+            context = await get_resume_context(resume, resume_text)
+            return await generate_cover_letter(**prompt_inputs, context=context)
         
+        try:
+            async with semaphore:
+                cover_letter = await cache.get_or_generate(prompt_inputs, generate)
+            await _save_cover_letter(db, email, job_id, resume, cover_letter)
+            return {"job_id": job_id, "cover_letter": cover_letter}
+        except Exception as e:
+            print(f"Error generating cover letter for job {job_id}: {str(e)}")
+            return {"job_id": job_id, "error": str(e)}
+    
+    async def events():
+        tasks = [asyncio.create_task(letter_for(job_id)) for job_id in job_ids]
+        completed, failed = 0, 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if "error" in result:
+                    failed += 1
+                    yield sse_event("letter_error", {"job_id": result["job_id"], "detail": result["error"]})
+                else:
+                    completed += 1
+                    yield sse_event("letter", result)
+            yield sse_event("done", {"completed": completed, "failed": failed})
+        finally:
+            # Client went away: stop generating the remaining letters
+            for task in tasks:
+                task.cancel()
+    
+    return sse_response(events())
+
+async def _load_enhancement_inputs(db, job_id: str, email: str):
+    """Prompt inputs for resume enhancement and the resume they came from; 400/404 for a bad id or missing data."""
+    job = await db.jobs.find_one({"_id": _job_object_id(job_id)})
+    resume = await db.resumes.find_one({"user_email": email}, sort=[("version", -1)])
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    prompt_inputs = {
+        "resume_text": await ensure_resume_digest(db, resume),
+        "job_title": job.get("title", ""),
+        "job_description": job.get("description", ""),
+        "job_requirements": job.get("requirements", [])
+    }
+    return prompt_inputs, resume
+
+async def _enhance_resume_task(db, payload: dict) -> dict:
+    """Get enhancement suggestions, reusing them for an unchanged job, resume and prompt."""
+    prompt_inputs, resume = await _load_enhancement_inputs(db, payload["job_id"], payload["email"])
+    cache = LLMCache(db, "enhance_resume", ENHANCE_RESUME_PROMPT_VERSION)
+    
+    async def generate():
+        context = await get_resume_context(resume, prompt_inputs["resume_text"])
+        return await enhance_resume(**prompt_inputs, context=context)
+    
+    return await cache.get_or_generate(prompt_inputs, generate)
+
+register_task_handler("enhance_resume", _enhance_resume_task)
+
+@router.post("/jobs/{job_id}/enhance-resume/{email}", dependencies=[Depends(llm_budget("enhance_resume"))])
+async def get_resume_enhancements(job_id: str, email: str):
+    """Get suggestions to enhance the resume for a specific job."""
+    try:
+        db = await get_database()
+        return await _enhance_resume_task(db, {"job_id": job_id, "email": email})
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error generating resume enhancements: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/jobs/{job_id}/enhance-resume/{email}/tasks", status_code=202, dependencies=[Depends(llm_budget("enhance_resume"))])
+async def submit_resume_enhancement_task(job_id: str, email: str):
+    """Queue resume enhancement; poll GET /api/tasks/{task_id} or subscribe to its events."""
+    db = await get_database()
+    await _load_enhancement_inputs(db, job_id, email)
+    task = await submit_task(db, "enhance_resume", {"job_id": job_id, "email": email}, user_email=email)
+    return task_view(task)
+
+@router.post("/jobs/{job_id}/enhance-resume/{email}/stream", dependencies=[Depends(llm_budget("enhance_resume"))])
+async def stream_resume_enhancements(job_id: str, email: str):
+    """
+    Stream resume enhancement suggestions as server-sent events.
+
+    `token` events carry the raw JSON text as it is generated; the final `done` event
+    carries the validated suggestions (any sections missing from the stream are
+    requested separately first), which are saved to `resume_enhancements`.
+    """
+    # Load inputs before the stream opens so a bad id or missing data gets a proper status code
+    try:
+        db = await get_database()
+        prompt_inputs, resume = await _load_enhancement_inputs(db, job_id, email)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error generating resume enhancements: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    cache = LLMCache(db, "enhance_resume", ENHANCE_RESUME_PROMPT_VERSION)
+    
+    async def events():
+        try:
+            suggestions = await cache.get(prompt_inputs)
+            if suggestions is None:
+                chunks = []
+                context = await get_resume_context(resume, prompt_inputs["resume_text"])
+                prompt = build_enhance_resume_prompt(
+                    **{**prompt_inputs, "resume_text": resume_prompt_text(context, prompt_inputs["resume_text"])}
+                )
+                async for text in stream_generation(
+                    prompt, "enhance_resume", context, generation_config=enhancement_generation_config()
+                ):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+                suggestions = await complete_enhancement("".join(chunks), **prompt_inputs, context=context)
+                await cache.put(prompt_inputs, suggestions)
+            
+            await db.resume_enhancements.replace_one(
+                {"_id": f"{email}:{job_id}"},
+                {
+                    "user_email": email,
+                    "job_id": job_id,
+                    "resume_id": resume["_id"],
+                    "resume_version": resume.get("version"),
+                    "suggestions": suggestions,
+                    "created_at": datetime.utcnow()
+                },
+                upsert=True
+            )
+            yield sse_event("done", {"suggestions": suggestions})
+        except Exception as e:
+            print(f"Error streaming resume enhancements: {str(e)}")
+            yield sse_event("error", {"detail": f"Failed to generate resume suggestions: {str(e)}"})
+    
+    return sse_response(events())
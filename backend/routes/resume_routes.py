@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from typing import Optional
-from  config import get_database
+from datetime import datetime
+from  config import get_database, RESUME_ANALYSIS_MODE
 from  services.resume_management import ResumeManagementService
-from  services.resume_analysis import ResumeAnalysisService
+from  services.resume_analysis import ResumeAnalysisService, RESUME_ANALYSIS_PROMPT_VERSION
+from  services.llm_cache import LLMCache
+from  services.resume_digest import ensure_resume_digest
+from  services.context_cache import get_resume_context
+from  services.task_queue import register_task_handler, submit_task, task_view
+from services.llm_usage import llm_budget
+from  utils.sse import sse_event, sse_response
 
 router = APIRouter()
 
@@ -39,58 +46,167 @@ async def extract_resume_text(
     resume_service = ResumeManagementService(db)
     return await resume_service.extract_text(email, version)
 
-@router.post("/{email}/analyze")
+async def _resume_analysis_task(db, payload: dict) -> dict:
+    """Analyze a resume version (latest by default) and store the analysis on it."""
+    email, version = payload["email"], payload.get("version")
+    
+    # First get the resume text
+    resume_service = ResumeManagementService(db)
+    resume = await resume_service.get_resume(email, version)
+    
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+        
+    # Get extracted text
+    query = {"user_email": email}
+    if version:
+        query["version"] = version
+        
+    resume_doc = await db["resumes"].find_one(
+        query,
+        sort=[("version", -1)]
+    )
+    if not resume_doc:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    extracted_text = resume_doc.get("extracted_text")
+    if not extracted_text:
+        # Try to extract text if not already extracted
+        extraction_result = await resume_service.extract_text(email, version)
+        extracted_text = extraction_result["text"]
+    resume_text = await ensure_resume_digest(db, resume_doc, extracted_text)
+        
+    # Perform AI analysis (reused for an unchanged resume digest and prompt version)
+    analysis_service = ResumeAnalysisService()
+    cache = LLMCache(db, "resume_analysis", RESUME_ANALYSIS_PROMPT_VERSION)
+    generated = False
+    
+    async def generate():
+        nonlocal generated
+        generated = True
+        context = await get_resume_context(resume_doc, resume_text)
+        return await analysis_service.analyze_resume(resume_text, context=context)
+    
+    analysis_result = await cache.get_or_generate(
+        {"resume_text": resume_text, "mode": RESUME_ANALYSIS_MODE},
+        generate
+    )
+    # A reused analysis keeps the analysis_date it was generated on
+    analysis_result["cached"] = not generated
+    
+    # Store the analysis in MongoDB
+    await db["resumes"].update_one(
+        {"_id": resume_doc["_id"]},
+        {"$set": {"ai_analysis": analysis_result}}
+    )
+    
+    return {
+        "status": "success",
+        "message": "Resume analysis completed successfully",
+        "analysis": analysis_result
+    }
+
+register_task_handler("resume_analysis", _resume_analysis_task)
+
+@router.post("/{email}/analyze", dependencies=[Depends(llm_budget("resume_analysis"))])
 async def analyze_resume(
     email: str, 
     version: Optional[int] = None, 
     db=Depends(get_database)
 ):
     try:
-        # First get the resume text
-        resume_service = ResumeManagementService(db)
-        resume = await resume_service.get_resume(email, version)
+        return await _resume_analysis_task(db, {"email": email, "version": version})
         
-        if not resume:
-            raise HTTPException(status_code=404, detail="Resume not found")
-            
-        # Get extracted text
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        error_msg = f"Resume analysis error: {str(e)}"
+        print(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@router.post("/{email}/analyze/tasks", status_code=202, dependencies=[Depends(llm_budget("resume_analysis"))])
+async def submit_resume_analysis_task(
+    email: str,
+    version: Optional[int] = None,
+    db=Depends(get_database)
+):
+    """Queue a resume analysis; poll GET /api/tasks/{task_id} or subscribe to its events."""
+    query = {"user_email": email}
+    if version:
+        query["version"] = version
+    resume_doc = await db["resumes"].find_one(query, projection={"_id": 1}, sort=[("version", -1)])
+    if not resume_doc:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    task = await submit_task(db, "resume_analysis", {"email": email, "version": version}, user_email=email)
+    return task_view(task)
+
+@router.post("/{email}/analyze/stream", dependencies=[Depends(llm_budget("resume_analysis"))])
+async def stream_resume_analysis(
+    email: str,
+    version: Optional[int] = None,
+    db=Depends(get_database)
+):
+    """
+    Stream the resume analysis as server-sent events.
+
+    The three sections are generated concurrently; `token` events carry
+    {"section": ..., "text": chunk}. The complete analysis is stored on the resume
+    before the final `done` event ({"analysis": ...}); failures emit `error`.
+    """
+    # Resolve the resume before the stream opens so failures get a proper status code
+    try:
         query = {"user_email": email}
         if version:
             query["version"] = version
-            
-        resume_doc = await db["resumes"].find_one(
-            query,
-            sort=[("version", -1)]
-        )
+        resume_doc = await db["resumes"].find_one(query, sort=[("version", -1)])
+        if not resume_doc:
+            raise HTTPException(status_code=404, detail="Resume not found")
         
         extracted_text = resume_doc.get("extracted_text")
         if not extracted_text:
             # Try to extract text if not already extracted
-            extraction_result = await resume_service.extract_text(email, version)
+            extraction_result = await ResumeManagementService(db).extract_text(email, version)
             extracted_text = extraction_result["text"]
-            
-        # Perform AI analysis
-        analysis_service = ResumeAnalysisService()
-        analysis_result = await analysis_service.analyze_resume(extracted_text)
-        
-        # Store the analysis in MongoDB
-        await db["resumes"].update_one(
-            {"_id": resume_doc["_id"]},
-            {"$set": {"ai_analysis": analysis_result}}
-        )
-        
-        return {
-            "status": "success",
-            "message": "Resume analysis completed successfully",
-            "analysis": analysis_result
-        }
-        
-    except HTTPException as he:
-        raise he
+        resume_text = await ensure_resume_digest(db, resume_doc, extracted_text)
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = f"Resume analysis error: {str(e)}"
         print(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
+    
+    analysis_service = ResumeAnalysisService()
+    # Streaming uses the per-section prompts, so it shares cache entries with "sections" mode
+    cache = LLMCache(db, "resume_analysis", RESUME_ANALYSIS_PROMPT_VERSION)
+    cache_inputs = {"resume_text": resume_text, "mode": "sections"}
+    
+    async def events():
+        sections = {"resume_feedback": [], "upskilling_suggestions": [], "matching_roles": []}
+        try:
+            analysis_result = await cache.get(cache_inputs)
+            if analysis_result is not None:
+                # A reused analysis keeps the analysis_date it was generated on
+                analysis_result["cached"] = True
+            else:
+                context = await get_resume_context(resume_doc, resume_text)
+                async for section, text in analysis_service.stream_analysis(resume_text, context=context):
+                    sections[section].append(text)
+                    yield sse_event("token", {"section": section, "text": text})
+                
+                analysis_result = {section: "".join(chunks) for section, chunks in sections.items()}
+                analysis_result.update({"analysis_date": datetime.utcnow(), "analysis_mode": "sections"})
+                await cache.put(cache_inputs, analysis_result)
+                analysis_result["cached"] = False
+            await db["resumes"].update_one(
+                {"_id": resume_doc["_id"]},
+                {"$set": {"ai_analysis": analysis_result}}
+            )
+            yield sse_event("done", {"analysis": analysis_result})
+        except Exception as e:
+            print(f"Resume analysis stream error: {str(e)}")
+            yield sse_event("error", {"detail": f"Resume analysis error: {str(e)}"})
+    
+    return sse_response(events())
 
 @router.get("/{email}/latest-analysis")
 async def get_latest_analysis(
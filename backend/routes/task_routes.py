@@ -0,0 +1,53 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends
+from config import get_database
+from services.task_queue import get_task, task_view
+from utils.sse import sse_event, sse_response
+
+router = APIRouter()
+
+EVENT_POLL_INTERVAL_S = 1.0
+
+
+@router.get("/{task_id}")
+async def get_task_status(task_id: str, db=Depends(get_database)):
+    """Status of a queued AI task, with its result once it has succeeded."""
+    task = await get_task(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task_view(task)
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(task_id: str, db=Depends(get_database)):
+    """
+    Follow a task as server-sent events.
+
+    Emits a `status` event whenever the status or attempt count changes, then `done`
+    (the task, including its result) or `error` ({"detail": message}) and closes.
+    """
+    task = await get_task(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def events():
+        current = task
+        last_seen = None
+        while True:
+            view = task_view(current)
+            if (view["status"], view["attempts"]) != last_seen:
+                last_seen = (view["status"], view["attempts"])
+                yield sse_event("status", {"status": view["status"], "attempts": view["attempts"]})
+            if view["status"] == "succeeded":
+                yield sse_event("done", view)
+                return
+            if view["status"] == "failed":
+                yield sse_event("error", {"detail": view["error"]})
+                return
+            await asyncio.sleep(EVENT_POLL_INTERVAL_S)
+            current = await get_task(db, task_id)
+            if not current:
+                yield sse_event("error", {"detail": "Task expired"})
+                return
+
+    return sse_response(events())
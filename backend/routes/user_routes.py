@@ -1,6 +1,11 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from pydantic import BaseModel, EmailStr
-from  config import get_database
+from  config import get_database, RESUME_ANALYSIS_MODE
+from services.resume_analysis import ResumeAnalysisService, RESUME_ANALYSIS_PROMPT_VERSION
+from services.llm_cache import LLMCache
+from services.resume_digest import ensure_resume_digest
+from services.context_cache import get_resume_context
+from services.llm_usage import llm_budget, llm_budget_status
 from typing import Dict, Optional
 from google.cloud import storage
 from google.cloud import vision
@@ -9,7 +14,6 @@ import time
 from datetime import datetime
 import io
 from PyPDF2 import PdfReader
-import google.generativeai as genai
 from dotenv import load_dotenv
 from google.oauth2 import service_account
 
@@ -36,12 +40,6 @@ try:
     storage_client = storage.Client(credentials=credentials)
     vision_client = vision.ImageAnnotatorClient(credentials=credentials)
     
-    # Initialize Gemini
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        raise Exception("GEMINI_API_KEY not found in environment variables")
-    genai.configure(api_key=api_key)
-    
     # Initialize other Google Cloud services
     project_id = os.getenv('GOOGLE_CLOUD_PROJECT')  # job-assist-460920
     location = os.getenv('GOOGLE_CLOUD_LOCATION')   # us-central1
@@ -186,6 +184,19 @@ async def get_user_profile(email: str, db=Depends(get_database)):
         print(f"Get profile error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+# Today's LLM usage and remaining budget
+@router.get("/{email}/llm-usage")
+async def get_llm_usage(email: str, db=Depends(get_database)):
+    """Gemini calls, tokens, estimated cost and time per endpoint for the current UTC day."""
+    budget = await llm_budget_status(db, email)
+    return {
+        "status": "success",
+        "endpoints": budget["endpoints"],
+        "tokens_used": budget["tokens_used"],
+        "token_budget": budget["token_budget"],
+        "budget_exceeded": budget["exceeded"] is not None
+    }
+
 # Update user preferences endpoint
 @router.put("/{email}")
 async def update_user_preferences(email: str, request: UpdateUserRequest, db=Depends(get_database)):
@@ -520,36 +531,7 @@ async def extract_resume_text(email: str, version: Optional[int] = None, db=Depe
         print(f"Text extraction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-async def get_ai_analysis(prompt: str, analysis_type: str) -> str:
-    """Helper function to handle AI text generation with retries"""
-    max_retries = 3
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
-        try:
-            print(f"Attempting {analysis_type} analysis with Gemini, attempt {attempt + 1}")
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro")
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.2,
-                    max_output_tokens=2048,
-                    top_k=40,
-                    top_p=0.8,
-                )
-            )
-            if not response or not response.text:
-                raise Exception(f"Empty response received for {analysis_type}")
-            return response.text
-        except Exception as e:
-            print(f"Error in {analysis_type} analysis attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:  # Last attempt
-                raise Exception(f"Failed {analysis_type} analysis after {max_retries} attempts: {str(e)}")
-            time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-    
-    raise Exception(f"Failed to get {analysis_type} analysis after all retries")
-
-@router.post("/resume/{email}/analyze")
+@router.post("/resume/{email}/analyze", dependencies=[Depends(llm_budget("resume_analysis"))])
 async def analyze_resume(email: str, version: Optional[int] = None, db=Depends(get_database)):
     try:
         print(f"Starting resume analysis for email: {email}, version: {version}")
@@ -580,77 +562,25 @@ async def analyze_resume(email: str, version: Optional[int] = None, db=Depends(g
             raise HTTPException(status_code=400, detail="No extracted text found. Please extract text from the resume first.")
         
         print(f"Found resume text of length: {len(extracted_text)}")
-        
-        # Prepare prompts for different analyses
-        resume_feedback_prompt = f"""
-        You are an expert resume reviewer and career counselor. Please analyze the following resume and provide detailed feedback.
-        Focus on being specific, actionable, and constructive in your feedback.
-        
-        Resume text:
-        {extracted_text}
-        
-        Please provide:
-        1. Overall feedback on the resume structure and content
-        2. Specific suggestions for improvement
-        3. Key strengths identified
-        4. Areas that need enhancement
-        
-        Format your response in clear sections with bullet points.
-        Keep the response concise but informative.
-        """
-        
-        upskilling_prompt = f"""
-        You are a career development expert. Based on the following resume, suggest upskilling opportunities that would enhance this person's career prospects.
-        Focus on current industry trends and in-demand skills.
-        
-        Resume text:
-        {extracted_text}
-        
-        Please provide:
-        1. Technical skills that could be added or improved
-        2. Specific courses or certifications recommended
-        3. Emerging technologies or skills relevant to their field
-        4. Soft skills that could enhance their profile
-        
-        Format your response in clear sections with bullet points.
-        Keep the response concise but informative.
-        """
-        
-        matching_roles_prompt = f"""
-        You are a job market expert. Based on the following resume, suggest the most suitable roles that match this person's skills and experience.
-        Focus on roles that offer growth potential and align with current market demands.
-        
-        Resume text:
-        {extracted_text}
-        
-        Please provide:
-        1. Top 5 job roles that best match their skills and experience
-        2. Required skills they already have for each role
-        3. Additional skills needed for each role
-        4. Potential career progression paths
-        
-        Format your response in clear sections with bullet points.
-        Keep the response concise but informative.
-        """
+        resume_text = await ensure_resume_digest(db, resume, extracted_text)
         
         try:
-            # Get responses from Gemini with retries
-            print("Starting resume feedback analysis...")
-            resume_feedback = await get_ai_analysis(resume_feedback_prompt, "resume feedback")
-            
-            print("Starting upskilling suggestions analysis...")
-            upskilling_suggestions = await get_ai_analysis(upskilling_prompt, "upskilling")
+            # Feedback, upskilling and matching roles run concurrently in the analysis service
+            cache = LLMCache(db, "resume_analysis", RESUME_ANALYSIS_PROMPT_VERSION)
+            generated = False
             
-            print("Starting matching roles analysis...")
-            matching_roles = await get_ai_analysis(matching_roles_prompt, "matching roles")
+            async def generate():
+                nonlocal generated
+                generated = True
+                context = await get_resume_context(resume, resume_text)
+                return await ResumeAnalysisService().analyze_resume(resume_text, context=context)
             
-            # Store the analysis in MongoDB
-            analysis_result = {
-                "resume_feedback": resume_feedback,
-                "upskilling_suggestions": upskilling_suggestions,
-                "matching_roles": matching_roles,
-                "analysis_date": datetime.utcnow()
-            }
+            analysis_result = await cache.get_or_generate(
+                {"resume_text": resume_text, "mode": RESUME_ANALYSIS_MODE},
+                generate
+            )
+            # A reused analysis keeps the analysis_date it was generated on
+            analysis_result["cached"] = not generated
             
             print("Storing analysis results in MongoDB...")
             await resumes_collection.update_one(
@@ -0,0 +1,210 @@
+"""
+Score every user's latest resume against every job and store each user's top-K matches.
+
+Resume and job embeddings are streamed from MongoDB into float32 NumPy matrices and
+scored with blocked matrix products sized to fit a fixed memory budget. Results are
+written in bulk to the `job_matches` collection (one document per user), which also
+answers "which users match this job" through its matches.job_id index.
+
+Usage: python scripts/batch_score_matches.py [--top-k 50] [--memory-mb 2048]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+from pymongo import MongoClient
+from pymongo.operations import ReplaceOne
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from services.embedding_service import EmbeddingService
+
+EMBEDDING_DIM = EmbeddingService.TARGET_EMBEDDING_DIM
+JOB_BLOCK_SIZE = 8192  # columns per score block
+WRITE_BATCH_SIZE = 1000
+FLOAT_BYTES = np.dtype(np.float32).itemsize
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place so a dot product is cosine similarity."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def load_job_matrix(db):
+    """Stream every job embedding into a normalized (n_jobs, dim) float32 matrix."""
+    query = {"embedding.%d" % (EMBEDDING_DIM - 1): {"$exists": True}}
+    total = db.jobs.count_documents(query)
+    matrix = np.empty((total, EMBEDDING_DIM), dtype=np.float32)
+    job_ids = []
+    for row, job in enumerate(db.jobs.find(query, projection={"embedding": 1}, batch_size=500)):
+        if row >= total:
+            break  # jobs inserted while streaming are picked up next run
+        matrix[row] = job["embedding"][:EMBEDDING_DIM]
+        job_ids.append(job["_id"])
+    matrix = matrix[:len(job_ids)]
+    return normalize_rows(matrix), job_ids
+
+
+def latest_resume_ids(db) -> list:
+    """Return [(user_email, resume_id, version)] for each user's latest resume that has an embedding."""
+    pipeline = [
+        {"$match": {"embedding": {"$type": "array"}}},
+        {"$sort": {"user_email": 1, "version": -1}},
+        {"$group": {"_id": "$user_email", "resume_id": {"$first": "$_id"}, "version": {"$first": "$version"}}}
+    ]
+    return [
+        (entry["_id"], entry["resume_id"], entry["version"])
+        for entry in db.resumes.aggregate(pipeline, allowDiskUse=True)
+    ]
+
+
+def resume_block_size(memory_budget_bytes: int, job_matrix_bytes: int, top_k: int) -> int:
+    """Rows per resume block so the job matrix, a resume block, its score block and top-K state fit the budget."""
+    remaining = memory_budget_bytes - job_matrix_bytes
+    # resume row + score row + merged score/column rows + argpartition's int64 index row
+    # + running top-K scores/columns (old and new while merging)
+    merged = JOB_BLOCK_SIZE + top_k
+    per_row = (
+        (EMBEDDING_DIM + JOB_BLOCK_SIZE + merged) * FLOAT_BYTES
+        + merged * 8 * 2
+        + top_k * (FLOAT_BYTES + 8) * 2
+    )
+    rows = remaining // per_row
+    if rows < 1:
+        raise MemoryError(
+            f"Job matrix needs {job_matrix_bytes / 2**20:.0f} MB; raise --memory-mb above that"
+        )
+    return int(min(rows, 16384))
+
+
+def top_k_for_block(resume_block: np.ndarray, job_matrix: np.ndarray, top_k: int, excluded: dict):
+    """
+    Return (scores, columns) of the top_k jobs for every row of resume_block.
+
+    Jobs are scored JOB_BLOCK_SIZE columns at a time; each row keeps a running top-K that
+    is merged with every new block via argpartition (a vectorized per-row heap).
+    `excluded` maps row -> array of job columns the user already applied to.
+    """
+    rows = resume_block.shape[0]
+    k = min(top_k, job_matrix.shape[0])
+    best_scores = np.full((rows, k), -np.inf, dtype=np.float32)
+    best_columns = np.zeros((rows, k), dtype=np.int64)
+
+    for start in range(0, job_matrix.shape[0], JOB_BLOCK_SIZE):
+        end = min(start + JOB_BLOCK_SIZE, job_matrix.shape[0])
+        scores = resume_block @ job_matrix[start:end].T
+        for row, columns in excluded.items():
+            in_block = columns[(columns >= start) & (columns < end)] - start
+            scores[row, in_block] = -np.inf
+
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_columns = np.concatenate(
+            [best_columns, np.broadcast_to(np.arange(start, end), scores.shape)], axis=1
+        )
+        keep = np.argpartition(merged_scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_columns = np.take_along_axis(merged_columns, keep, axis=1)
+        # Free this block's temporaries before the next product so two blocks are never alive at once
+        del scores, merged_scores, merged_columns, keep
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_columns, order, axis=1)
+
+
+def batch_score(top_k: int = 50, memory_mb: int = 2048):
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("Error: MONGO_URI environment variable is not set")
+        return
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client['jobsearch']
+        started = time.perf_counter()
+
+        job_matrix, job_ids = load_job_matrix(db)
+        job_column = {str(job_id): column for column, job_id in enumerate(job_ids)}
+        print(f"Loaded {len(job_ids)} job embeddings ({job_matrix.nbytes / 2**20:.0f} MB)")
+        if not job_ids:
+            return
+
+        resumes = latest_resume_ids(db)
+        block_rows = resume_block_size(memory_mb * 2**20, job_matrix.nbytes, top_k)
+        print(f"Scoring {len(resumes)} resumes in blocks of {block_rows} (budget {memory_mb} MB)")
+
+        db.job_matches.create_index("matches.job_id")
+        scored_at = datetime.now(timezone.utc)
+        written = 0
+
+        for block_start in range(0, len(resumes), block_rows):
+            block = resumes[block_start:block_start + block_rows]
+            resume_rows = {resume_id: row for row, (_, resume_id, _) in enumerate(block)}
+
+            # Stream this block's embeddings; resumes that vanished since listing keep a zero row
+            resume_block = np.zeros((len(block), EMBEDDING_DIM), dtype=np.float32)
+            for resume in db.resumes.find({"_id": {"$in": list(resume_rows)}}, projection={"embedding": 1}):
+                resume_block[resume_rows[resume["_id"]]] = resume["embedding"][:EMBEDDING_DIM]
+            normalize_rows(resume_block)
+
+            # Mask jobs each user already applied to
+            emails = [email for email, _, _ in block]
+            email_rows = {email: row for row, email in enumerate(emails)}
+            excluded = {}
+            for user in db.users.find({"email": {"$in": emails}, "applied_jobs.0": {"$exists": True}},
+                                      projection={"email": 1, "applied_jobs": 1}):
+                columns = [job_column[job_id] for job_id in user["applied_jobs"] if job_id in job_column]
+                if columns:
+                    excluded[email_rows[user["email"]]] = np.array(columns, dtype=np.int64)
+
+            scores, columns = top_k_for_block(resume_block, job_matrix, top_k, excluded)
+
+            writes = []
+            for row, (email, resume_id, version) in enumerate(block):
+                if not resume_block[row].any():
+                    continue
+                matches = [
+                    {"job_id": str(job_ids[column]), "score": round(float(score) * 100, 1)}
+                    for score, column in zip(scores[row], columns[row])
+                    if np.isfinite(score)
+                ]
+                writes.append(ReplaceOne(
+                    {"_id": email},
+                    {
+                        "resume_id": resume_id,
+                        "resume_version": version,
+                        "matches": matches,
+                        "scored_at": scored_at
+                    },
+                    upsert=True
+                ))
+                if len(writes) >= WRITE_BATCH_SIZE:
+                    db.job_matches.bulk_write(writes, ordered=False)
+                    written += len(writes)
+                    writes = []
+            if writes:
+                db.job_matches.bulk_write(writes, ordered=False)
+                written += len(writes)
+
+            elapsed = time.perf_counter() - started
+            print(f"Progress: {written}/{len(resumes)} users scored ({elapsed:.1f}s)")
+
+        print(f"\nFinished scoring {written} users against {len(job_ids)} jobs in {time.perf_counter() - started:.1f}s")
+
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=50, help="Matches to keep per user")
+    parser.add_argument("--memory-mb", type=int, default=2048, help="Memory budget for matrices")
+    args = parser.parse_args()
+    batch_score(top_k=args.top_k, memory_mb=args.memory_mb)
@@ -0,0 +1,87 @@
+"""
+Benchmark the vectorized re-ranking stage at several candidate counts.
+
+Compares the per-job Python blend previously used in vector_search_jobs (cosine over
+embedding lists plus skill overlap) with cosine as one matrix product followed by
+build_feature_matrix and rerank_scores.
+
+Usage: python scripts/benchmark_reranking.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from services.embedding_service import EmbeddingService
+from services.reranking import build_feature_matrix, rerank_scores
+
+CANDIDATE_COUNTS = [20, 80, 400, 2000, 10000]
+EMBEDDING_DIM = EmbeddingService.TARGET_EMBEDDING_DIM
+LOCATIONS = ["Austin, TX", "Seattle, WA", "New York, NY", "Remote", "San Francisco, CA", "Denver, CO"]
+PREFERENCES = {"desiredLocation": "Austin, TX; Seattle", "workType": "hybrid", "willRelocate": False}
+REPEATS = 5
+
+
+def python_blend(job_embeddings, resume_embedding, skill_overlaps):
+    """The per-job loop previously inlined in vector_search_jobs."""
+    scores = []
+    for job_embedding, overlap in zip(job_embeddings, skill_overlaps):
+        dot_product = sum(a * b for a, b in zip(job_embedding, resume_embedding))
+        job_norm = sum(x * x for x in job_embedding) ** 0.5
+        resume_norm = sum(x * x for x in resume_embedding) ** 0.5
+        match_score = round((dot_product / (job_norm * resume_norm)) * 100, 1)
+        if overlap is not None:
+            match_score = round(match_score * 0.7 + overlap * 100 * 0.3, 1)
+        scores.append(match_score)
+    return scores
+
+
+def vectorized_rerank(job_matrix, resume_embedding, skill_overlaps, posted_dates, locations):
+    resume_unit = np.asarray(resume_embedding, dtype=np.float32)
+    resume_unit /= np.linalg.norm(resume_unit)
+    similarities = (job_matrix @ resume_unit) / np.linalg.norm(job_matrix, axis=1)
+    features = build_feature_matrix(similarities, skill_overlaps, posted_dates, locations, PREFERENCES)
+    return rerank_scores(features)
+
+
+def best_of(function, *args, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    np_rng = np.random.default_rng(42)
+    now = datetime.now(timezone.utc)
+    resume_embedding = np_rng.normal(size=EMBEDDING_DIM).astype(np.float32).tolist()
+
+    print(f"{'candidates':>10} {'python ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for count in CANDIDATE_COUNTS:
+        job_matrix = np_rng.normal(size=(count, EMBEDDING_DIM)).astype(np.float32)
+        skill_overlaps = [None if rng.random() < 0.1 else rng.random() for _ in range(count)]
+        posted_dates = [now - timedelta(days=rng.uniform(0, 60)) for _ in range(count)]
+        locations = [rng.choice(LOCATIONS) for _ in range(count)]
+
+        # Only time the Python loop where it finishes in reasonable time
+        python_seconds = None
+        if count <= 2000:
+            job_embeddings = job_matrix.tolist()
+            python_seconds = best_of(python_blend, job_embeddings, resume_embedding, skill_overlaps, repeats=1)
+        vectorized_seconds = best_of(
+            vectorized_rerank, job_matrix, resume_embedding, skill_overlaps, posted_dates, locations
+        )
+
+        python_ms = f"{python_seconds * 1000:>10.1f}" if python_seconds else f"{'-':>10}"
+        speedup = f"{python_seconds / vectorized_seconds:>7.1f}x" if python_seconds else f"{'-':>8}"
+        print(f"{count:>10} {python_ms} {vectorized_seconds * 1000:>14.2f} {speedup}")
@@ -0,0 +1,78 @@
+"""
+Compare token usage and latency of the two resume analysis modes against Gemini.
+
+"sections" sends the resume in three separate prompts; "structured" sends it once and
+asks for all three sections as schema-constrained JSON. Reads the resume text from a
+file, or the latest extracted resume of a user in MongoDB.
+
+Usage: python scripts/benchmark_resume_analysis.py (--resume-file resume.txt | --email user@example.com) [--runs 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pymongo import MongoClient
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from services.resume_analysis import ResumeAnalysisService
+
+MODES = ["sections", "structured"]
+
+
+def load_resume_text(resume_file: str, email: str) -> str:
+    if resume_file:
+        with open(resume_file) as f:
+            return f.read()
+    client = MongoClient(os.getenv('MONGO_URI'))
+    try:
+        resume = client['jobsearch'].resumes.find_one(
+            {"user_email": email, "extracted_text": {"$exists": True}},
+            sort=[("version", -1)]
+        )
+        return resume["extracted_text"] if resume else ""
+    finally:
+        client.close()
+
+
+async def benchmark(extracted_text: str, runs: int):
+    results = {}
+    for mode in MODES:
+        latencies, usages, fallbacks = [], [], 0
+        for _ in range(runs):
+            service = ResumeAnalysisService()
+            start = time.perf_counter()
+            analysis = await service.analyze_resume(extracted_text, mode=mode)
+            latencies.append(time.perf_counter() - start)
+            usages.append(service.usage)
+            if analysis.get("analysis_mode") != mode:
+                fallbacks += 1
+        results[mode] = (latencies, usages, fallbacks)
+
+    print(f"\n{'mode':>10} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'median s':>9} {'max s':>7} {'fallbacks':>10}")
+    for mode, (latencies, usages, fallbacks) in results.items():
+        print(f"{mode:>10} {statistics.mean(u['calls'] for u in usages):>6.1f} "
+              f"{statistics.mean(u['prompt_tokens'] for u in usages):>11.0f} "
+              f"{statistics.mean(u['output_tokens'] for u in usages):>11.0f} "
+              f"{statistics.median(latencies):>9.2f} {max(latencies):>7.2f} {fallbacks:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--resume-file", help="Plain-text resume to analyze")
+    source.add_argument("--email", help="Use this user's latest extracted resume from MongoDB")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode")
+    args = parser.parse_args()
+
+    text = load_resume_text(args.resume_file, args.email)
+    if not text:
+        print("Error: no resume text found")
+        sys.exit(1)
+    print(f"Resume text: {len(text)} characters, {args.runs} runs per mode")
+    asyncio.run(benchmark(text, args.runs))
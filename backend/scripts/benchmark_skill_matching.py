@@ -0,0 +1,79 @@
+"""
+Benchmark the indexed SkillMatcher against the original nested substring loop.
+
+Usage: python scripts/benchmark_skill_matching.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+# Add the parent directory to sys.path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from utils.skill_matching import SkillMatcher
+
+# (resume skills, skills per job, jobs scored per request)
+SCENARIOS = [
+    (30, 15, 20),
+    (200, 40, 80),
+    (1000, 100, 80),
+    (5000, 200, 80),
+]
+
+
+def random_skill(rng: random.Random) -> str:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8))) for _ in range(rng.randint(1, 3))]
+    return " ".join(words)
+
+
+def naive_match(job_skills, resume_skills):
+    """The substring loop previously inlined in vector_search_jobs."""
+    resume_skills = [skill.lower().strip() for skill in resume_skills if skill]
+    exact_matches = set(job_skills) & set(resume_skills)
+    partial_matches = set()
+    for job_skill in job_skills:
+        for resume_skill in resume_skills:
+            if (job_skill in resume_skill or resume_skill in job_skill) and \
+               job_skill not in exact_matches and \
+               resume_skill not in exact_matches:
+                partial_matches.add(job_skill)
+    return exact_matches, partial_matches
+
+
+def run_scenario(resume_size: int, job_size: int, job_count: int, rng: random.Random):
+    vocabulary = [random_skill(rng) for _ in range(resume_size * 2)]
+    resume_skills = rng.sample(vocabulary, resume_size)
+    jobs = []
+    for _ in range(job_count):
+        skills = rng.sample(vocabulary, job_size)
+        # Sprinkle in fragments and supersets so partial matches actually occur
+        skills += [skill.split(" ")[0] for skill in rng.sample(resume_skills, min(5, resume_size))]
+        skills += [f"{skill} advanced" for skill in rng.sample(resume_skills, min(5, resume_size))]
+        jobs.append(skills)
+
+    start = time.perf_counter()
+    naive_results = [naive_match(job_skills, resume_skills) for job_skills in jobs]
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(resume_skills)
+    indexed_results = [matcher.match(job_skills) for job_skills in jobs]
+    indexed_seconds = time.perf_counter() - start
+
+    for (naive_exact, naive_partial), (exact, partial) in zip(naive_results, indexed_results):
+        assert naive_exact == set(exact) and naive_partial == set(partial), "SkillMatcher disagrees with the substring loop"
+
+    return naive_seconds, indexed_seconds
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    print(f"{'resume':>7} {'job':>5} {'jobs':>5} {'naive ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for resume_size, job_size, job_count in SCENARIOS:
+        naive_seconds, indexed_seconds = run_scenario(resume_size, job_size, job_count, rng)
+        print(f"{resume_size:>7} {job_size:>5} {job_count:>5} {naive_seconds * 1000:>10.1f} "
+              f"{indexed_seconds * 1000:>11.1f} {naive_seconds / indexed_seconds:>7.1f}x")
@@ -0,0 +1,220 @@
+"""
+Cluster job embeddings into role families with mini-batch spherical k-means.
+
+Writes:
+  - jobs.cluster_id for every job with an embedding
+  - job_clusters: one document per cluster with its centroid, a label derived from
+    member titles, top skills, and the members nearest the centroid (denormalized)
+
+The centroids serve as an IVF-style coarse filter for vector search (nprobe) and the
+member lists back the browse-by-role-family endpoints. Use --assign-only between full
+runs to place newly embedded jobs into the existing clusters.
+
+Usage: python scripts/cluster_jobs.py [--clusters 0] [--assign-only]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+import numpy as np
+from pymongo import MongoClient
+from pymongo.operations import ReplaceOne, UpdateMany
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from scripts.batch_score_matches import JOB_BLOCK_SIZE, WRITE_BATCH_SIZE, load_job_matrix, normalize_rows
+from scripts.precompute_similar_jobs import job_summaries
+from utils.skill_taxonomy import skill_names
+
+BATCH_SIZE = 1024
+ITERATIONS = 200
+MEMBERS_PER_CLUSTER = 200  # nearest jobs stored for browsing
+TOP_SKILLS = 8
+SENIORITY_WORDS = re.compile(r"\b(senior|sr|junior|jr|lead|staff|principal|entry level|mid level|intern|i{1,3}|iv)\b\.?")
+
+
+def kmeans_plus_plus(sample: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding on unit vectors, using cosine distance."""
+    centroids = [sample[rng.integers(len(sample))]]
+    distances = 1.0 - sample @ centroids[0]
+    for _ in range(1, k):
+        weights = np.clip(distances, 0, None) ** 2
+        total = weights.sum()
+        index = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[index])
+        distances = np.minimum(distances, 1.0 - sample @ sample[index])
+    return np.array(centroids, dtype=np.float32)
+
+
+def minibatch_kmeans(matrix: np.ndarray, k: int, batch_size: int = BATCH_SIZE,
+                     iterations: int = ITERATIONS, seed: int = 42) -> np.ndarray:
+    """
+    Mini-batch k-means (Sculley, 2010) on L2-normalized rows; centroids are re-normalized
+    after every step so assignment by dot product is assignment by cosine similarity.
+    """
+    rng = np.random.default_rng(seed)
+    sample = matrix[rng.choice(len(matrix), size=min(len(matrix), max(batch_size, 20 * k)), replace=False)]
+    centroids = kmeans_plus_plus(sample, k, rng)
+    counts = np.zeros(k, dtype=np.int64)
+
+    for _ in range(iterations):
+        batch = matrix[rng.choice(len(matrix), size=min(batch_size, len(matrix)), replace=False)]
+        labels = np.argmax(batch @ centroids.T, axis=1)
+        for cluster in np.unique(labels):
+            members = batch[labels == cluster]
+            counts[cluster] += len(members)
+            # Per-center learning rate 1/count, applied to the batch mean
+            rate = len(members) / counts[cluster]
+            centroids[cluster] = (1 - rate) * centroids[cluster] + rate * members.mean(axis=0)
+        normalize_rows(centroids)
+    return centroids
+
+
+def assign_clusters(matrix: np.ndarray, centroids: np.ndarray):
+    """Nearest centroid and its cosine similarity for every row, computed in blocks."""
+    labels = np.empty(len(matrix), dtype=np.int64)
+    similarity = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), JOB_BLOCK_SIZE):
+        scores = matrix[start:start + JOB_BLOCK_SIZE] @ centroids.T
+        labels[start:start + JOB_BLOCK_SIZE] = np.argmax(scores, axis=1)
+        similarity[start:start + JOB_BLOCK_SIZE] = np.max(scores, axis=1)
+    return labels, similarity
+
+
+def cluster_label(titles: list) -> str:
+    """Most common member title with seniority words stripped, e.g. 'Data Engineer'."""
+    normalized = Counter()
+    for title in titles:
+        title = SENIORITY_WORDS.sub(" ", (title or "").lower())
+        title = " ".join(re.sub(r"[^a-z0-9+#/ ]", " ", title).split())
+        if title:
+            normalized[title] += 1
+    return normalized.most_common(1)[0][0].title() if normalized else "Other"
+
+
+def write_cluster_ids(db, job_ids: list, labels: np.ndarray, clustering_id: str):
+    """Set jobs.cluster_id with one update_many per cluster chunk instead of one write per job."""
+    writes = []
+    for cluster in np.unique(labels):
+        members = [job_ids[row] for row in np.flatnonzero(labels == cluster)]
+        for start in range(0, len(members), WRITE_BATCH_SIZE):
+            writes.append(UpdateMany(
+                {"_id": {"$in": members[start:start + WRITE_BATCH_SIZE]}},
+                {"$set": {"cluster_id": int(cluster), "clustering_id": clustering_id}}
+            ))
+    for start in range(0, len(writes), 100):
+        db.jobs.bulk_write(writes[start:start + 100], ordered=False)
+
+
+def load_centroids(db):
+    """Existing centroid table as (cluster_ids, normalized centroid matrix, clustering_id)."""
+    clusters = list(db.job_clusters.find({}, projection={"centroid": 1, "clustering_id": 1}).sort("_id", 1))
+    if not clusters:
+        return None, None, None
+    centroids = normalize_rows(np.array([cluster["centroid"] for cluster in clusters], dtype=np.float32))
+    return np.array([cluster["_id"] for cluster in clusters]), centroids, clusters[0].get("clustering_id")
+
+
+def assign_new_jobs(db, job_matrix, job_ids):
+    """Place jobs without a cluster_id into the nearest existing cluster."""
+    cluster_ids, centroids, clustering_id = load_centroids(db)
+    if centroids is None:
+        print("No clusters found; run a full clustering first")
+        return
+    unassigned = {job["_id"] for job in db.jobs.find({"cluster_id": {"$exists": False}}, projection={"_id": 1})}
+    rows = [row for row, job_id in enumerate(job_ids) if job_id in unassigned]
+    if not rows:
+        print("All jobs already have a cluster")
+        return
+    labels, _ = assign_clusters(job_matrix[rows], centroids)
+    write_cluster_ids(db, [job_ids[row] for row in rows], cluster_ids[labels], clustering_id)
+    for cluster, count in Counter(cluster_ids[labels].tolist()).items():
+        db.job_clusters.update_one({"_id": cluster}, {"$inc": {"size": count}})
+    print(f"Assigned {len(rows)} new jobs to existing clusters")
+
+
+def cluster_jobs(k: int = 0, assign_only: bool = False):
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("Error: MONGO_URI environment variable is not set")
+        return
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client['jobsearch']
+        started = time.perf_counter()
+        db.jobs.create_index("cluster_id")
+
+        job_matrix, job_ids = load_job_matrix(db)
+        print(f"Loaded {len(job_ids)} job embeddings ({job_matrix.nbytes / 2**20:.0f} MB)")
+        if assign_only:
+            assign_new_jobs(db, job_matrix, job_ids)
+            return
+
+        k = k or int(np.clip(round(np.sqrt(len(job_ids) / 2)), 2, 256))
+        if len(job_ids) < k:
+            print(f"Need at least {k} jobs with embeddings to build {k} clusters")
+            return
+
+        centroids = minibatch_kmeans(job_matrix, k)
+        labels, similarity = assign_clusters(job_matrix, centroids)
+        print(f"Clustered into {k} clusters in {time.perf_counter() - started:.1f}s")
+
+        clustering_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        write_cluster_ids(db, job_ids, labels, clustering_id)
+
+        details = {
+            job["_id"]: job
+            for job in db.jobs.find({}, projection={"title": 1, "skill_ids": 1})
+        }
+        writes = []
+        computed_at = datetime.now(timezone.utc)
+        for cluster in range(k):
+            rows = np.flatnonzero(labels == cluster)
+            if not len(rows):
+                continue
+            nearest = rows[np.argsort(-similarity[rows])[:MEMBERS_PER_CLUSTER]]
+            member_ids = [str(job_ids[row]) for row in nearest]
+            summaries = job_summaries(db, member_ids)
+            skill_counts = Counter(
+                skill_id for row in rows for skill_id in details.get(job_ids[row], {}).get("skill_ids") or []
+            )
+            writes.append(ReplaceOne(
+                {"_id": cluster},
+                {
+                    "label": cluster_label([details.get(job_ids[row], {}).get("title") for row in rows]),
+                    "size": int(len(rows)),
+                    "top_skills": skill_names([skill_id for skill_id, _ in skill_counts.most_common(TOP_SKILLS)]),
+                    "centroid": centroids[cluster].tolist(),
+                    "members": [
+                        {"job_id": job_id, "similarity": round(float(similarity[row]) * 100, 1), **summaries.get(job_id, {})}
+                        for job_id, row in zip(member_ids, nearest)
+                    ],
+                    "clustering_id": clustering_id,
+                    "computed_at": computed_at
+                },
+                upsert=True
+            ))
+        db.job_clusters.bulk_write(writes, ordered=False)
+        db.job_clusters.delete_many({"clustering_id": {"$ne": clustering_id}})
+
+        sizes = np.bincount(labels, minlength=k)
+        print(f"\nWrote {len(writes)} clusters (sizes {sizes.min()}-{sizes.max()}, median {int(np.median(sizes))}) "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clusters", type=int, default=0, help="Number of clusters (0 = sqrt(jobs / 2))")
+    parser.add_argument("--assign-only", action="store_true", help="Only assign unclustered jobs to existing clusters")
+    args = parser.parse_args()
+    cluster_jobs(k=args.clusters, assign_only=args.assign_only)
@@ -18,6 +18,7 @@ backend_dir = os.path.dirname(current_dir)
 sys.path.append(backend_dir)
 
 from config import db
+from utils.skill_taxonomy import job_skill_ids, skill_id_fields
 
 class JobScraper:
     def __init__(self, search_site="linkedin", time_since_posted='', job_search_keywords=None, 
@@ -137,6 +138,7 @@ class JobScraper:
                 "search_location": self.job_location,
                 "posted_date": datetime.utcnow(),  # Actual date not easily accessible
             }
+            job_data.update(skill_id_fields(job_skill_ids(job_data)))
             
             return job_data
             
@@ -0,0 +1,112 @@
+"""
+Load-test the LLM layer offline against the fake Gemini backend (services/fake_llm.py).
+
+Each simulated session runs the real prompt builders and gateway paths: one resume
+analysis, a batch of match explanations, a cover letter and a resume enhancement.
+Sessions run concurrently; the report compares end-to-end latency per route with the
+latency the fake model itself slept, so the difference is the app's own overhead
+(queueing behind the gateway limits, retries, parsing).
+
+Usage: python scripts/load_test_llm.py [--sessions 50] [--concurrency 10] [--explanations 5]
+                                      [--latency lognormal:800,0.6] [--error-rate 0.02] [--seed 0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+RESUME_TEXT = """Skills: Python, SQL, Apache Spark, Apache Kafka, AWS, Docker
+Roles: Senior Data Engineer, Acme Corp Jan 2021 - Present | Data Engineer, Beta Inc 2018 - 2020
+
+EXPERIENCE
+Senior Data Engineer, Acme Corp Jan 2021 - Present
+- Built streaming ingestion with Kafka and Spark on AWS, cutting latency 40%.
+- Led the migration of batch jobs to Airflow and dbt.
+Data Engineer, Beta Inc 2018 - 2020
+- Built ETL pipelines in Python and SQL for finance reporting."""
+
+
+async def run_session(number: int, explanations: int, errors: dict):
+    from services.resume_analysis import ResumeAnalysisService
+    from utils.job_analysis import generate_job_match_analyses, generate_cover_letter, enhance_resume
+
+    job = {
+        "job_title": f"Data Engineer {number}",
+        "job_description": "Build and operate batch and streaming data pipelines on AWS.",
+        "job_requirements": ["python", "spark", "kafka", "aws", "airflow"],
+    }
+    steps = [
+        ResumeAnalysisService().analyze_resume(RESUME_TEXT),
+        generate_job_match_analyses([
+            {**job, "job_title": f"{job['job_title']}.{index}", "resume_text": RESUME_TEXT,
+             "match_score": 80.0, "matching_skills": ["python", "spark"]}
+            for index in range(explanations)
+        ]),
+        generate_cover_letter(job["job_title"], "Acme", job["job_description"], RESUME_TEXT, "Jane Doe"),
+        enhance_resume(RESUME_TEXT, job["job_title"], job["job_description"], job["job_requirements"]),
+    ]
+    for name, result in zip(["analysis", "explanations", "cover_letter", "enhance"],
+                            await asyncio.gather(*steps, return_exceptions=True)):
+        if isinstance(result, BaseException):
+            errors[name] = errors.get(name, 0) + 1
+
+
+async def load_test(sessions: int, concurrency: int, explanations: int):
+    from config import models
+    from services.llm_gateway import get_llm_gateway
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = {}
+
+    async def bounded(number: int):
+        async with semaphore:
+            await run_session(number, explanations, errors)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(number) for number in range(sessions)))
+    elapsed = time.perf_counter() - started
+
+    calls = sum(model.calls for model in models.values())
+    sampled = np.array([latency for model in models.values() for latency in model.sampled_latencies]) * 1000
+    stats = get_llm_gateway().stats()
+    print(f"\n{sessions} sessions at concurrency {concurrency}: {calls} model calls in {elapsed:.1f}s "
+          f"({calls / elapsed:.1f} calls/s)")
+    print(f"Fake model latency: p50 {np.percentile(sampled, 50):.0f} ms, p95 {np.percentile(sampled, 95):.0f} ms, "
+          f"p99 {np.percentile(sampled, 99):.0f} ms")
+    print(f"\n{'route':>18} {'tier':>6} {'calls':>6} {'ok':>5} {'fail':>5} {'timeout':>8} {'rejected':>9} "
+          f"{'retries':>8} {'p50 ms':>8} {'p95 ms':>8} {'$/call':>10}")
+    for route, metrics in sorted(stats["routes"].items()):
+        print(f"{route:>18} {metrics['tier']:>6} {metrics['calls']:>6} {metrics['successes']:>5} "
+              f"{metrics['failures']:>5} {metrics['timeouts']:>8} {metrics['rejected']:>9} {metrics['retries']:>8} "
+              f"{metrics['p50_ms'] or 0:>8.0f} {metrics['p95_ms'] or 0:>8.0f} {metrics['cost_per_call_usd'] or 0:>10.5f}")
+    for tier, metrics in sorted(stats["tiers"].items()):
+        print(f"{tier} ({metrics['model']}): {metrics['calls']} calls, estimated ${metrics['cost_usd']:.4f}")
+    print(f"\nBreaker: {stats['breaker']['state']}; failed session steps: {errors or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10, help="Sessions in flight at once")
+    parser.add_argument("--explanations", type=int, default=5, help="Match explanations per session")
+    parser.add_argument("--latency", default="lognormal:800,0.6", help="Fake latency spec (see services/fake_llm.py)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of fake calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Select the fake backend before config builds the model
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["LLM_FAKE_LATENCY"] = args.latency
+    os.environ["LLM_FAKE_ERROR_RATE"] = str(args.error_rate)
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    # config requires a Mongo URI at import; nothing here connects to it
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/jobsearch")
+
+    asyncio.run(load_test(args.sessions, args.concurrency, args.explanations))
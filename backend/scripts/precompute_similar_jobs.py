@@ -0,0 +1,195 @@
+"""
+Precompute each job's nearest jobs for the "similar jobs" endpoint.
+
+Neighbours are stored in the `similar_jobs` side collection (one document per job, keyed
+by the job's string _id) with their title, company, location, salary and posted date
+denormalized, so GET /api/jobs/{job_id}/similar is a single read.
+
+By default the run is incremental: only jobs without neighbours are scored against
+the whole catalogue, and existing neighbour lists are updated where a new job now ranks
+in their top N. Use --full to recompute everything (e.g. after re-embedding jobs).
+
+Usage: python scripts/precompute_similar_jobs.py [--top-n 10] [--full] [--memory-mb 2048]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.operations import DeleteOne, ReplaceOne, UpdateOne
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from scripts.batch_score_matches import (
+    JOB_BLOCK_SIZE,
+    WRITE_BATCH_SIZE,
+    load_job_matrix,
+    resume_block_size,
+    top_k_for_block
+)
+
+SUMMARY_FIELDS = {"title": 1, "company": 1, "location": 1, "salary": 1, "posted_date": 1, "postedDate": 1}
+
+
+def job_summaries(db, job_ids) -> dict:
+    """Denormalized fields shown for each neighbour, keyed by string job id."""
+    summaries = {}
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), WRITE_BATCH_SIZE):
+        chunk = [ObjectId(job_id) for job_id in job_ids[start:start + WRITE_BATCH_SIZE]]
+        for job in db.jobs.find({"_id": {"$in": chunk}}, projection=SUMMARY_FIELDS):
+            posted_date = job.get("posted_date") or job.get("postedDate")
+            summaries[str(job["_id"])] = {
+                "title": job.get("title", ""),
+                "company": job.get("company", ""),
+                "location": job.get("location", ""),
+                "salary": job.get("salary", "Not specified"),
+                "postedDate": posted_date.isoformat() if isinstance(posted_date, datetime) else posted_date
+            }
+    return summaries
+
+
+def neighbour_entries(scores, columns, job_ids, summaries) -> list:
+    return [
+        {"job_id": job_ids[column], "score": round(float(score) * 100, 1), **summaries.get(job_ids[column], {})}
+        for score, column in zip(scores, columns)
+        if np.isfinite(score)
+    ]
+
+
+def flush(collection, writes: list) -> int:
+    if writes:
+        collection.bulk_write(writes, ordered=False)
+    return len(writes)
+
+
+def score_new_jobs(db, job_matrix, job_ids, rows, top_n, block_rows, computed_at) -> int:
+    """Write top-N neighbours for the given job rows, scored against every job."""
+    written = 0
+    for block_start in range(0, len(rows), block_rows):
+        block = rows[block_start:block_start + block_rows]
+        # A job is always its own nearest neighbour; mask it out
+        excluded = {position: np.array([row]) for position, row in enumerate(block)}
+        scores, columns = top_k_for_block(job_matrix[block], job_matrix, top_n, excluded)
+
+        summaries = job_summaries(db, {job_ids[column] for column in columns.ravel()})
+        writes = [
+            ReplaceOne(
+                {"_id": job_ids[row]},
+                {"neighbours": neighbour_entries(scores[position], columns[position], job_ids, summaries),
+                 "computed_at": computed_at},
+                upsert=True
+            )
+            for position, row in enumerate(block)
+        ]
+        for start in range(0, len(writes), WRITE_BATCH_SIZE):
+            written += flush(db.similar_jobs, writes[start:start + WRITE_BATCH_SIZE])
+        print(f"Progress: {block_start + len(block)}/{len(rows)} jobs scored")
+    return written
+
+
+def merge_into_existing(db, job_matrix, job_ids, new_rows, existing, top_n, computed_at) -> int:
+    """Insert new jobs into existing neighbour lists where they now rank in the top N."""
+    new_matrix = job_matrix[new_rows]
+    new_summaries = job_summaries(db, [job_ids[row] for row in new_rows])
+    existing_rows = [row for row, job_id in enumerate(job_ids) if job_id in existing]
+    writes, updated = [], 0
+
+    for block_start in range(0, len(existing_rows), JOB_BLOCK_SIZE):
+        block = existing_rows[block_start:block_start + JOB_BLOCK_SIZE]
+        scores = np.round(job_matrix[block] @ new_matrix.T * 100, 1)
+        for position, row in enumerate(block):
+            neighbours = existing[job_ids[row]]
+            threshold = neighbours[-1]["score"] if len(neighbours) >= top_n else -np.inf
+            better = np.flatnonzero(scores[position] > threshold)
+            if not len(better):
+                continue
+            additions = [
+                {"job_id": job_ids[new_rows[column]], "score": float(scores[position, column]),
+                 **new_summaries.get(job_ids[new_rows[column]], {})}
+                for column in better
+            ]
+            merged = sorted(neighbours + additions, key=lambda neighbour: neighbour["score"], reverse=True)[:top_n]
+            writes.append(UpdateOne(
+                {"_id": job_ids[row]},
+                {"$set": {"neighbours": merged, "computed_at": computed_at}}
+            ))
+            if len(writes) >= WRITE_BATCH_SIZE:
+                updated += flush(db.similar_jobs, writes)
+                writes = []
+    return updated + flush(db.similar_jobs, writes)
+
+
+def precompute_similar_jobs(top_n: int = 10, full: bool = False, memory_mb: int = 2048):
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("Error: MONGO_URI environment variable is not set")
+        return
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client['jobsearch']
+        started = time.perf_counter()
+        db.similar_jobs.create_index("neighbours.job_id")
+
+        job_matrix, job_ids = load_job_matrix(db)
+        job_ids = [str(job_id) for job_id in job_ids]
+        print(f"Loaded {len(job_ids)} job embeddings ({job_matrix.nbytes / 2**20:.0f} MB)")
+        if len(job_ids) < 2:
+            return
+
+        existing = {
+            doc["_id"]: doc.get("neighbours", [])
+            for doc in db.similar_jobs.find({}, projection={"neighbours": 1})
+        }
+
+        # Drop neighbour lists of jobs that no longer exist (or lost their embedding)
+        known = set(job_ids)
+        stale = [job_id for job_id in existing if job_id not in known]
+        for start in range(0, len(stale), WRITE_BATCH_SIZE):
+            flush(db.similar_jobs, [DeleteOne({"_id": job_id}) for job_id in stale[start:start + WRITE_BATCH_SIZE]])
+        if stale and not full:
+            db.similar_jobs.update_many(
+                {"neighbours.job_id": {"$in": stale}},
+                {"$pull": {"neighbours": {"job_id": {"$in": stale}}}}
+            )
+            for job_id in stale:
+                del existing[job_id]
+            stale = set(stale)
+            existing = {
+                job_id: [neighbour for neighbour in neighbours if neighbour["job_id"] not in stale]
+                for job_id, neighbours in existing.items()
+            }
+
+        if full:
+            existing = {}
+        new_rows = [row for row, job_id in enumerate(job_ids) if job_id not in existing]
+        print(f"{len(new_rows)} jobs need neighbours, {len(existing)} already have them")
+        if not new_rows:
+            return
+
+        computed_at = datetime.now(timezone.utc)
+        block_rows = resume_block_size(memory_mb * 2**20, job_matrix.nbytes, top_n)
+        written = score_new_jobs(db, job_matrix, job_ids, new_rows, top_n, block_rows, computed_at)
+        updated = merge_into_existing(db, job_matrix, job_ids, new_rows, existing, top_n, computed_at) if existing else 0
+
+        print(f"\nWrote neighbours for {written} jobs and updated {updated} existing lists "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-n", type=int, default=10, help="Neighbours to keep per job")
+    parser.add_argument("--full", action="store_true", help="Recompute neighbours for every job")
+    parser.add_argument("--memory-mb", type=int, default=2048, help="Memory budget for matrices")
+    args = parser.parse_args()
+    precompute_similar_jobs(top_n=args.top_n, full=args.full, memory_mb=args.memory_mb)
@@ -0,0 +1,53 @@
+"""
+Export job embeddings to the memory-mapped store read by the API workers.
+
+Each run writes a new generation next to the current one and atomically repoints the
+`current` symlink, so workers never read a half-written matrix. Workers pick up the new
+generation on their next refresh check.
+
+Usage: python scripts/refresh_job_vectors.py [--interval 600]
+"""
+import argparse
+import os
+import sys
+import time
+from pymongo import MongoClient
+
+# Add the parent directory to sys.path to import services
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+sys.path.append(backend_dir)
+
+from config import JOB_VECTOR_STORE_DIR
+from services.job_vector_store import export_job_vectors
+
+
+def refresh_job_vectors(interval: int = 0):
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("Error: MONGO_URI environment variable is not set")
+        return
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client['jobsearch']
+        while True:
+            started = time.perf_counter()
+            try:
+                export_job_vectors(db, JOB_VECTOR_STORE_DIR)
+                print(f"Refresh took {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                # Keep serving the previous generation; try again next interval
+                print(f"Error exporting job vectors: {str(e)}")
+            if not interval:
+                break
+            time.sleep(interval)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=int, default=0, help="Seconds between refreshes (0 = run once)")
+    args = parser.parse_args()
+    refresh_job_vectors(interval=args.interval)
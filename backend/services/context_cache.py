@@ -0,0 +1,167 @@
+"""
+Per-resume context caching.
+
+A session typically sends the same resume to Gemini many times (analysis, match
+explanations, cover letters, enhancements). With caching enabled the resume is set up
+once per (resume version, model) and later calls only carry the task-specific prompt,
+which refers to the resume "provided in the cached context".
+
+LLM_CONTEXT_CACHE_MODE selects the backend:
+  - "local": in-process stand-in that prepends the cached text to each prompt, for
+             exercising the flow offline (same keys, TTLs and thresholds)
+  - "off":   every prompt embeds the resume
+
+There is no Gemini CachedContent backend: the resume digest sent to the model is capped
+at RESUME_DIGEST_MAX_TOKENS, far below Gemini's minimum cacheable context (32,768 tokens
+for 1.5 models), so a remote cache could never be created.
+
+Entries expire after LLM_CONTEXT_CACHE_TTL_S without use, so a cache lives as long as
+the user's session. Contexts under LLM_CONTEXT_CACHE_MIN_TOKENS are not cached and
+callers fall back to inline prompts.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Optional
+from config import (
+    models,
+    GEMINI_MODEL_TIERS,
+    LLM_CONTEXT_CACHE_MODE,
+    LLM_CONTEXT_CACHE_TIER,
+    LLM_CONTEXT_CACHE_MIN_TOKENS,
+    LLM_CONTEXT_CACHE_TTL_S
+)
+from .resume_digest import DIGEST_VERSION, estimate_tokens
+
+# Stands in for the resume text in prompts sent against a cached context
+CACHED_RESUME_REFERENCE = "(the candidate's resume provided in the cached context)"
+
+CONTEXT_INSTRUCTION = (
+    "You are an AI career advisor. The candidate's resume follows. "
+    "Use it whenever a request refers to the candidate's resume."
+)
+
+
+# Treat a context as expired slightly before its TTL
+EXPIRY_MARGIN_S = 30
+
+
+class ResumeContext:
+    """A cached resume: `model` generates with the resume already in context."""
+
+    def __init__(self, key: str, model, tokens: int, ttl_s: int, tier: str = LLM_CONTEXT_CACHE_TIER):
+        self.key = key
+        self.model = model
+        self.tier = tier
+        self.tokens = tokens
+        self.expires_at = time.monotonic() + ttl_s - EXPIRY_MARGIN_S
+
+
+class _LocalCachedModel:
+    """Model wrapper that sends the cached text ahead of each prompt."""
+
+    def __init__(self, base_model, cached_text: str):
+        self.base_model = base_model
+        self.cached_text = cached_text
+
+    async def generate_content_async(self, prompt, **kwargs):
+        return await self.base_model.generate_content_async(
+            f"{CONTEXT_INSTRUCTION}\n\n{self.cached_text}\n\n{prompt}", **kwargs
+        )
+
+
+class ContextCacheManager:
+    def __init__(self, mode: str = LLM_CONTEXT_CACHE_MODE, base_model=None,
+                 min_tokens: int = LLM_CONTEXT_CACHE_MIN_TOKENS, ttl_s: int = LLM_CONTEXT_CACHE_TTL_S):
+        if mode not in ("local", "off"):
+            print(f"Unknown LLM_CONTEXT_CACHE_MODE {mode!r}; sending resumes inline")
+            mode = "off"
+        self.mode = mode
+        self.base_model = base_model or models[LLM_CONTEXT_CACHE_TIER]
+        self.min_tokens = min_tokens
+        self.ttl_s = ttl_s
+        self._contexts = {}
+        self._locks = defaultdict(asyncio.Lock)
+        self.stats = {"created": 0, "hits": 0, "below_min_tokens": 0, "expired": 0, "errors": 0}
+
+    def key(self, resume: dict) -> str:
+        return f"{resume['_id']}:{resume.get('version')}:{DIGEST_VERSION}:{GEMINI_MODEL_TIERS[LLM_CONTEXT_CACHE_TIER]}"
+
+    async def _create(self, key: str, resume_text: str, tokens: int) -> ResumeContext:
+        return ResumeContext(key, _LocalCachedModel(self.base_model, resume_text), tokens, self.ttl_s)
+
+    def _touch(self, context: ResumeContext):
+        """Slide the expiry forward on use."""
+        context.expires_at = time.monotonic() + self.ttl_s - EXPIRY_MARGIN_S
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [key for key, context in self._contexts.items() if context.expires_at <= now]:
+            self.stats["expired"] += 1
+            del self._contexts[key]
+            if key in self._locks and not self._locks[key].locked():
+                del self._locks[key]
+
+    async def get(self, resume: dict, resume_text: str) -> Optional[ResumeContext]:
+        """Cached context for this resume version, creating it if needed; None when caching does not apply."""
+        if self.mode != "local" or not resume_text:
+            return None
+        tokens = estimate_tokens(resume_text)
+        if tokens < self.min_tokens:
+            self.stats["below_min_tokens"] += 1
+            return None
+
+        key = self.key(resume)
+        async with self._locks[key]:
+            context = self._contexts.get(key)
+            if context and context.expires_at <= time.monotonic():
+                self.stats["expired"] += 1
+                del self._contexts[key]
+                context = None
+            try:
+                if context:
+                    self.stats["hits"] += 1
+                    self._touch(context)
+                    return context
+                context = await self._create(key, resume_text, tokens)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Context cache unavailable for {key}, sending the resume inline: {str(e)}")
+                self._contexts.pop(key, None)
+                return None
+            self.stats["created"] += 1
+            self._purge_expired()
+            self._contexts[key] = context
+            return context
+
+    def summary(self) -> dict:
+        now = time.monotonic()
+        live = [context for context in self._contexts.values() if context.expires_at > now]
+        return {
+            "mode": self.mode,
+            "min_tokens": self.min_tokens,
+            "ttl_s": self.ttl_s,
+            "live_contexts": len(live),
+            "cached_tokens": sum(context.tokens for context in live),
+            **self.stats
+        }
+
+
+_manager = None
+
+
+def get_context_cache() -> ContextCacheManager:
+    global _manager
+    if _manager is None:
+        _manager = ContextCacheManager()
+    return _manager
+
+
+async def get_resume_context(resume: dict, resume_text: str) -> Optional[ResumeContext]:
+    return await get_context_cache().get(resume, resume_text)
+
+
+def resume_prompt_text(context: Optional[ResumeContext], resume_text: str) -> str:
+    """Resume text to embed in a prompt: a reference to the cached context when there is one."""
+    return CACHED_RESUME_REFERENCE if context else resume_text
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import Optional
 from vertexai.preview.language_models import TextEmbeddingInput, TextEmbeddingModel
 from google.cloud import aiplatform
@@ -52,8 +53,8 @@ class EmbeddingService:
                 task_type=task_type
             )
             
-            # Generate embedding
-            embedding = self.model.get_embeddings([embedding_input])[0]
+            # Generate embedding off the event loop; the Vertex client is blocking
+            embedding = (await asyncio.to_thread(self.model.get_embeddings, [embedding_input]))[0]
             
             # Take first 2048 dimensions if needed
             values = embedding.values[:self.TARGET_EMBEDDING_DIM]
@@ -76,4 +77,14 @@ class EmbeddingService:
         
     async def generate_search_query_embedding(self, query: str) -> Optional[list]:
         """Generate embedding for search queries."""
-        return await self.generate_embedding(query, "RETRIEVAL_QUERY") 
\ No newline at end of file
+        return await self.generate_embedding(query, "RETRIEVAL_QUERY")
+
+
+_shared_embedding_service: Optional[EmbeddingService] = None
+
+def get_embedding_service() -> EmbeddingService:
+    """Return a process-wide EmbeddingService so Vertex AI is only initialised once."""
+    global _shared_embedding_service
+    if _shared_embedding_service is None:
+        _shared_embedding_service = EmbeddingService()
+    return _shared_embedding_service
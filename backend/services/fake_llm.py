@@ -0,0 +1,150 @@
+"""
+In-process stand-in for the Gemini GenerativeModel, selected with LLM_BACKEND=fake.
+
+Responses are deterministic for a given prompt and shaped like the real ones: plain text
+for analyses and cover letters, a comma-separated list for skill extraction, and
+schema-valid JSON whenever a call asks for response_mime_type="application/json" with a
+response_schema (structured resume analysis, resume enhancements). Latency and errors are
+drawn from a seeded RNG, so load tests measure the app's own overhead, concurrency
+limits and tail latency without a Gemini key.
+
+Latency specs (milliseconds):
+  "fixed:300"              always 300 ms
+  "uniform:100,900"        uniform between 100 and 900 ms
+  "lognormal:800,0.6"      median 800 ms, sigma 0.6 (long right tail, like real LLM calls)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+from typing import Optional
+from google.api_core import exceptions as google_exceptions
+
+WORDS = (
+    "candidate experience skills python data cloud pipelines team delivery role impact "
+    "design systems stakeholders analytics leadership growth architecture projects results"
+).split()
+
+# Mix of transient errors the gateway retries and trips its breaker on
+ERRORS = (
+    (google_exceptions.ServiceUnavailable, "The model is overloaded. Please try again later."),
+    (google_exceptions.ResourceExhausted, "Resource has been exhausted (e.g. check quota)."),
+    (google_exceptions.InternalServerError, "An internal error has occurred."),
+)
+
+
+def parse_latency_spec(spec: str):
+    """Return a function rng -> latency in seconds for a spec like 'lognormal:800,0.6'."""
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",") if value.strip()]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+        return lambda rng: rng.lognormvariate(math.log(median), sigma) / 1000
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def _config_value(generation_config, name: str):
+    if generation_config is None:
+        return None
+    if isinstance(generation_config, dict):
+        return generation_config.get(name)
+    return getattr(generation_config, name, None)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = 0
+
+
+class FakeResponse:
+    """Mimics GenerateContentResponse: .text, .parts, .usage_metadata, and async iteration when streamed."""
+
+    def __init__(self, text: str, prompt_tokens: int, chunks=None, chunk_delay_s: float = 0.0):
+        self.text = text
+        self.parts = [text] if text else []
+        self.usage_metadata = FakeUsageMetadata(prompt_tokens, _count_tokens(text))
+        self._chunks = chunks
+        self._chunk_delay_s = chunk_delay_s
+
+    async def __aiter__(self):
+        for chunk in self._chunks or []:
+            await asyncio.sleep(self._chunk_delay_s)
+            yield FakeResponse(chunk, 0)
+
+
+class FakeGenerativeModel:
+    def __init__(self, latency: str = "lognormal:800,0.6", error_rate: float = 0.0,
+                 seed: Optional[int] = 0, stream_chunks: int = 8, model_name: str = "fake"):
+        self.model_name = model_name
+        self.sample_latency = parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.stream_chunks = stream_chunks
+        self.calls = 0
+        self.sampled_latencies = []  # seconds, for comparing against end-to-end latency
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        sentences = []
+        while sum(len(sentence.split()) for sentence in sentences) < words:
+            length = rng.randint(8, 16)
+            sentences.append(" ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + ".")
+        return " ".join(sentences)
+
+    def _from_schema(self, schema: dict, rng: random.Random, name: str = ""):
+        schema_type = (schema or {}).get("type", "string").lower()
+        if schema_type == "object":
+            return {key: self._from_schema(value, rng, key) for key, value in schema.get("properties", {}).items()}
+        if schema_type == "array":
+            return [self._from_schema(schema.get("items", {}), rng, name) for _ in range(rng.randint(3, 5))]
+        if schema_type in ("integer", "number"):
+            return rng.randint(1, 100)
+        if schema_type == "boolean":
+            return rng.random() < 0.5
+        return self._text(rng, 40 if name else 12)
+
+    def _respond(self, prompt: str, generation_config, rng: random.Random) -> str:
+        """A response of the shape the calling code parses."""
+        schema = _config_value(generation_config, "response_schema")
+        if _config_value(generation_config, "response_mime_type") == "application/json" and schema:
+            return json.dumps(self._from_schema(schema, rng))
+        lowered = prompt.lower()
+        if "comma-separated list of skills" in lowered:
+            return ", ".join(sorted({rng.choice(["python", "sql", "aws", "docker", "spark", "kafka", "react",
+                                                 "communication", "leadership", "kubernetes"]) for _ in range(8)}))
+        if "cover letter" in lowered:
+            return "\n\n".join(self._text(rng, 70) for _ in range(4))
+        return self._text(rng, 120)
+
+    async def generate_content_async(self, prompt, generation_config=None, stream: bool = False, **kwargs):
+        prompt = prompt if isinstance(prompt, str) else "\n".join(str(part) for part in prompt)
+        self.calls += 1
+        latency = self.sample_latency(self.rng)
+        self.sampled_latencies.append(latency)
+        failed = self.rng.random() < self.error_rate
+        error = self.rng.choice(ERRORS)
+        # Content depends only on the prompt so repeated prompts get identical answers
+        content_rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+        text = self._respond(prompt, generation_config, content_rng)
+
+        # When streaming, the sampled latency is the time to the first chunk
+        await asyncio.sleep(latency)
+        if failed:
+            raise error[0](error[1])
+        if not stream:
+            return FakeResponse(text, _count_tokens(prompt))
+
+        size = max(1, math.ceil(len(text) / self.stream_chunks))
+        chunks = [text[start:start + size] for start in range(0, len(text), size)]
+        return FakeResponse(text, _count_tokens(prompt), chunks=chunks, chunk_delay_s=latency / (2 * len(chunks)))
@@ -0,0 +1,50 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+
+# Centroids only change when scripts/cluster_jobs.py runs; re-read them every few minutes
+_centroid_cache = TTLCache(maxsize=1, ttl=300)
+
+
+async def get_cluster_centroids(db) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Return (cluster_ids, normalized centroid matrix), or None when jobs have not been clustered."""
+    if "centroids" in _centroid_cache:
+        return _centroid_cache["centroids"]
+
+    clusters = await db.job_clusters.find({}, {"centroid": 1}).sort("_id", 1).to_list(length=None)
+    table = None
+    if clusters:
+        centroids = np.array([cluster["centroid"] for cluster in clusters], dtype=np.float32)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        table = (np.array([cluster["_id"] for cluster in clusters]), centroids)
+    _centroid_cache["centroids"] = table
+    return table
+
+
+def nearest_clusters(table: Tuple[np.ndarray, np.ndarray], embedding: list, nprobe: int) -> List[int]:
+    """IDs of the nprobe clusters whose centroids are closest to the embedding."""
+    cluster_ids, centroids = table
+    vector = np.asarray(embedding, dtype=np.float32)
+    if vector.shape[0] != centroids.shape[1]:
+        return []
+    scores = centroids @ vector
+    nprobe = min(nprobe, len(cluster_ids))
+    return [int(cluster_id) for cluster_id in cluster_ids[np.argsort(-scores)[:nprobe]]]
+
+
+def cluster_search_filter(cluster_ids: List[int]) -> dict:
+    """
+    Atlas Search filter restricting knnBeta to the probed clusters.
+
+    Jobs embedded since the last clustering run have no cluster_id yet and are always
+    kept. Requires cluster_id to be mapped as a number in the job_vector_index.
+    """
+    return {
+        "compound": {
+            "should": [
+                {"in": {"path": "cluster_id", "value": cluster_ids}},
+                {"compound": {"mustNot": [{"exists": {"path": "cluster_id"}}]}}
+            ],
+            "minimumShouldMatch": 1
+        }
+    }
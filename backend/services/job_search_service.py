@@ -0,0 +1,176 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from cachetools import TTLCache
+from config import (
+    HYBRID_SEARCH_CANDIDATES,
+    HYBRID_SEARCH_BUDGET_MS,
+    HYBRID_RRF_K,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL
+)
+from .embedding_service import get_embedding_service
+
+# Query embeddings are shared across requests; popular searches never hit Vertex AI twice
+_query_embedding_cache = TTLCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL)
+_pending_query_embeddings: Dict[str, asyncio.Task] = {}
+
+
+def build_text_search_stage(search: str) -> dict:
+    """Build the Atlas text $search stage used by the regular job listing."""
+    return {
+        "$search": {
+            "index": "job_search",  # Make sure to create this index in MongoDB Atlas
+            "compound": {
+                "should": [
+                    {
+                        "text": {
+                            "query": search,
+                            "path": ["title", "description", "requirements"],
+                            "score": { "boost": { "value": 3 } }
+                        }
+                    },
+                    {
+                        "text": {
+                            "query": search,
+                            "path": ["company", "location"],
+                            "score": { "boost": { "value": 2 } }
+                        }
+                    }
+                ]
+            },
+            "highlight": {
+                "path": ["title", "description"]
+            }
+        }
+    }
+
+
+def reciprocal_rank_fusion(rankings: List[List[dict]], k: int = HYBRID_RRF_K) -> List[dict]:
+    """Merge ranked job lists with reciprocal rank fusion: score = sum(1 / (k + rank))."""
+    fused_scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, job in enumerate(ranking, start=1):
+            job_id = job["_id"]
+            fused_scores[job_id] = fused_scores.get(job_id, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(job_id, job)
+
+    fused = []
+    for job_id in sorted(fused_scores, key=fused_scores.get, reverse=True):
+        job = documents[job_id]
+        job["score"] = round(fused_scores[job_id], 6)
+        fused.append(job)
+    return fused
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class JobSearchService:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_query_embedding(self, query: str) -> Optional[list]:
+        """Return the embedding for a search query, served from cache when possible."""
+        key = _normalize_query(query)
+        if key in _query_embedding_cache:
+            return _query_embedding_cache[key]
+
+        # Share a single in-flight request between concurrent identical searches
+        task = _pending_query_embeddings.get(key)
+        if task is None:
+            task = asyncio.create_task(self._embed_and_cache(key))
+            _pending_query_embeddings[key] = task
+        # Shield so a caller hitting its latency budget does not throw away the embedding
+        return await asyncio.shield(task)
+
+    async def _embed_and_cache(self, key: str) -> Optional[list]:
+        try:
+            embedding = await get_embedding_service().generate_search_query_embedding(key)
+            if embedding:
+                _query_embedding_cache[key] = embedding
+            return embedding
+        finally:
+            _pending_query_embeddings.pop(key, None)
+
+    async def _text_candidates(self, search: str, filters: List[dict]) -> List[dict]:
+        pipeline = [
+            build_text_search_stage(search),
+            *filters,
+            {"$limit": HYBRID_SEARCH_CANDIDATES},
+            {"$project": {"embedding": 0}}
+        ]
+        return await self.db.jobs.aggregate(pipeline).to_list(HYBRID_SEARCH_CANDIDATES)
+
+    async def _vector_candidates(self, search: str, filters: List[dict]) -> List[dict]:
+        query_embedding = await self.get_query_embedding(search)
+        if not query_embedding:
+            return []
+        pipeline = [
+            {
+                "$search": {
+                    "index": "job_vector_index",
+                    "knnBeta": {
+                        "vector": query_embedding,
+                        "path": "embedding",
+                        "k": HYBRID_SEARCH_CANDIDATES
+                    }
+                }
+            },
+            *filters,
+            {"$project": {"embedding": 0}}
+        ]
+        return await self.db.jobs.aggregate(pipeline).to_list(HYBRID_SEARCH_CANDIDATES)
+
+    async def hybrid_search(
+        self,
+        search: str,
+        filters: List[dict],
+        skip: int,
+        limit: int
+    ) -> Tuple[List[dict], int, str, bool]:
+        """
+        Run text and vector retrieval concurrently and fuse them with RRF.
+
+        The semantic leg only gets HYBRID_SEARCH_BUDGET_MS; if it overruns, the text
+        results are returned on their own so hybrid mode never exceeds the text p95
+        by more than the budget. Returns (page of jobs, total, effective mode, capped).
+
+        Each retriever returns at most HYBRID_SEARCH_CANDIDATES jobs, so the total is the
+        number of fused candidates, not every match: `capped` is True when a retriever hit
+        that limit and more matches exist than can be paged through.
+        """
+        started = time.perf_counter()
+        text_task = asyncio.create_task(self._text_candidates(search, filters))
+        vector_task = asyncio.create_task(self._vector_candidates(search, filters))
+
+        try:
+            text_jobs = await text_task
+        except Exception:
+            # Don't leave the semantic leg running unowned when the text leg fails
+            vector_task.cancel()
+            await asyncio.gather(vector_task, return_exceptions=True)
+            raise
+        remaining = HYBRID_SEARCH_BUDGET_MS / 1000 - (time.perf_counter() - started)
+        try:
+            vector_jobs = await asyncio.wait_for(vector_task, timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            print(f"Hybrid search: semantic leg exceeded {HYBRID_SEARCH_BUDGET_MS}ms budget, using text results only")
+            vector_jobs = []
+        except Exception as e:
+            print(f"Hybrid search: semantic leg failed, using text results only: {str(e)}")
+            vector_jobs = []
+
+        if vector_jobs:
+            ranked = reciprocal_rank_fusion([text_jobs, vector_jobs])
+            mode = "hybrid"
+        else:
+            ranked = text_jobs
+            mode = "text"
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Hybrid search '{search}': {len(text_jobs)} text + {len(vector_jobs)} vector candidates in {elapsed_ms:.0f}ms")
+        capped = max(len(text_jobs), len(vector_jobs)) >= HYBRID_SEARCH_CANDIDATES
+        return ranked[skip:skip + limit], len(ranked), mode, capped
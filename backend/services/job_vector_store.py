@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from config import JOB_VECTOR_STORE_DIR
+from .embedding_service import EmbeddingService
+
+CURRENT_LINK = "current"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "job_ids.json"
+KEEP_GENERATIONS = 2  # older generations may still be mapped by workers mid-refresh
+
+
+def export_job_vectors(db, directory: str = JOB_VECTOR_STORE_DIR) -> str:
+    """
+    Write all job embeddings to a new memory-mappable generation and switch `current` to it.
+
+    `db` is a synchronous pymongo database (the refresher runs outside the event loop).
+    Rows are L2-normalized float32 so a dot product with a normalized query is cosine
+    similarity. The `current` symlink is swapped with os.replace, so readers always see
+    a complete generation. Returns the generation directory.
+    """
+    dim = EmbeddingService.TARGET_EMBEDDING_DIM
+    query = {"embedding.%d" % (dim - 1): {"$exists": True}}
+    total = db.jobs.count_documents(query)
+
+    os.makedirs(directory, exist_ok=True)
+    generation = os.path.join(directory, f"gen-{time.time_ns()}")
+    os.makedirs(generation)
+
+    vectors = np.lib.format.open_memmap(
+        os.path.join(generation, VECTORS_FILE), mode="w+", dtype=np.float32, shape=(total, dim)
+    )
+    job_ids = []
+    for row, job in enumerate(db.jobs.find(query, projection={"embedding": 1}, batch_size=500)):
+        if row >= total:
+            break  # jobs inserted while exporting are picked up next refresh
+        vector = np.asarray(job["embedding"][:dim], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        vectors[row] = vector / norm if norm > 0 else vector
+        job_ids.append(str(job["_id"]))
+    vectors.flush()
+    del vectors
+
+    if len(job_ids) < total:
+        # Jobs were deleted mid-export; rewrite a right-sized copy
+        full = np.load(os.path.join(generation, VECTORS_FILE), mmap_mode="r")
+        np.save(os.path.join(generation, VECTORS_FILE + ".tmp.npy"), full[:len(job_ids)])
+        del full
+        os.replace(os.path.join(generation, VECTORS_FILE + ".tmp.npy"), os.path.join(generation, VECTORS_FILE))
+
+    with open(os.path.join(generation, IDS_FILE), "w") as f:
+        json.dump(job_ids, f)
+
+    # Atomically repoint `current` at the new generation
+    temp_link = os.path.join(directory, f".{CURRENT_LINK}.{os.getpid()}")
+    os.symlink(os.path.basename(generation), temp_link)
+    os.replace(temp_link, os.path.join(directory, CURRENT_LINK))
+
+    generations = sorted(name for name in os.listdir(directory) if name.startswith("gen-"))
+    for stale in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+
+    print(f"Exported {len(job_ids)} job vectors to {generation}")
+    return generation
+
+
+def process_memory_stats() -> Dict[str, float]:
+    """Resident memory of this process in MB, split into anonymous and file-backed (shared page cache) pages."""
+    fields = {"VmRSS": "rss_mb", "RssAnon": "rss_anon_mb", "RssFile": "rss_file_mb", "RssShmem": "rss_shmem_mb"}
+    stats = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    stats[fields[key]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass  # not on Linux
+    return stats
+
+
+class JobVectorStore:
+    """
+    Read-only view of the exported job embedding matrix.
+
+    The matrix is opened with mmap_mode="r", so every uvicorn/gunicorn worker maps the
+    same file and the OS page cache holds a single copy. An opened store is never
+    modified: refresh() returns a new store when the refresher has published a new
+    generation, so a request can hold one store as a consistent snapshot.
+    """
+
+    def __init__(self, directory: str = JOB_VECTOR_STORE_DIR):
+        self.directory = directory
+        self.generation = None
+        self.vectors = None
+        self.job_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.vectors is not None
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.vectors.shape[1] if self.available else None
+
+    def refresh(self) -> "JobVectorStore":
+        """The store for the current generation: self if unchanged (or unreadable), otherwise a newly opened store."""
+        link = os.path.join(self.directory, CURRENT_LINK)
+        try:
+            generation = os.path.realpath(link)
+            if generation == self.generation:
+                return self
+            vectors = np.load(os.path.join(generation, VECTORS_FILE), mmap_mode="r")
+            with open(os.path.join(generation, IDS_FILE)) as f:
+                job_ids = json.load(f)
+        except (OSError, ValueError):
+            return self
+
+        store = JobVectorStore(self.directory)
+        store.vectors, store.job_ids, store.generation = vectors, job_ids, generation
+        store.index = {job_id: row for row, job_id in enumerate(job_ids)}
+        print(f"Opened job vector store {generation} ({len(job_ids)} jobs), memory: {process_memory_stats()}")
+        return store
+
+    def vector(self, job_id: str) -> Optional[np.ndarray]:
+        """Normalized embedding row for a job, or None if the job is not in this generation."""
+        row = self.index.get(job_id)
+        return None if row is None else self.vectors[row]
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "generation": os.path.basename(self.generation) if self.generation else None,
+            "jobs": len(self.job_ids),
+            "matrix_mb": round(self.vectors.nbytes / 2**20, 1) if self.available else 0,
+            "process": process_memory_stats()
+        }
+
+
+_shared_store: Optional[JobVectorStore] = None
+_last_refresh_check = 0.0
+REFRESH_CHECK_INTERVAL_S = 30
+
+
+def get_job_vector_store() -> JobVectorStore:
+    """
+    Process-wide store, re-checking for a new generation at most every REFRESH_CHECK_INTERVAL_S.
+
+    Call this once per request and pass the result along: a later call may return a
+    different generation.
+    """
+    global _shared_store, _last_refresh_check
+    if _shared_store is None:
+        _shared_store = JobVectorStore()
+    now = time.monotonic()
+    if now - _last_refresh_check >= REFRESH_CHECK_INTERVAL_S or not _shared_store.available:
+        _last_refresh_check = now
+        _shared_store = _shared_store.refresh()
+    return _shared_store
@@ -0,0 +1,121 @@
+import copy
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+from cachetools import TTLCache
+from config import (
+    LLM_CACHE_ENDPOINTS,
+    LLM_CACHE_TTL_S,
+    LLM_CACHE_MEMORY_SIZE
+)
+from .llm_gateway import route_model_name, route_generation_config
+
+# Per-worker LRU in front of the shared Mongo collection (TTLCache evicts least recently used)
+_memory_cache = TTLCache(maxsize=LLM_CACHE_MEMORY_SIZE, ttl=LLM_CACHE_TTL_S)
+
+COUNTERS = ("memory_hits", "db_hits", "misses", "bypassed")
+_stats = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+
+def record(endpoint: str, counter: str, count: int = 1) -> None:
+    _stats[endpoint][counter] += count
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters per endpoint for this worker."""
+    stats = {}
+    for endpoint, counters in _stats.items():
+        lookups = counters["memory_hits"] + counters["db_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["db_hits"]
+        stats[endpoint] = {
+            **counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "enabled": endpoint in LLM_CACHE_ENDPOINTS
+        }
+    return stats
+
+
+def llm_cache_key(endpoint: str, model_name: str, generation_config: dict, template_version: str, inputs: dict) -> str:
+    """sha256 over everything that determines the response: model, config, prompt template and inputs."""
+    payload = json.dumps(
+        {
+            "endpoint": endpoint,
+            "model": model_name,
+            "config": generation_config,
+            "template": template_version,
+            "inputs": inputs
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Read-through cache for Gemini responses.
+
+    Entries are keyed by llm_cache_key and stored in the `llm_cache` collection (expired by
+    a TTL index on created_at, see config.ensure_indexes) with a per-worker LRU in front.
+    Endpoints opt in through LLM_CACHE_ENDPOINTS; for others every call is a bypass.
+    Bump an endpoint's prompt template version whenever its prompt changes. The model and
+    generation config default to those the gateway routes the same-named route to.
+    """
+
+    def __init__(self, db, endpoint: str, template_version: str,
+                 model_name: Optional[str] = None, generation_config: Optional[dict] = None):
+        self.collection = db["llm_cache"]
+        self.endpoint = endpoint
+        self.template_version = template_version
+        self.model_name = model_name or route_model_name(endpoint)
+        self.generation_config = (
+            generation_config if generation_config is not None else route_generation_config(endpoint)
+        )
+        self.enabled = endpoint in LLM_CACHE_ENDPOINTS
+
+    def key(self, inputs: dict) -> str:
+        return llm_cache_key(self.endpoint, self.model_name, self.generation_config, self.template_version, inputs)
+
+    async def get(self, inputs: dict) -> Optional[Any]:
+        if not self.enabled:
+            record(self.endpoint, "bypassed")
+            return None
+        key = self.key(inputs)
+        if key in _memory_cache:
+            record(self.endpoint, "memory_hits")
+            return copy.deepcopy(_memory_cache[key])
+        entry = await self.collection.find_one({"_id": key}, projection={"value": 1})
+        if entry:
+            record(self.endpoint, "db_hits")
+            _memory_cache[key] = entry["value"]
+            return copy.deepcopy(entry["value"])
+        record(self.endpoint, "misses")
+        return None
+
+    async def put(self, inputs: dict, value: Any) -> None:
+        if not self.enabled:
+            return
+        key = self.key(inputs)
+        _memory_cache[key] = copy.deepcopy(value)
+        await self.collection.replace_one(
+            {"_id": key},
+            {
+                "endpoint": self.endpoint,
+                "model": self.model_name,
+                "template_version": self.template_version,
+                "value": value,
+                "created_at": datetime.now(timezone.utc)
+            },
+            upsert=True
+        )
+
+    async def get_or_generate(self, inputs: dict, generate: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached response for these inputs, or generate, store and return it."""
+        cached = await self.get(inputs)
+        if cached is not None:
+            return cached
+        value = await generate()
+        await self.put(inputs, value)
+        return value
@@ -0,0 +1,417 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import numpy as np
+from google.api_core import exceptions as google_exceptions
+from config import (
+    models,
+    GEMINI_DEFAULT_TIER,
+    GEMINI_GENERATION_CONFIG,
+    GEMINI_MODEL_TIERS,
+    GEMINI_TIER_PRICES,
+    LLM_ROUTING,
+    LLM_USER_CONCURRENCY,
+    LLM_GLOBAL_CONCURRENCY,
+    LLM_ROUTE_CONCURRENCY,
+    LLM_ROUTE_LIMITS,
+    LLM_TIMEOUT_S,
+    LLM_MAX_RETRIES,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET_S
+)
+from .llm_usage import current_llm_user, get_llm_usage_tracker
+
+# Transient Gemini errors worth retrying; these (and timeouts) also count towards the circuit breaker
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
+LATENCY_WINDOW = 500  # recent successful calls kept per route for percentiles
+
+
+def route_tier(route: str) -> str:
+    """Model tier (flash/pro) a route is served by; see config.LLM_ROUTING."""
+    return LLM_ROUTING.get(route, {}).get("tier", GEMINI_DEFAULT_TIER)
+
+
+def route_model_name(route: str) -> str:
+    return GEMINI_MODEL_TIERS[route_tier(route)]
+
+
+def route_generation_config(route: str, **overrides) -> dict:
+    """Generation config for a route: the defaults with its max_output_tokens, then `overrides`."""
+    routing = {name: value for name, value in LLM_ROUTING.get(route, {}).items() if name != "tier"}
+    return {**GEMINI_GENERATION_CONFIG, **routing, **overrides}
+
+
+def call_cost_usd(tier: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimated cost of one call; cached prompt tokens are billed at the cached-input rate."""
+    input_price, output_price, cached_price = GEMINI_TIER_PRICES.get(tier, (0.0, 0.0, 0.0))
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + output_tokens * output_price) / 1_000_000
+
+
+class LLMGatewayError(Exception):
+    """A Gemini call failed after the gateway's retries."""
+
+
+class CircuitOpenError(LLMGatewayError):
+    """Gemini is failing; calls are rejected until the breaker lets a trial call through."""
+
+
+class LLMTimeoutError(LLMGatewayError, asyncio.TimeoutError):
+    """The call did not finish within its deadline (retries and queueing included)."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: opens after `failure_threshold` failures, rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET_S):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def release_trial(self):
+        """The trial call ended without telling us anything about Gemini (e.g. a bad request)."""
+        self.trial_in_flight = False
+
+
+def _new_route_metrics() -> dict:
+    return {
+        "calls": 0,
+        "successes": 0,
+        "failures": 0,
+        "timeouts": 0,
+        "rejected": 0,
+        "retries": 0,
+        "in_flight": 0,
+        "prompt_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "cost_usd": 0.0,
+        "latencies": deque(maxlen=LATENCY_WINDOW)
+    }
+
+
+def _new_tier_metrics() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+class LLMGateway:
+    """
+    Single entry point for Gemini calls.
+
+    Sends each route (cover_letter, match_explanation, ...) to the model tier and output
+    budget given by config.LLM_ROUTING, bounds in-flight calls globally and per route,
+    applies a deadline covering queueing and retries, retries transient errors with
+    jittered backoff and trips a circuit breaker when Gemini keeps failing, so a slow or
+    failing upstream degrades into fast errors instead of piling up requests. Each user's
+    calls (services.llm_usage.current_llm_user) also queue behind a per-user limit so one
+    busy user cannot take every slot. Latency, tokens and estimated cost are tracked per
+    route and per tier, and per user in services.llm_usage.
+    """
+
+    def __init__(self, llm_models: dict, global_limit: int = LLM_GLOBAL_CONCURRENCY,
+                 route_limit: int = LLM_ROUTE_CONCURRENCY, route_limits: Optional[dict] = None,
+                 user_limit: int = LLM_USER_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT_S, max_retries: int = LLM_MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.models = llm_models
+        self.global_semaphore = asyncio.Semaphore(global_limit)
+        self.global_limit = global_limit
+        self.route_limit = route_limit
+        self.route_limits = route_limits if route_limits is not None else LLM_ROUTE_LIMITS
+        self.route_semaphores = {}
+        self.user_limit = user_limit
+        # user -> [semaphore, calls holding or waiting for it]; dropped when the user goes idle
+        self.user_slots = {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = defaultdict(_new_route_metrics)
+        self.tier_metrics = defaultdict(_new_tier_metrics)
+
+    def _route_semaphore(self, route: str) -> asyncio.Semaphore:
+        if route not in self.route_semaphores:
+            self.route_semaphores[route] = asyncio.Semaphore(self.route_limits.get(route, self.route_limit))
+        return self.route_semaphores[route]
+
+    @asynccontextmanager
+    async def _user_slot(self):
+        user = current_llm_user()
+        if not user or self.user_limit <= 0:
+            yield
+            return
+        entry = self.user_slots.setdefault(user, [asyncio.Semaphore(self.user_limit), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.user_slots[user]
+
+    def _check_breaker(self, route: str):
+        if not self.breaker.allow():
+            self.metrics[route]["rejected"] += 1
+            raise CircuitOpenError(f"Gemini circuit open; rejecting {route} call")
+
+    def _select_model(self, route: str, context):
+        """(model, tier) for a call; a cached resume context runs on the model it was created for."""
+        if context:
+            return context.model, context.tier
+        tier = route_tier(route)
+        return self.models[tier], tier
+
+    def _record_usage(self, route: str, tier: str, response, elapsed_s: float):
+        metadata = getattr(response, "usage_metadata", None)
+        self.tier_metrics[tier]["calls"] += 1
+        if not metadata:
+            get_llm_usage_tracker().record(route, 0, 0, 0, 0.0, elapsed_s * 1000)
+        else:
+            prompt_tokens = metadata.prompt_token_count or 0
+            output_tokens = metadata.candidates_token_count or 0
+            # Prompt tokens served from a context cache (already included in prompt_tokens)
+            cached_tokens = getattr(metadata, "cached_content_token_count", 0) or 0
+            cost = call_cost_usd(tier, prompt_tokens, output_tokens, cached_tokens)
+            self.metrics[route]["prompt_tokens"] += prompt_tokens
+            self.metrics[route]["output_tokens"] += output_tokens
+            self.metrics[route]["cached_tokens"] += cached_tokens
+            self.metrics[route]["cost_usd"] += cost
+            self.tier_metrics[tier]["prompt_tokens"] += prompt_tokens
+            self.tier_metrics[tier]["output_tokens"] += output_tokens
+            self.tier_metrics[tier]["cost_usd"] += cost
+            get_llm_usage_tracker().record(
+                route, prompt_tokens, output_tokens, cached_tokens, cost, elapsed_s * 1000
+            )
+
+    async def _attempt(self, llm_model, prompt, route: str, generation_config, state: dict):
+        # Wait for the user's own slot first so a queued user does not hold a shared one
+        async with self._user_slot(), self.global_semaphore, self._route_semaphore(route):
+            state["sent"] = True
+            self.metrics[route]["in_flight"] += 1
+            try:
+                return await llm_model.generate_content_async(prompt, generation_config=generation_config)
+            finally:
+                self.metrics[route]["in_flight"] -= 1
+
+    async def generate(self, prompt, *, route: str, generation_config=None,
+                       timeout: Optional[float] = None, max_retries: Optional[int] = None, context=None):
+        """
+        Run one generate_content call and return the Gemini response.
+
+        The model and, unless `generation_config` is given, the output budget come from the
+        route's entry in config.LLM_ROUTING. `context` is a services.context_cache.ResumeContext
+        whose cached model is used instead of the routed one.
+
+        Raises LLMTimeoutError when `timeout` (default LLM_TIMEOUT_S) elapses, CircuitOpenError
+        when the breaker rejects the call and LLMGatewayError for other failures.
+        """
+        metrics = self.metrics[route]
+        llm_model, tier = self._select_model(route, context)
+        generation_config = generation_config or route_generation_config(route)
+        timeout = timeout or self.timeout
+        max_retries = self.max_retries if max_retries is None else max_retries
+        deadline = time.monotonic() + timeout
+        metrics["calls"] += 1
+        started = time.perf_counter()
+
+        for attempt in range(max_retries + 1):
+            self._check_breaker(route)
+            remaining = deadline - time.monotonic()
+            state = {"sent": False}
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await asyncio.wait_for(
+                    self._attempt(llm_model, prompt, route, generation_config, state), timeout=remaining
+                )
+            except RETRYABLE_ERRORS as e:
+                if state["sent"]:
+                    self.breaker.record_failure()
+                else:
+                    # Timed out waiting for a slot: local load, not a Gemini failure
+                    self.breaker.release_trial()
+                # Sleep outside the semaphores so a backing-off call does not hold a slot
+                backoff = min(2 ** attempt, 8) * 0.5 + random.uniform(0, 0.5)
+                if attempt < max_retries and time.monotonic() + backoff < deadline:
+                    metrics["retries"] += 1
+                    print(f"Gemini {route} call failed ({type(e).__name__}), retry {attempt + 1}/{max_retries}")
+                    await asyncio.sleep(backoff)
+                    continue
+                if isinstance(e, asyncio.TimeoutError) or time.monotonic() >= deadline:
+                    metrics["timeouts"] += 1
+                    raise LLMTimeoutError(f"Gemini {route} call timed out after {timeout}s") from e
+                metrics["failures"] += 1
+                raise LLMGatewayError(f"Gemini {route} call failed: {str(e)}") from e
+            except asyncio.CancelledError:
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                # Bad requests and safety blocks say nothing about Gemini's health
+                self.breaker.release_trial()
+                metrics["failures"] += 1
+                raise LLMGatewayError(f"Gemini {route} call failed: {str(e)}") from e
+
+            self.breaker.record_success()
+            metrics["successes"] += 1
+            elapsed = time.perf_counter() - started
+            metrics["latencies"].append(elapsed)
+            self._record_usage(route, tier, response, elapsed)
+            return response
+
+    async def generate_text(self, prompt, *, route: str, **kwargs) -> str:
+        """generate() returning the response text; an empty or blocked response is an LLMGatewayError."""
+        response = await self.generate(prompt, route=route, **kwargs)
+        try:
+            text = response.text if response else ""
+        except ValueError as e:  # raised by .text when the candidate was blocked
+            raise LLMGatewayError(f"Gemini {route} response has no text: {str(e)}") from e
+        if not text:
+            raise LLMGatewayError(f"Empty response received from Gemini for {route}")
+        return text
+
+    async def stream(self, prompt, *, route: str, generation_config=None,
+                     timeout: Optional[float] = None, context=None) -> AsyncIterator[str]:
+        """
+        Yield text chunks as Gemini generates them.
+
+        The concurrency slots are held for the whole stream. Streams are not retried since
+        chunks may already have been sent; `timeout` bounds the wait for each chunk.
+        """
+        metrics = self.metrics[route]
+        llm_model, tier = self._select_model(route, context)
+        generation_config = generation_config or route_generation_config(route)
+        timeout = timeout or self.timeout
+        metrics["calls"] += 1
+        self._check_breaker(route)
+        started = time.perf_counter()
+
+        async with self._user_slot(), self.global_semaphore, self._route_semaphore(route):
+            metrics["in_flight"] += 1
+            try:
+                response = await asyncio.wait_for(
+                    llm_model.generate_content_async(prompt, generation_config=generation_config, stream=True),
+                    timeout=timeout
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    # Chunks without text (e.g. the final usage-only chunk) raise on .text
+                    text = chunk.text if chunk.parts else ""
+                    if text:
+                        yield text
+            except asyncio.TimeoutError as e:
+                self.breaker.record_failure()
+                metrics["timeouts"] += 1
+                raise LLMTimeoutError(f"Gemini {route} stream stalled for {timeout}s") from e
+            except RETRYABLE_ERRORS as e:
+                self.breaker.record_failure()
+                metrics["failures"] += 1
+                raise LLMGatewayError(f"Gemini {route} stream failed: {str(e)}") from e
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client went away mid-stream
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                self.breaker.release_trial()
+                metrics["failures"] += 1
+                raise LLMGatewayError(f"Gemini {route} stream failed: {str(e)}") from e
+            finally:
+                metrics["in_flight"] -= 1
+
+        self.breaker.record_success()
+        metrics["successes"] += 1
+        elapsed = time.perf_counter() - started
+        metrics["latencies"].append(elapsed)
+        self._record_usage(route, tier, response, elapsed)
+
+    def stats(self) -> dict:
+        """
+        Breaker state, limits and per-route counters for this worker: routing, p50/p95
+        latency and estimated cost (total and per successful call), plus totals per tier.
+        """
+        routes = {}
+        for route, metrics in self.metrics.items():
+            latencies = np.array(metrics["latencies"])
+            routes[route] = {
+                **{name: value for name, value in metrics.items() if name not in ("latencies", "cost_usd")},
+                "tier": route_tier(route),
+                "model": route_model_name(route),
+                "max_output_tokens": route_generation_config(route)["max_output_tokens"],
+                "limit": self.route_limits.get(route, self.route_limit),
+                "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if len(latencies) else None,
+                "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if len(latencies) else None,
+                "cost_usd": round(metrics["cost_usd"], 6),
+                "cost_per_call_usd": (
+                    round(metrics["cost_usd"] / metrics["successes"], 6) if metrics["successes"] else None
+                )
+            }
+        tiers = {
+            tier: {**metrics, "model": GEMINI_MODEL_TIERS.get(tier), "cost_usd": round(metrics["cost_usd"], 6)}
+            for tier, metrics in self.tier_metrics.items()
+        }
+        return {
+            "breaker": {"state": self.breaker.state, "consecutive_failures": self.breaker.failures},
+            "global_limit": self.global_limit,
+            "user_limit": self.user_limit,
+            "active_users": len(self.user_slots),
+            "timeout_s": self.timeout,
+            "max_retries": self.max_retries,
+            "routes": routes,
+            "tiers": tiers
+        }
+
+
+_gateway = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway around config.models."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(models)
+    return _gateway
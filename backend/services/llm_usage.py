@@ -0,0 +1,199 @@
+"""
+Per-user LLM usage accounting and daily token budgets.
+
+The gateway reports the usage metadata of every Gemini response here, attributed to the
+user whose request (or queued task) made the call via a context variable set by the
+`llm_budget` dependency, set_llm_user, or the task worker. Counters are buffered in
+memory and flushed every LLM_USAGE_FLUSH_S into `llm_usage`, one rollup document per
+(user, endpoint, UTC day):
+
+    {"_id": "jane@example.com:cover_letter:2024-05-01", "user_email": ..., "endpoint": ...,
+     "day": "2024-05-01", "calls": 3, "prompt_tokens": ..., "output_tokens": ...,
+     "cached_tokens": ..., "cost_usd": ..., "llm_ms": ...}
+
+LLM endpoints check the user's budgets before doing any work and answer 429 with a
+Retry-After until the next UTC day once a budget is spent. Budgets are soft: a request
+admitted just under its budget runs to completion. Under load, the gateway queues each
+user's calls behind LLM_USER_CONCURRENCY so one busy user cannot take every slot.
+"""
+
+import asyncio
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from pymongo import UpdateOne
+from config import (
+    get_database,
+    LLM_USER_DAILY_TOKEN_BUDGET,
+    LLM_ENDPOINT_DAILY_TOKEN_BUDGETS,
+    LLM_BUDGET_ENDPOINTS,
+    LLM_USAGE_FLUSH_S
+)
+
+# Calls made outside any user's request (scripts, unattributed background work)
+SYSTEM_USER = "_system"
+COUNTERS = ("calls", "prompt_tokens", "output_tokens", "cached_tokens", "cost_usd", "llm_ms")
+
+_current_user: ContextVar[Optional[str]] = ContextVar("llm_user", default=None)
+
+
+def set_llm_user(email: Optional[str]) -> None:
+    """Attribute LLM calls made from the current request or task to this user."""
+    _current_user.set(email)
+
+
+def current_llm_user() -> Optional[str]:
+    return _current_user.get()
+
+
+def usage_day(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+def seconds_until_reset(now: Optional[datetime] = None) -> int:
+    """Seconds until budgets reset at the next UTC midnight."""
+    now = now or datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+class LLMUsageTracker:
+    def __init__(self, flush_interval_s: float = LLM_USAGE_FLUSH_S):
+        self.flush_interval_s = flush_interval_s
+        # (user, endpoint, day) -> counters not yet written to Mongo
+        self.pending = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.db = None
+        self._flusher = None
+
+    def record(self, endpoint: str, prompt_tokens: int, output_tokens: int, cached_tokens: int,
+               cost_usd: float, llm_ms: float, user: Optional[str] = None) -> None:
+        counters = self.pending[(user or current_llm_user() or SYSTEM_USER, endpoint, usage_day())]
+        counters["calls"] += 1
+        counters["prompt_tokens"] += prompt_tokens
+        counters["output_tokens"] += output_tokens
+        counters["cached_tokens"] += cached_tokens
+        counters["cost_usd"] += cost_usd
+        counters["llm_ms"] += llm_ms
+
+    async def start(self, db):
+        self.db = db
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Failed to flush LLM usage: {str(e)}")
+
+    async def flush(self):
+        """Write buffered counters with one bulk upsert; they are kept for the next flush on failure."""
+        if self.db is None or not self.pending:
+            return
+        pending, self.pending = self.pending, defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"_id": f"{user}:{endpoint}:{day}"},
+                {
+                    "$inc": counters,
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"user_email": user, "endpoint": endpoint, "day": day, "created_at": now}
+                },
+                upsert=True
+            )
+            for (user, endpoint, day), counters in pending.items()
+        ]
+        try:
+            await self.db.llm_usage.bulk_write(operations, ordered=False)
+        except Exception:
+            for key, counters in pending.items():
+                for name, value in counters.items():
+                    self.pending[key][name] += value
+            raise
+
+    async def usage(self, db, user: str, day: Optional[str] = None) -> dict:
+        """{endpoint: counters} for a user's day, including calls not yet flushed by this worker."""
+        day = day or usage_day()
+        by_endpoint = {}
+        async for entry in db.llm_usage.find({"user_email": user, "day": day}):
+            by_endpoint[entry["endpoint"]] = {name: entry.get(name, 0) for name in COUNTERS}
+        for (pending_user, endpoint, pending_day), counters in self.pending.items():
+            if pending_user == user and pending_day == day:
+                totals = by_endpoint.setdefault(endpoint, dict.fromkeys(COUNTERS, 0))
+                for name, value in counters.items():
+                    totals[name] += value
+        return by_endpoint
+
+
+def _tokens(counters: dict) -> int:
+    return counters["prompt_tokens"] + counters["output_tokens"]
+
+
+def budget_endpoint(route: str) -> str:
+    """The endpoint whose budget a route's usage counts toward (e.g. resume_analysis_structured -> resume_analysis)."""
+    return LLM_BUDGET_ENDPOINTS.get(route, route)
+
+
+async def llm_budget_status(db, user: str, endpoint: Optional[str] = None) -> dict:
+    """Today's usage per endpoint, and token usage against the user's overall and `endpoint` budgets."""
+    by_endpoint = await get_llm_usage_tracker().usage(db, user)
+    used = sum(_tokens(counters) for counters in by_endpoint.values())
+    endpoint_used = sum(
+        _tokens(counters) for route, counters in by_endpoint.items() if budget_endpoint(route) == endpoint
+    ) if endpoint else 0
+    endpoint_budget = LLM_ENDPOINT_DAILY_TOKEN_BUDGETS.get(endpoint, 0) if endpoint else 0
+    exceeded = None
+    if LLM_USER_DAILY_TOKEN_BUDGET and used >= LLM_USER_DAILY_TOKEN_BUDGET:
+        exceeded = "Daily AI usage limit reached"
+    elif endpoint_budget and endpoint_used >= endpoint_budget:
+        exceeded = f"Daily AI usage limit reached for {endpoint.replace('_', ' ')}"
+    return {
+        "endpoints": by_endpoint,
+        "tokens_used": used,
+        "token_budget": LLM_USER_DAILY_TOKEN_BUDGET or None,
+        "endpoint_tokens_used": endpoint_used,
+        "endpoint_token_budget": endpoint_budget or None,
+        "exceeded": exceeded
+    }
+
+
+def llm_budget(endpoint: str):
+    """
+    Dependency for an LLM endpoint with an {email} path parameter: attributes the request's
+    Gemini calls to that user and rejects it with 429 once their budget for today is spent.
+    """
+    async def dependency(request: Request, db=Depends(get_database)):
+        email = request.path_params.get("email")
+        if not email:
+            return
+        set_llm_user(email)
+        status = await llm_budget_status(db, email, endpoint)
+        if status["exceeded"]:
+            raise HTTPException(
+                status_code=429,
+                detail=f"{status['exceeded']}; it resets at 00:00 UTC",
+                headers={"Retry-After": str(seconds_until_reset())}
+            )
+    return dependency
+
+
+_tracker = None
+
+
+def get_llm_usage_tracker() -> LLMUsageTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = LLMUsageTracker()
+    return _tracker
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from pymongo.operations import ReplaceOne
+from config import LLM_CACHE_ENDPOINTS
+from utils.job_analysis import MATCH_ANALYSIS_PROMPT_VERSION
+from .llm_cache import record
+from .resume_digest import DIGEST_VERSION
+
+ENDPOINT = "match_explanation"
+
+class MatchExplanationCache:
+    """
+    Read-through cache for Gemini match explanations.
+
+    Entries live in the `match_explanations` collection, keyed by
+    (job_id, resume_id, prompt_version, digest version). Each resume version is its
+    own document, so a new upload, a prompt change or a rebuilt digest (e.g. after a
+    taxonomy change) naturally misses. The prompt carries no match score, so one entry
+    is valid wherever the job is shown, whatever score sits next to it. Expiry is
+    handled by a TTL index on created_at (see config.ensure_indexes). Lookups count
+    towards the "match_explanation" entry of the LLM cache stats and honour
+    LLM_CACHE_ENDPOINTS.
+    """
+
+    def __init__(self, db, prompt_version: str = MATCH_ANALYSIS_PROMPT_VERSION):
+        self.collection = db["match_explanations"]
+        self.prompt_version = prompt_version
+        self.enabled = ENDPOINT in LLM_CACHE_ENDPOINTS
+
+    def _key(self, job_id: str, resume: dict) -> str:
+        return f"{job_id}:{resume['_id']}:{self.prompt_version}:{DIGEST_VERSION}"
+
+    async def get_many(self, job_ids: List[str], resume: dict) -> Dict[str, str]:
+        """Return {job_id: explanation} for every cached job in a single indexed lookup."""
+        keys = {self._key(job_id, resume): job_id for job_id in job_ids}
+        if not keys:
+            return {}
+        if not self.enabled:
+            record(ENDPOINT, "bypassed", len(keys))
+            return {}
+        cached = await self.collection.find(
+            {"_id": {"$in": list(keys)}},
+            projection={"explanation": 1}
+        ).to_list(len(keys))
+        record(ENDPOINT, "db_hits", len(cached))
+        record(ENDPOINT, "misses", len(keys) - len(cached))
+        return {keys[entry["_id"]]: entry["explanation"] for entry in cached}
+
+    async def get(self, job_id: str, resume: dict) -> Optional[str]:
+        return (await self.get_many([job_id], resume)).get(job_id)
+
+    async def put_many(self, explanations: Dict[str, str], resume: dict) -> None:
+        """Store freshly generated explanations; created_at restarts the TTL clock."""
+        if not explanations or not self.enabled:
+            return
+        now = datetime.now(timezone.utc)
+        await self.collection.bulk_write([
+            ReplaceOne(
+                {"_id": self._key(job_id, resume)},
+                {
+                    "job_id": job_id,
+                    "resume_id": resume["_id"],
+                    "resume_version": resume.get("version"),
+                    "prompt_version": self.prompt_version,
+                    "digest_version": DIGEST_VERSION,
+                    "explanation": explanation,
+                    "created_at": now
+                },
+                upsert=True
+            )
+            for job_id, explanation in explanations.items()
+        ], ordered=False)
+
+    async def put(self, job_id: str, resume: dict, explanation: str) -> None:
+        await self.put_many({job_id: explanation}, resume)
@@ -0,0 +1,128 @@
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+import numpy as np
+from config import (
+    RERANK_WEIGHT_SIMILARITY,
+    RERANK_WEIGHT_SKILLS,
+    RERANK_WEIGHT_RECENCY,
+    RERANK_WEIGHT_LOCATION,
+    RERANK_RECENCY_HALF_LIFE_DAYS
+)
+
+# Column order of the feature matrix
+FEATURES = ("similarity", "skill_overlap", "recency", "location")
+
+DEFAULT_WEIGHTS = np.array(
+    [RERANK_WEIGHT_SIMILARITY, RERANK_WEIGHT_SKILLS, RERANK_WEIGHT_RECENCY, RERANK_WEIGHT_LOCATION],
+    dtype=np.float32
+)
+
+# Value used when a feature is unknown for a job or the user has no preference,
+# so it neither helps nor hurts that job relative to the others
+NEUTRAL = 0.5
+
+_LOCATION_SEPARATORS = re.compile(r"\s*(?:;|\||/|\bor\b)\s*")
+
+
+def preferred_locations(preferences: Optional[dict]) -> List[str]:
+    """
+    Lowercased location terms from users.preferences.desiredLocation.
+
+    "Austin, TX; Seattle" -> ["austin, tx", "austin", "seattle"]: the city part of a
+    "City, State" entry is kept on its own so "Austin, Texas" job listings still match.
+    """
+    desired = (preferences or {}).get("desiredLocation") or ""
+    terms = []
+    for entry in _LOCATION_SEPARATORS.split(desired.lower()):
+        entry = entry.strip(" ,.")
+        if not entry:
+            continue
+        terms.append(entry)
+        city = entry.split(",")[0].strip()
+        if city and city != entry:
+            terms.append(city)
+    return terms
+
+
+def _to_epoch_seconds(value) -> float:
+    """Epoch seconds for a stored posted date (datetime or ISO string, naive = UTC); NaN if unknown."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return np.nan
+    if not isinstance(value, datetime):
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def recency_feature(posted_dates: Sequence, now: Optional[datetime] = None,
+                    half_life_days: float = RERANK_RECENCY_HALF_LIFE_DAYS) -> np.ndarray:
+    """Exponential decay by job age: 1.0 when just posted, 0.5 after one half-life."""
+    now = (now or datetime.now(timezone.utc)).timestamp()
+    posted = np.fromiter((_to_epoch_seconds(value) for value in posted_dates), dtype=np.float64, count=len(posted_dates))
+    age_days = np.clip((now - posted) / 86400.0, 0.0, None)
+    recency = np.exp2(-age_days / half_life_days)
+    recency[np.isnan(recency)] = NEUTRAL
+    return recency.astype(np.float32)
+
+
+def location_feature(job_locations: Sequence[Optional[str]], preferences: Optional[dict]) -> np.ndarray:
+    """
+    1.0 when the job is in a preferred location (or is remote and the user wants remote work),
+    0.0 otherwise. Users who will relocate or have no location preference get NEUTRAL for
+    non-matching jobs.
+    """
+    preferences = preferences or {}
+    locations = np.array([(location or "").lower() for location in job_locations], dtype=str)
+    terms = preferred_locations(preferences)
+    wants_remote = preferences.get("workType") == "remote"
+    if not len(locations):
+        return np.zeros(0, dtype=np.float32)
+
+    matched = np.zeros(len(locations), dtype=bool)
+    for term in terms:
+        matched |= np.char.find(locations, term) >= 0
+    is_remote = np.char.find(locations, "remote") >= 0
+    if wants_remote:
+        matched |= is_remote
+
+    if not terms and not wants_remote:
+        return np.full(len(locations), NEUTRAL, dtype=np.float32)
+    miss = NEUTRAL if preferences.get("willRelocate") else 0.0
+    return np.where(matched, 1.0, miss).astype(np.float32)
+
+
+def build_feature_matrix(similarities: Sequence[float], skill_overlaps: Sequence[Optional[float]],
+                         posted_dates: Sequence, job_locations: Sequence[Optional[str]],
+                         preferences: Optional[dict], now: Optional[datetime] = None) -> np.ndarray:
+    """
+    Build the (n_candidates, len(FEATURES)) float32 matrix used for re-ranking.
+
+    similarities are cosine similarities in [-1, 1]; skill_overlaps are matched/required
+    ratios, or None when a job lists no skills (the job's similarity stands in, which keeps
+    its score equal to the embedding score alone).
+    """
+    similarity = np.clip(np.asarray(similarities, dtype=np.float32), 0.0, 1.0)
+    overlap = np.array(
+        [np.nan if value is None else value for value in skill_overlaps], dtype=np.float32
+    ).reshape(len(similarity))
+    overlap = np.where(np.isnan(overlap), similarity, overlap)
+    return np.column_stack([
+        similarity,
+        overlap,
+        recency_feature(posted_dates, now),
+        location_feature(job_locations, preferences)
+    ]).astype(np.float32, copy=False)
+
+
+def rerank_scores(features: np.ndarray, weights: np.ndarray = DEFAULT_WEIGHTS) -> np.ndarray:
+    """Weighted sum of the feature columns, scaled to a 0-100 match score."""
+    weights = np.asarray(weights, dtype=np.float32)
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("Re-ranking weights must sum to a positive value")
+    return np.round(features @ (weights / total) * 100, 1)
@@ -1,45 +1,54 @@
-import os
-import time
-import google.generativeai as genai
+import asyncio
 from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
 from fastapi import HTTPException
+from config import RESUME_ANALYSIS_MODE
+from models.analysis_model import ResumeAnalysisSections, RESUME_ANALYSIS_RESPONSE_SCHEMA
+from .llm_gateway import get_llm_gateway, route_generation_config
+from .context_cache import resume_prompt_text
+
+# Bump whenever an analysis prompt changes so cached analyses are regenerated
+RESUME_ANALYSIS_PROMPT_VERSION = "v1"
 
 class ResumeAnalysisService:
     def __init__(self):
-        # Initialize Gemini
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            raise Exception("GEMINI_API_KEY not found in environment variables")
-        genai.configure(api_key=api_key)
+        # Calls go through the shared gateway, routed by config.LLM_ROUTING["resume_analysis"]
+        # (or "resume_analysis_structured" for the single call that returns every section)
+        self.gateway = get_llm_gateway()
+        self.structured_config = route_generation_config(
+            "resume_analysis_structured",
+            response_mime_type="application/json",
+            response_schema=RESUME_ANALYSIS_RESPONSE_SCHEMA,
+        )
+        # Token usage across this instance's calls (read by scripts/benchmark_resume_analysis.py)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0}
 
-    async def _get_ai_analysis(self, prompt: str, analysis_type: str) -> str:
-        """Helper function to handle AI text generation with retries"""
-        max_retries = 3
-        retry_delay = 2  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                print(f"Attempting {analysis_type} analysis with Gemini, attempt {attempt + 1}")
-                model = genai.GenerativeModel(model_name="gemini-1.5-pro")
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.2,
-                        max_output_tokens=2048,
-                        top_k=40,
-                        top_p=0.8,
-                    )
-                )
-                if not response or not response.text:
-                    raise Exception(f"Empty response received for {analysis_type}")
-                return response.text
-            except Exception as e:
-                print(f"Error in {analysis_type} analysis attempt {attempt + 1}: {str(e)}")
-                if attempt == max_retries - 1:  # Last attempt
-                    raise Exception(f"Failed {analysis_type} analysis after {max_retries} attempts: {str(e)}")
-                time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-        
-        raise Exception(f"Failed to get {analysis_type} analysis after all retries")
+    def _record_usage(self, response):
+        self.usage["calls"] += 1
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata:
+            self.usage["prompt_tokens"] += metadata.prompt_token_count or 0
+            self.usage["output_tokens"] += metadata.candidates_token_count or 0
+
+    async def _get_ai_analysis(self, prompt: str, analysis_type: str, generation_config=None, max_retries=None,
+                               context=None, route: str = "resume_analysis") -> str:
+        """Helper function to handle AI text generation; the gateway retries transient errors"""
+        try:
+            print(f"Requesting {analysis_type} analysis from Gemini")
+            response = await self.gateway.generate(
+                prompt,
+                route=route,
+                generation_config=generation_config,
+                max_retries=max_retries,
+                context=context
+            )
+            self._record_usage(response)
+            if not response or not response.text:
+                raise Exception(f"Empty response received for {analysis_type}")
+            return response.text
+        except Exception as e:
+            print(f"Error in {analysis_type} analysis: {str(e)}")
+            raise Exception(f"Failed {analysis_type} analysis: {str(e)}")
 
     def _create_resume_feedback_prompt(self, extracted_text: str) -> str:
         return f"""
@@ -95,38 +104,131 @@ class ResumeAnalysisService:
         Keep the response concise but informative.
         """
 
-    async def analyze_resume(self, extracted_text: str) -> dict:
+    def _create_structured_analysis_prompt(self, extracted_text: str) -> str:
+        return f"""
+        You are an expert resume reviewer, career development coach and job market expert.
+        Analyze the following resume once and return a JSON object with three sections.
+        Focus on being specific, actionable, and constructive.
+        
+        Resume text:
+        {extracted_text}
+        
+        resume_feedback:
+        1. Overall feedback on the resume structure and content
+        2. Specific suggestions for improvement
+        3. Key strengths identified
+        4. Areas that need enhancement
+        
+        upskilling_suggestions:
+        1. Technical skills that could be added or improved
+        2. Specific courses or certifications recommended
+        3. Emerging technologies or skills relevant to their field
+        4. Soft skills that could enhance their profile
+        
+        matching_roles:
+        1. Top 5 job roles that best match their skills and experience
+        2. Required skills they already have for each role
+        3. Additional skills needed for each role
+        4. Potential career progression paths
+        
+        Write each section as text in clear sub-sections with bullet points.
+        Keep each section concise but informative.
+        """
+
+    async def _structured_analysis(self, extracted_text: str, context=None) -> ResumeAnalysisSections:
+        """All three sections from one schema-constrained call, so the resume is sent once."""
+        text = await self._get_ai_analysis(
+            self._create_structured_analysis_prompt(resume_prompt_text(context, extracted_text)),
+            "structured",
+            generation_config=self.structured_config,
+            max_retries=1,  # the per-section fallback is the next retry
+            context=context,
+            route="resume_analysis_structured"
+        )
+        return ResumeAnalysisSections.model_validate_json(text)
+
+    async def stream_analysis(self, extracted_text: str, context=None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream the three analysis sections concurrently.
+
+        Yields (section, text_chunk) as chunks arrive from any of the three calls, where
+        section is resume_feedback, upskilling_suggestions or matching_roles.
         """
-        Analyze a resume using AI and return comprehensive feedback
+        extracted_text = resume_prompt_text(context, extracted_text)
+        prompts = {
+            "resume_feedback": self._create_resume_feedback_prompt(extracted_text),
+            "upskilling_suggestions": self._create_upskilling_prompt(extracted_text),
+            "matching_roles": self._create_matching_roles_prompt(extracted_text),
+        }
+        queue = asyncio.Queue()
+
+        async def pump(section: str, prompt: str):
+            try:
+                async for text in self.gateway.stream(prompt, route="resume_analysis", context=context):
+                    await queue.put((section, text))
+                await queue.put((section, None))
+            except Exception as e:
+                await queue.put((section, e))
+
+        tasks = [asyncio.create_task(pump(section, prompt)) for section, prompt in prompts.items()]
+        try:
+            finished = 0
+            while finished < len(tasks):
+                section, item = await queue.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise Exception(f"Failed {section} analysis: {str(item)}")
+                else:
+                    yield section, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def analyze_resume(self, extracted_text: str, mode: Optional[str] = None, context=None) -> dict:
+        """
+        Analyze a resume using AI and return comprehensive feedback.
+
+        mode "structured" (the default, see RESUME_ANALYSIS_MODE) makes one JSON call and
+        falls back to per-section calls if it fails or does not validate. With a cached
+        resume `context` the prompts refer to it instead of embedding the text.
         """
         try:
             print("Starting resume analysis...")
+            mode = mode or RESUME_ANALYSIS_MODE
             
-            # Get responses from Gemini with retries
-            print("Starting resume feedback analysis...")
-            resume_feedback = await self._get_ai_analysis(
-                self._create_resume_feedback_prompt(extracted_text), 
-                "resume feedback"
-            )
-            
-            print("Starting upskilling suggestions analysis...")
-            upskilling_suggestions = await self._get_ai_analysis(
-                self._create_upskilling_prompt(extracted_text), 
-                "upskilling"
-            )
+            if mode == "structured":
+                try:
+                    sections = await self._structured_analysis(extracted_text, context)
+                    print("Analysis completed successfully (structured)")
+                    return {
+                        **sections.model_dump(),
+                        "analysis_date": datetime.utcnow(),
+                        "analysis_mode": "structured"
+                    }
+                except Exception as e:
+                    print(f"Structured analysis failed, falling back to per-section calls: {str(e)}")
             
-            print("Starting matching roles analysis...")
-            matching_roles = await self._get_ai_analysis(
-                self._create_matching_roles_prompt(extracted_text), 
-                "matching roles"
+            # The three analyses are independent: run them concurrently so latency is the slowest call
+            prompt_text = resume_prompt_text(context, extracted_text)
+            results = await asyncio.gather(
+                self._get_ai_analysis(self._create_resume_feedback_prompt(prompt_text), "resume feedback", context=context),
+                self._get_ai_analysis(self._create_upskilling_prompt(prompt_text), "upskilling", context=context),
+                self._get_ai_analysis(self._create_matching_roles_prompt(prompt_text), "matching roles", context=context),
+                return_exceptions=True
             )
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            resume_feedback, upskilling_suggestions, matching_roles = results
             
             # Create analysis result
             analysis_result = {
                 "resume_feedback": resume_feedback,
                 "upskilling_suggestions": upskilling_suggestions,
                 "matching_roles": matching_roles,
-                "analysis_date": datetime.utcnow()
+                "analysis_date": datetime.utcnow(),
+                "analysis_mode": "sections"
             }
             
             print("Analysis completed successfully")
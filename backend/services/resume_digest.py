@@ -0,0 +1,181 @@
+"""
+Compact, token-budgeted resume representation shared by every Gemini prompt.
+
+The digest is built once per resume version from extracted_text and stored on the resume
+document under `digest`. It drops PDF extraction noise (page numbers, repeated page
+headers, duplicate lines, contact details), groups the text into sections and caps it at
+RESUME_DIGEST_MAX_TOKENS, trimming sections in proportion to their length.
+"""
+
+import math
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from config import RESUME_DIGEST_MAX_TOKENS
+from data.skill_taxonomy import TAXONOMY_VERSION
+from utils.skill_taxonomy import find_skill_ids, skill_names
+
+# Bump whenever the digest format changes; stale digests are rebuilt on next use. The digest
+# lists taxonomy skills, so a taxonomy change rebuilds it too
+DIGEST_FORMAT_VERSION = "v1"
+DIGEST_VERSION = f"{DIGEST_FORMAT_VERSION}.t{TAXONOMY_VERSION}"
+
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "objective", "about me", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "relevant experience"],
+    "skills": ["skills", "technical skills", "core competencies", "key skills", "technologies", "tools"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "education": ["education", "academic background", "qualifications"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments", "publications"],
+}
+_HEADING_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+# Sections trimmed last when the digest is over budget
+SECTION_PRIORITY = ["summary", "experience", "skills", "projects", "education", "certifications", "achievements"]
+MIN_SECTION_TOKENS = 40
+
+_BULLET = re.compile(r"^\s*[•●▪■◦‣∙·*\-–—]+\s*")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,2}(\s*(of|/)\s*\d{1,2})?$", re.IGNORECASE)
+_CONTACT = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+|https?://\S+|www\.\S+|linkedin\.com\S*|github\.com\S*"
+    r"|(\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b"
+)
+_DATE_RANGE = re.compile(
+    r"((jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}\s*(-|–|—|to)\s*"
+    r"(((jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}|present|current|now)",
+    re.IGNORECASE
+)
+_SPACES = re.compile(r"[ \t ]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (about four characters per token for English prose)."""
+    return math.ceil(len(text) / 4)
+
+
+def clean_lines(text: str) -> List[str]:
+    """Normalized, de-duplicated resume lines without page numbers, repeated headers or contact details."""
+    # Re-join words hyphenated across line breaks by the PDF extractor
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text or "")
+    lines = []
+    for raw in text.splitlines():
+        line = _SPACES.sub(" ", raw).strip()
+        if line and _BULLET.match(line):
+            line = "- " + _BULLET.sub("", line)
+        if line and line != "-":
+            lines.append(line)
+
+    # Running headers/footers repeat on every page; keep only the first occurrence of any line
+    cleaned, seen = [], set()
+    for line in lines:
+        key = line.lower()
+        if key in seen or _PAGE_NUMBER.match(line):
+            continue
+        seen.add(key)
+        line = _SPACES.sub(" ", _CONTACT.sub("", line)).strip(" |,;·")
+        if line:
+            cleaned.append(line)
+    return cleaned
+
+
+def _heading(line: str) -> Optional[str]:
+    key = line.lower().strip(" :-–—").strip()
+    if len(key) > 40:
+        return None
+    return _HEADING_TO_SECTION.get(key)
+
+
+def split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Group lines under recognised headings; text before the first heading counts as summary."""
+    sections: Dict[str, List[str]] = {}
+    current = "summary"
+    for line in lines:
+        section = _heading(line)
+        if section:
+            current = section
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def extract_roles(lines: List[str]) -> List[str]:
+    """Non-bullet experience lines that carry a date range, e.g. 'Data Engineer, Acme Corp Jan 2021 - Present'."""
+    roles = []
+    for line in lines:
+        if not line.startswith("- ") and len(line) <= 150 and _DATE_RANGE.search(line):
+            roles.append(line)
+    return roles
+
+
+def _trim_sections(sections: Dict[str, List[str]], budget: int) -> Dict[str, List[str]]:
+    """Cut sections to fit `budget` tokens, each keeping a share proportional to its size."""
+    sizes = {name: estimate_tokens("\n".join(lines)) for name, lines in sections.items()}
+    total = sum(sizes.values())
+    if total <= budget:
+        return sections
+    trimmed = {}
+    for name, lines in sections.items():
+        allowance = max(MIN_SECTION_TOKENS, int(budget * sizes[name] / total))
+        kept, used = [], 0
+        for line in lines:
+            used += estimate_tokens(line) + 1
+            if used > allowance:
+                break
+            kept.append(line)
+        if kept:
+            trimmed[name] = kept
+    return trimmed
+
+
+def build_resume_digest(extracted_text: str, max_tokens: int = RESUME_DIGEST_MAX_TOKENS) -> dict:
+    """Digest document for a resume's extracted text (see module docstring)."""
+    lines = clean_lines(extracted_text)
+    sections = split_sections(lines)
+    roles = extract_roles(sections.get("experience", lines))
+    skills = skill_names(sorted(find_skill_ids("\n".join(lines))))
+
+    overview = []
+    if skills:
+        overview.append(f"Skills: {', '.join(skills)}")
+    if roles:
+        overview.append(f"Roles: {' | '.join(roles)}")
+    # The skills line replaces a raw skills section when it is all the budget allows
+    remaining = max_tokens - estimate_tokens("\n".join(overview))
+    ordered = {name: sections[name] for name in SECTION_PRIORITY if name in sections}
+    kept = _trim_sections(ordered, max(remaining, 0))
+    if roles and set(roles) <= set(kept.get("experience", [])):
+        # Every role line survived trimming; listing them twice only costs tokens
+        overview = overview[:1] if skills else []
+
+    body = [f"{name.upper()}\n" + "\n".join(section_lines) for name, section_lines in kept.items()]
+    text = "\n\n".join(["\n".join(overview)] + body if overview else body).strip()
+    return {
+        "version": DIGEST_VERSION,
+        "text": text,
+        "sections": {name: "\n".join(section_lines) for name, section_lines in kept.items()},
+        "skills": skills,
+        "roles": roles,
+        "source_tokens": estimate_tokens(extracted_text or ""),
+        "digest_tokens": estimate_tokens(text),
+        "created_at": datetime.now(timezone.utc)
+    }
+
+
+async def ensure_resume_digest(db, resume: dict, extracted_text: Optional[str] = None) -> str:
+    """
+    Digest text to put in prompts for this resume, building and storing the digest if the
+    resume has none (or an outdated one). Falls back to the raw text if it digests to nothing.
+    """
+    digest = resume.get("digest")
+    if digest and digest.get("version") == DIGEST_VERSION and digest.get("text"):
+        return digest["text"]
+    extracted_text = extracted_text or resume.get("extracted_text") or ""
+    if not extracted_text:
+        return ""
+    digest = build_resume_digest(extracted_text)
+    if not digest["text"]:
+        return extracted_text
+    await db.resumes.update_one({"_id": resume["_id"]}, {"$set": {"digest": digest}})
+    resume["digest"] = digest
+    return digest["text"]
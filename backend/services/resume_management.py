@@ -4,10 +4,14 @@ from fastapi import HTTPException, UploadFile
 from google.cloud import storage, vision
 from google.oauth2 import service_account
 from PyPDF2 import PdfReader
+from config import SKILL_ENRICHMENT_MODE
 from .embedding_service import EmbeddingService
+from .resume_digest import build_resume_digest
+from .skill_extraction import extract_resume_skills
+from .task_queue import submit_task
+from .llm_usage import set_llm_user
 import io
-from config import model
-from typing import List
+from utils.skill_taxonomy import resolve_skill_ids, skill_id_fields
 
 class ResumeManagementService:
     def __init__(self, db):
@@ -50,36 +54,10 @@ class ResumeManagementService:
             print(f"Failed to initialize Google Cloud services: {str(e)}")
             raise
 
-    async def _extract_skills_from_text(self, text: str) -> List[str]:
-        """Extract skills from resume text using Gemini AI."""
-        try:
-            prompt = f"""
-            As a skilled ATS system, analyze the following resume text and extract a comprehensive list of technical and professional skills.
-            Include both hard skills (technical skills, tools, programming languages, etc.) and relevant soft skills.
-            Format the response as a simple comma-separated list of skills, without any additional text or formatting.
-
-            Resume text:
-            {text}
-            """
-
-            response = await model.generate_content_async(prompt)
-            if not response or not response.text:
-                return []
-
-            # Split the response into individual skills and clean them
-            skills = [
-                skill.strip().lower()
-                for skill in response.text.split(',')
-                if skill.strip()
-            ]
-
-            return list(set(skills))  # Remove duplicates
-        except Exception as e:
-            print(f"Error extracting skills: {str(e)}")
-            return []
-
     async def upload_resume(self, file: UploadFile, email: str) -> dict:
         """Upload a resume file and store its metadata"""
+        # Any Gemini skill extraction below counts towards this user's usage
+        set_llm_user(email)
         try:
             # Validate file type
             if not file.filename.lower().endswith(('.pdf', '.doc', '.docx')):
@@ -118,11 +96,12 @@ class ResumeManagementService:
             # Extract text and generate embedding
             extracted_text = await self._extract_text_from_content(contents)
             
-            # Extract skills from text
+            # Extract skills locally; Gemini is only awaited when the taxonomy finds too little
             skills = []
+            skill_extraction = None
             if extracted_text:
-                skills = await self._extract_skills_from_text(extracted_text)
-                print(f"Extracted skills: {skills}")
+                skills, skill_extraction = await extract_resume_skills(extracted_text)
+                print(f"Extracted skills ({skill_extraction['method']}): {skills}")
 
             # Generate embedding if text was extracted
             embedding = None
@@ -140,11 +119,15 @@ class ResumeManagementService:
                 "content_type": file.content_type,
                 "file_size": file_size,
                 "extracted_text": extracted_text if extracted_text else None,
+                # Compact resume text used in every Gemini prompt for this version
+                "digest": build_resume_digest(extracted_text) if extracted_text else None,
                 "embedding": embedding if embedding else None,
-                "skills": skills
+                "skills": skills,
+                "skill_extraction": skill_extraction,
+                **skill_id_fields(resolve_skill_ids(skills))
             }
 
-            await self.db["resumes"].insert_one(resume_data)
+            result = await self.db["resumes"].insert_one(resume_data)
             await self.db["users"].update_one(
                 {"email": email},
                 {"$set": {
@@ -153,12 +136,22 @@ class ResumeManagementService:
                 }}
             )
 
+            if skill_extraction and skill_extraction["method"] == "local" and SKILL_ENRICHMENT_MODE == "background":
+                try:
+                    await submit_task(
+                        self.db, "skill_enrichment", {"resume_id": str(result.inserted_id)}, user_email=email
+                    )
+                except Exception as e:
+                    # The local skills are already saved; enrichment is best effort
+                    print(f"Failed to queue skill enrichment: {str(e)}")
+
             return {
                 "message": "Resume uploaded successfully",
                 "version": new_version,
                 "filename": unique_filename,
                 "has_embedding": embedding is not None,
                 "skills_extracted": len(skills),
+                "skills_method": skill_extraction["method"] if skill_extraction else None,
                 "upload_date": current_time.isoformat()
             }
 
@@ -289,6 +282,7 @@ class ResumeManagementService:
                         {
                             "$set": {
                                 "extracted_text": extracted_text,
+                                "digest": build_resume_digest(extracted_text),
                                 "embedding": embedding
                             }
                         }
@@ -0,0 +1,145 @@
+"""
+Local-first resume skill extraction.
+
+The skill taxonomy's compiled alias automaton (utils.skill_taxonomy.find_skill_ids) finds
+every curated skill in a resume in a single pass, so an upload no longer waits on Gemini
+for its skill list. Gemini is only awaited when local coverage is low: too few skills
+found, or most of the resume's own skills section falls outside the taxonomy. Otherwise
+a queued `skill_enrichment` task asks Gemini afterwards and merges in anything the
+taxonomy missed.
+"""
+
+import re
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from config import SKILL_EXTRACTION_MIN_LOCAL_SKILLS, SKILL_EXTRACTION_MIN_COVERAGE
+from utils.skill_taxonomy import find_skill_ids, resolve_skill, resolve_skill_ids, skill_id_fields, skill_names
+from .llm_gateway import get_llm_gateway
+from .resume_digest import clean_lines, split_sections
+from .task_queue import register_task_handler
+
+_SKILL_SEPARATORS = re.compile(r"[,;|•·]")
+
+
+def skills_section_items(text: str) -> List[str]:
+    """Individual entries of the resume's skills section, e.g. 'Languages: Python, Go' -> ['Python', 'Go']."""
+    items = []
+    for line in split_sections(clean_lines(text)).get("skills", []):
+        # Drop a category label such as "Languages:"
+        label, _, rest = line.lstrip("- ").partition(":")
+        for item in _SKILL_SEPARATORS.split(rest if rest else label):
+            item = item.strip(" .-")
+            if item and len(item) <= 40:
+                items.append(item)
+    return items
+
+
+def extract_skills_locally(text: str) -> Tuple[List[str], Optional[float]]:
+    """
+    Taxonomy skills mentioned in the resume, and the share of its skills section they
+    account for (None when the resume has no recognisable skills section).
+    """
+    skill_ids = find_skill_ids(text)
+    items = skills_section_items(text)
+    known = 0
+    for item in items:
+        # Short aliases like "Go" or "R" are skipped in free text but safe as a whole entry
+        skill_id = resolve_skill(item)
+        if skill_id is not None:
+            skill_ids.add(skill_id)
+        if skill_id is not None or find_skill_ids(item):
+            known += 1
+    skills = [name.lower() for name in skill_names(sorted(skill_ids))]
+    return skills, (known / len(items) if items else None)
+
+
+def needs_llm_extraction(skills: List[str], coverage: Optional[float]) -> bool:
+    if len(skills) < SKILL_EXTRACTION_MIN_LOCAL_SKILLS:
+        return True
+    return coverage is not None and coverage < SKILL_EXTRACTION_MIN_COVERAGE
+
+
+def merge_skills(*skill_lists: List[str]) -> List[str]:
+    """Concatenate skill lists, dropping case-insensitive duplicates and keeping first occurrences."""
+    merged, seen = [], set()
+    for skills in skill_lists:
+        for skill in skills:
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                merged.append(skill)
+    return merged
+
+
+async def extract_skills_with_llm(text: str) -> List[str]:
+    """Extract skills from resume text using Gemini AI."""
+    try:
+        prompt = f"""
+        As a skilled ATS system, analyze the following resume text and extract a comprehensive list of technical and professional skills.
+        Include both hard skills (technical skills, tools, programming languages, etc.) and relevant soft skills.
+        Format the response as a simple comma-separated list of skills, without any additional text or formatting.
+
+        Resume text:
+        {text}
+        """
+
+        text = await get_llm_gateway().generate_text(prompt, route="skill_extraction")
+
+        # Split the response into individual skills and clean them
+        skills = [
+            skill.strip().lower()
+            for skill in text.split(',')
+            if skill.strip()
+        ]
+
+        return list(dict.fromkeys(skills))  # Remove duplicates
+    except Exception as e:
+        print(f"Error extracting skills: {str(e)}")
+        return []
+
+
+async def extract_resume_skills(text: str) -> Tuple[List[str], dict]:
+    """
+    Skills for a newly uploaded resume and how they were found.
+
+    The second value is stored on the resume as `skill_extraction`; its `method` is
+    "local" when Gemini was not awaited, so the caller can queue enrichment.
+    """
+    skills, coverage = extract_skills_locally(text)
+    details = {"method": "local", "local_skills": len(skills), "coverage": coverage}
+    if needs_llm_extraction(skills, coverage):
+        skills = merge_skills(skills, await extract_skills_with_llm(text))
+        details["method"] = "local+llm"
+    return skills, details
+
+
+async def _skill_enrichment_task(db, payload: dict) -> dict:
+    """Merge Gemini-extracted skills into a resume whose skills were found locally."""
+    resume = await db.resumes.find_one({"_id": ObjectId(payload["resume_id"])})
+    if not resume or not resume.get("extracted_text"):
+        return {"skills_added": 0}
+    # An empty list means Gemini failed; raise so the queue retries it
+    llm_skills = await extract_skills_with_llm(resume["extracted_text"])
+    if not llm_skills:
+        raise Exception("No skills returned by Gemini")
+
+    skills = merge_skills(resume.get("skills", []), llm_skills)
+    added = len(skills) - len(resume.get("skills", []))
+    await db.resumes.update_one(
+        {"_id": resume["_id"]},
+        {"$set": {
+            "skills": skills,
+            **skill_id_fields(resolve_skill_ids(skills)),
+            "skill_extraction.method": "local+llm"
+        }}
+    )
+    # Only the latest version's skills are the user's profile skills
+    latest = await db.resumes.find_one(
+        {"user_email": resume["user_email"]},
+        sort=[("version", -1)],
+        projection={"_id": 1}
+    )
+    if latest and latest["_id"] == resume["_id"]:
+        await db.users.update_one({"email": resume["user_email"]}, {"$set": {"skills": skills}})
+    return {"skills_added": added}
+
+register_task_handler("skill_enrichment", _skill_enrichment_task)
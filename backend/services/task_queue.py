@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import (
+    TASK_WORKERS,
+    TASK_LEASE_S,
+    TASK_MAX_ATTEMPTS,
+    TASK_POLL_INTERVAL_S
+)
+from .llm_usage import set_llm_user
+
+# kind -> async handler(db, payload) returning the task result
+TaskHandler = Callable[[object, dict], Awaitable[dict]]
+_handlers: Dict[str, TaskHandler] = {}
+
+
+def register_task_handler(kind: str, handler: TaskHandler) -> None:
+    _handlers[kind] = handler
+
+
+def task_dedupe_key(kind: str, payload: dict) -> str:
+    return hashlib.sha256(json.dumps({"kind": kind, "payload": payload}, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def task_view(task: dict) -> dict:
+    """Public representation of a task document."""
+    return {
+        "task_id": task["_id"],
+        "kind": task["kind"],
+        "status": task["status"],
+        "attempts": task.get("attempts", 0),
+        "result": task.get("result"),
+        "error": task.get("error"),
+        "created_at": task.get("created_at"),
+        "updated_at": task.get("updated_at"),
+        "finished_at": task.get("finished_at")
+    }
+
+
+async def submit_task(db, kind: str, payload: dict, user_email: Optional[str] = None) -> dict:
+    """
+    Queue a task and return its document.
+
+    A task whose kind and payload match one that is still queued or running is not queued
+    again; the existing task is returned instead. Uniqueness is enforced by a partial unique
+    index on dedupe_key over active tasks (see config.ensure_indexes).
+    """
+    if kind not in _handlers:
+        raise ValueError(f"Unknown task kind: {kind}")
+    key = task_dedupe_key(kind, payload)
+    now = datetime.now(timezone.utc)
+    task = {
+        "_id": uuid.uuid4().hex,
+        "kind": kind,
+        "payload": payload,
+        "user_email": user_email,
+        "dedupe_key": key,
+        "active": True,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": TASK_MAX_ATTEMPTS,
+        "available_at": now,
+        "created_at": now,
+        "updated_at": now
+    }
+    try:
+        await db.tasks.insert_one(task)
+    except DuplicateKeyError:
+        existing = await db.tasks.find_one({"dedupe_key": key, "active": True})
+        if existing:
+            return existing
+        # The duplicate finished between the insert and the lookup; queue a fresh task
+        await db.tasks.insert_one(task)
+    get_task_worker_pool().wake()
+    return task
+
+
+async def get_task(db, task_id: str) -> Optional[dict]:
+    return await db.tasks.find_one({"_id": task_id}, projection={"payload": 0})
+
+
+class TaskWorkerPool:
+    """
+    Bounded pool of in-process workers draining the `tasks` collection.
+
+    Workers claim a task by atomically setting a lease (lease_expires_at, worker_id) and keep
+    extending it while the handler runs. A task whose worker died is claimed again once its
+    lease lapses. Failures are retried with backoff until max_attempts; 4xx HTTPExceptions
+    from a handler (missing job, resume, ...) fail the task immediately.
+    """
+
+    def __init__(self, workers: int = TASK_WORKERS, lease_s: float = TASK_LEASE_S,
+                 poll_interval_s: float = TASK_POLL_INTERVAL_S):
+        self.workers = workers
+        self.lease_s = lease_s
+        self.poll_interval_s = poll_interval_s
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self.db = None
+
+    def wake(self):
+        """Let idle workers in this process pick up a just-submitted task without waiting for a poll."""
+        self._wakeup.set()
+
+    async def start(self, db):
+        if self._tasks:
+            return
+        self.db = db
+        self._tasks = [asyncio.create_task(self._run(number)) for number in range(self.workers)]
+        print(f"Started {self.workers} task workers ({self.worker_id})")
+
+    async def stop(self):
+        # Running tasks are not marked failed; their leases lapse and another worker retries them
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self, worker_id: str) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self.db.tasks.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued", "available_at": {"$lte": now}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_s),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _extend_lease(self, task: dict):
+        while True:
+            await asyncio.sleep(self.lease_s / 3)
+            await self.db.tasks.update_one(
+                {"_id": task["_id"], "status": "running", "worker_id": task["worker_id"]},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease_s)}}
+            )
+
+    async def _finish(self, task: dict, update: dict):
+        # Only the lease holder may complete the task
+        now = datetime.now(timezone.utc)
+        await self.db.tasks.update_one(
+            {"_id": task["_id"], "status": "running", "worker_id": task["worker_id"]},
+            {"$set": {**update, "updated_at": now}, "$unset": {"lease_expires_at": ""}}
+        )
+
+    async def _process(self, task: dict):
+        now = datetime.now(timezone.utc)
+        if task["attempts"] > task["max_attempts"]:
+            await self._finish(task, {
+                "status": "failed", "error": "Task lease expired too many times",
+                "active": False, "finished_at": now
+            })
+            return
+
+        handler = _handlers.get(task["kind"])
+        # Attribute the task's Gemini calls to the user who queued it
+        set_llm_user(task.get("user_email"))
+        heartbeat = asyncio.create_task(self._extend_lease(task))
+        try:
+            if handler is None:
+                raise HTTPException(status_code=400, detail=f"Unknown task kind: {task['kind']}")
+            result = await handler(self.db, task["payload"])
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            permanent = isinstance(e, HTTPException) and e.status_code < 500
+            print(f"Task {task['_id']} ({task['kind']}) attempt {task['attempts']} failed: {error}")
+            if permanent or task["attempts"] >= task["max_attempts"]:
+                await self._finish(task, {
+                    "status": "failed", "error": error, "active": False,
+                    "finished_at": datetime.now(timezone.utc)
+                })
+            else:
+                delay = min(2 ** task["attempts"], 60) + random.uniform(0, 1)
+                await self._finish(task, {
+                    "status": "queued", "error": error,
+                    "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+                })
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self._finish(task, {
+            "status": "succeeded", "result": result, "error": None, "active": False,
+            "finished_at": datetime.now(timezone.utc)
+        })
+
+    async def _run(self, number: int):
+        while True:
+            # Clear before claiming so a task submitted during the claim still wakes this worker
+            self._wakeup.clear()
+            try:
+                task = await self._claim(f"{self.worker_id}:{number}")
+            except Exception as e:
+                print(f"Task worker {number} failed to claim a task: {str(e)}")
+                task = None
+            if task is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._process(task)
+            except Exception as e:
+                # Lease lapses and the task is retried elsewhere
+                print(f"Task worker {number} failed while processing {task['_id']}: {str(e)}")
+
+
+_pool = None
+
+
+def get_task_worker_pool() -> TaskWorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = TaskWorkerPool()
+    return _pool
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Import backend modules (config, services, utils) the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config refuses to import without these; tests never connect to Mongo or call Gemini
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/jobassist_test")
+os.environ.setdefault("LLM_BACKEND", "fake")
@@ -0,0 +1,46 @@
+import asyncio
+from services import llm_usage
+from services.llm_usage import LLMUsageTracker, llm_budget_status
+
+
+class _EmptyCursor:
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class _FakeCollection:
+    def find(self, *args, **kwargs):
+        return _EmptyCursor()
+
+
+class _FakeDatabase:
+    llm_usage = _FakeCollection()
+
+
+def test_structured_analysis_usage_counts_toward_resume_analysis_budget(monkeypatch):
+    tracker = LLMUsageTracker()
+    monkeypatch.setattr(llm_usage, "_tracker", tracker)
+    monkeypatch.setattr(llm_usage, "LLM_USER_DAILY_TOKEN_BUDGET", 0)
+    monkeypatch.setattr(llm_usage, "LLM_ENDPOINT_DAILY_TOKEN_BUDGETS", {"resume_analysis": 1000})
+
+    tracker.record("resume_analysis_structured", 700, 400, 0, 0.0, 10.0, user="jane@example.com")
+    status = asyncio.run(llm_budget_status(_FakeDatabase(), "jane@example.com", "resume_analysis"))
+
+    assert status["endpoint_tokens_used"] == 1100
+    assert status["exceeded"]
+
+
+def test_other_routes_do_not_count_toward_resume_analysis_budget(monkeypatch):
+    tracker = LLMUsageTracker()
+    monkeypatch.setattr(llm_usage, "_tracker", tracker)
+    monkeypatch.setattr(llm_usage, "LLM_USER_DAILY_TOKEN_BUDGET", 0)
+    monkeypatch.setattr(llm_usage, "LLM_ENDPOINT_DAILY_TOKEN_BUDGETS", {"resume_analysis": 1000})
+
+    tracker.record("cover_letter", 700, 400, 0, 0.0, 10.0, user="jane@example.com")
+    status = asyncio.run(llm_budget_status(_FakeDatabase(), "jane@example.com", "resume_analysis"))
+
+    assert status["endpoint_tokens_used"] == 0
+    assert status["exceeded"] is None
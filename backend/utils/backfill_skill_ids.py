@@ -0,0 +1,65 @@
+import os
+import sys
+from pathlib import Path
+from pymongo import MongoClient
+from pymongo.operations import UpdateOne
+
+# Add the backend directory to Python path for imports
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.append(str(backend_dir))
+
+from data.skill_taxonomy import TAXONOMY_VERSION
+from utils.skill_taxonomy import job_skill_ids, resolve_skill_ids, skill_id_fields
+
+BATCH_SIZE = 500
+
+def backfill_collection(collection, to_skill_ids, projection: dict) -> int:
+    """Store canonical skill IDs on every document whose taxonomy version is stale."""
+    query = {"skill_taxonomy_version": {"$ne": TAXONOMY_VERSION}}
+    total = collection.count_documents(query)
+    print(f"{collection.name}: {total} documents to backfill")
+
+    updated = 0
+    batch = []
+    for document in collection.find(query, projection=projection):
+        batch.append(UpdateOne(
+            {"_id": document["_id"]},
+            {"$set": skill_id_fields(to_skill_ids(document))}
+        ))
+        if len(batch) >= BATCH_SIZE:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+            print(f"Progress: {updated}/{total} {collection.name} updated")
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+
+    print(f"Finished {collection.name}: {updated} documents updated")
+    return updated
+
+def backfill_skill_ids():
+    """Resolve skill IDs for all jobs and resumes written before the current taxonomy version."""
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        print("Error: MONGO_URI environment variable is not set")
+        return
+
+    client = MongoClient(mongo_uri)
+    try:
+        db = client['jobsearch']
+        backfill_collection(
+            db.jobs,
+            job_skill_ids,
+            {"requirements": 1, "description": 1, "summary": 1}
+        )
+        backfill_collection(
+            db.resumes,
+            lambda resume: resolve_skill_ids(resume.get("skills") or []),
+            {"skills": 1}
+        )
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    print(f"Backfilling canonical skill IDs (taxonomy version {TAXONOMY_VERSION})...")
+    backfill_skill_ids()
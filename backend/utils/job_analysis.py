@@ -1,15 +1,36 @@
-from config import model
+from config import EXPLANATION_CONCURRENCY, EXPLANATION_TIMEOUT_S
+from services.llm_gateway import get_llm_gateway, route_generation_config
+from services.context_cache import resume_prompt_text
+from models.enhancement_model import ResumeEnhancement, ENHANCEMENT_SECTIONS, enhancement_response_schema
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
 import re
 
+# Bump whenever a prompt changes so cached responses are regenerated
+MATCH_ANALYSIS_PROMPT_VERSION = "v3"  # v2: resume digest instead of raw text; v3: no match score
+COVER_LETTER_PROMPT_VERSION = "v1"
+ENHANCE_RESUME_PROMPT_VERSION = "v2"  # v2: JSON mode with a response schema
+
 async def generate_job_match_analysis(
     job_title: str,
     job_description: str,
     job_requirements: list,
     resume_text: str,
-    match_score: float,
-    matching_skills: list
+    matching_skills: list,
+    timeout: Optional[float] = None,
+    context=None
 ) -> str:
-    """Generate a detailed job match analysis using Gemini AI."""
+    """
+    Generate a detailed job match analysis using Gemini AI.
+
+    The match score is left out of the prompt: explanations are cached per job and
+    resume version and served next to differently computed scores (re-ranked in vector
+    search, raw cosine in match-analysis), so the text must not quote a percentage.
+
+    With a cached resume `context` (services.context_cache) the prompt refers to the
+    cached resume instead of embedding resume_text.
+    """
     
     prompt = f"""
     As an AI career advisor, analyze the match between this job position and the candidate's resume.
@@ -24,9 +45,8 @@ async def generate_job_match_analysis(
     {', '.join(job_requirements)}
     
     Candidate's Resume Summary:
-    {resume_text}
+    {resume_prompt_text(context, resume_text)}
     
-    Quantitative Match: {match_score}%
     Matching Skills: {', '.join(matching_skills)}
 
     Please provide a personalized analysis in the following format:
@@ -39,18 +59,18 @@ async def generate_job_match_analysis(
     Format the response in clear paragraphs with natural transitions.
     Aim for 4-5 impactful sentences total.
     
+    Do not state a match percentage or score.
     IMPORTANT: Return only plain text without any styling, formatting, or special characters.
     """
     
     try:
         # Generate content with Gemini
-        response = await model.generate_content_async(prompt)
-        
-        if not response or not response.text:
-            raise Exception("No response received from Gemini")
+        text = await get_llm_gateway().generate_text(
+            prompt, route="match_explanation", timeout=timeout, context=context
+        )
             
         # Clean and format the response
-        analysis = response.text.strip()
+        analysis = text.strip()
         
         # Remove any CSS-like styling that might appear
         analysis = re.sub(r':[^}]+}', '', analysis)
@@ -67,20 +87,75 @@ async def generate_job_match_analysis(
         
         return analysis
         
+    except asyncio.TimeoutError:
+        raise
     except Exception as e:
         print(f"Error in Gemini analysis generation: {str(e)}")
         raise Exception(f"Failed to generate AI analysis: {str(e)}")
 
-async def generate_cover_letter(
+def build_fallback_match_summary(job_title: str, match_score: float, matching_skills: list) -> str:
+    """Build a plain-text match summary without calling Gemini, used when an explanation times out."""
+    summary = f"Your profile is a {match_score}% match for the {job_title or 'this'} role."
+    if matching_skills:
+        summary += f" Relevant skills include {', '.join(matching_skills[:5])}."
+    return summary + " A detailed AI analysis was not available in time; request it again for the full breakdown."
+
+async def generate_job_match_analyses(
+    match_requests: List[dict],
+    concurrency: int = EXPLANATION_CONCURRENCY,
+    timeout: float = EXPLANATION_TIMEOUT_S
+) -> List[dict]:
+    """
+    Generate match analyses for several jobs concurrently.
+
+    Each item in match_requests holds the keyword arguments of generate_job_match_analysis
+    plus the job's match_score, which is only used in fallback summaries.
+    At most `concurrency` Gemini calls of the batch run at once (within the gateway's
+    match_explanation limit) and each one gets `timeout` seconds, queueing included.
+    A call that times out or fails yields a fallback summary instead of failing the batch.
+    Returns one {"match_explanation", "explanation_status"} dict per request, in order.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def explain(request: dict) -> dict:
+        request = dict(request)
+        match_score = request.pop("match_score", 0)
+        async with semaphore:
+            try:
+                explanation = await generate_job_match_analysis(**request, timeout=timeout)
+                return {"match_explanation": explanation, "explanation_status": "complete"}
+            except asyncio.TimeoutError:
+                print(f"Match analysis for '{request.get('job_title')}' timed out after {timeout}s")
+                status = "timeout"
+            except Exception as e:
+                print(f"Match analysis for '{request.get('job_title')}' failed: {str(e)}")
+                status = "error"
+        return {
+            "match_explanation": build_fallback_match_summary(
+                request.get("job_title", ""),
+                match_score,
+                request.get("matching_skills", [])
+            ),
+            "explanation_status": status
+        }
+
+    return await asyncio.gather(*(explain(request) for request in match_requests))
+
+async def stream_generation(prompt: str, route: str, context=None, generation_config=None) -> AsyncIterator[str]:
+    """Yield text chunks from Gemini as they are generated."""
+    async for text in get_llm_gateway().stream(
+        prompt, route=route, generation_config=generation_config, context=context
+    ):
+        yield text
+
+def build_cover_letter_prompt(
     job_title: str,
     company: str,
     job_description: str,
     resume_text: str,
     user_name: str
 ) -> str:
-    """Generate a personalized cover letter using Gemini AI."""
-    
-    prompt = f"""
+    return f"""
     As an expert career advisor, write a compelling and personalized cover letter for the following job application.
     
     Job Details:
@@ -104,29 +179,49 @@ async def generate_cover_letter(
     
     Format the letter with proper spacing and structure.
     """
+
+async def generate_cover_letter(
+    job_title: str,
+    company: str,
+    job_description: str,
+    resume_text: str,
+    user_name: str,
+    context=None
+) -> str:
+    """Generate a personalized cover letter using Gemini AI."""
+    
+    prompt = build_cover_letter_prompt(
+        job_title, company, job_description, resume_prompt_text(context, resume_text), user_name
+    )
     
     try:
-        response = await model.generate_content_async(prompt)
-        
-        if not response or not response.text:
-            raise Exception("No response received from Gemini")
-            
-        cover_letter = response.text.strip()
+        text = await get_llm_gateway().generate_text(prompt, route="cover_letter", context=context)
+        cover_letter = text.strip()
         return cover_letter
         
     except Exception as e:
         print(f"Error in cover letter generation: {str(e)}")
         raise Exception(f"Failed to generate cover letter: {str(e)}")
 
-async def enhance_resume(
+def enhancement_generation_config(sections: List[str] = ENHANCEMENT_SECTIONS):
+    """JSON mode constrained to the given enhancement sections."""
+    return route_generation_config(
+        "enhance_resume",
+        response_mime_type="application/json",
+        response_schema=enhancement_response_schema(sections)
+    )
+
+def build_enhance_resume_prompt(
     resume_text: str,
     job_title: str,
     job_description: str,
-    job_requirements: list
-) -> dict:
-    """Enhance resume content to better match the job requirements using Gemini AI."""
-    
-    prompt = f"""
+    job_requirements: list,
+    sections: List[str] = ENHANCEMENT_SECTIONS
+) -> str:
+    requested = "\n    ".join(
+        f"- {name}: {ResumeEnhancement.model_fields[name].description}" for name in sections
+    )
+    return f"""
     As an expert resume writer, analyze the candidate's resume and provide specific suggestions to enhance it for the following job:
     
     Target Position: {job_title}
@@ -140,42 +235,100 @@ async def enhance_resume(
     Current Resume:
     {resume_text}
     
-    Please provide:
-    1. Suggested bullet points for relevant experience sections that better align with the job requirements
-    2. Skills to emphasize or add based on the job requirements
-    3. Specific achievements to highlight or reword
-    4. Keywords from the job description to incorporate
-    5. Any sections to add or modify
-    
-    Format the response as a structured JSON with the following keys:
-    - bullet_points: List of suggested bullet points
-    - skills: List of skills to emphasize or add
-    - achievements: List of achievements to highlight
-    - keywords: List of important keywords
-    - sections: List of sections to add/modify with explanations
+    Return a JSON object with the following keys, each a list of suggestions written as plain strings:
+    {requested}
     
     Keep suggestions specific and actionable.
     Focus on matching the job requirements while maintaining authenticity.
     """
+
+def parse_enhancement_suggestions(text: str) -> ResumeEnhancement:
+    """
+    Parse Gemini's enhancement JSON, repairing what can be repaired locally.
+
+    Tolerates markdown fences, surrounding prose and output cut off mid-object: every
+    section that decodes on its own is kept, and sections that are absent or unusable
+    come back empty (see ResumeEnhancement.missing_sections).
+    """
+    json_str = text.strip().replace("```json", "").replace("```", "").strip()
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        # Salvage section by section from malformed or truncated output
+        decoder = json.JSONDecoder()
+        data = {}
+        for name in ENHANCEMENT_SECTIONS:
+            match = re.search(rf'"{name}"\s*:\s*', json_str)
+            if not match:
+                continue
+            try:
+                data[name], _ = decoder.raw_decode(json_str, match.end())
+            except json.JSONDecodeError:
+                continue
+    return ResumeEnhancement.model_validate({name: data.get(name) for name in ENHANCEMENT_SECTIONS})
+
+async def complete_enhancement(
+    text: str,
+    resume_text: str,
+    job_title: str,
+    job_description: str,
+    job_requirements: list,
+    context=None
+) -> dict:
+    """
+    Suggestions from a JSON-mode enhancement response, re-requesting only the sections it
+    is missing instead of repeating the whole call.
+    """
+    suggestions = parse_enhancement_suggestions(text)
+    missing = suggestions.missing_sections()
+    if missing:
+        print(f"Re-requesting missing enhancement sections: {', '.join(missing)}")
+        prompt = build_enhance_resume_prompt(
+            resume_prompt_text(context, resume_text), job_title, job_description, job_requirements, missing
+        )
+        try:
+            text = await get_llm_gateway().generate_text(
+                prompt,
+                route="enhance_resume",
+                generation_config=enhancement_generation_config(missing),
+                context=context
+            )
+            retried = parse_enhancement_suggestions(text)
+            suggestions = suggestions.model_copy(update={name: getattr(retried, name) for name in missing})
+        except Exception as e:
+            if len(missing) == len(ENHANCEMENT_SECTIONS):
+                raise
+            # Partial suggestions are still useful; keep them rather than failing the request
+            print(f"Error re-requesting enhancement sections: {str(e)}")
+    if not any(getattr(suggestions, name) for name in ENHANCEMENT_SECTIONS):
+        raise Exception("No usable suggestions in the response")
+    return suggestions.model_dump()
+
+async def enhance_resume(
+    resume_text: str,
+    job_title: str,
+    job_description: str,
+    job_requirements: list,
+    context=None
+) -> dict:
+    """Enhance resume content to better match the job requirements using Gemini AI."""
+    
+    prompt = build_enhance_resume_prompt(
+        resume_prompt_text(context, resume_text), job_title, job_description, job_requirements
+    )
     
     try:
-        response = await model.generate_content_async(prompt)
-        
-        if not response or not response.text:
-            raise Exception("No response received from Gemini")
-            
-        # Clean and format the response
-        suggestions = response.text.strip()
-        
-        # Extract JSON content (assuming Gemini returns properly formatted JSON)
-        # Remove any markdown formatting if present
-        json_str = suggestions.replace("```json", "").replace("```", "").strip()
-        
-        # Parse the JSON string into a Python dictionary
-        import json
-        enhancement_suggestions = json.loads(json_str)
-        
-        return enhancement_suggestions
+        text = await get_llm_gateway().generate_text(
+            prompt,
+            route="enhance_resume",
+            generation_config=enhancement_generation_config(),
+            context=context
+        )
+        return await complete_enhancement(
+            text, resume_text, job_title, job_description, job_requirements, context=context
+        )
         
     except Exception as e:
         print(f"Error in resume enhancement: {str(e)}")
@@ -0,0 +1,150 @@
+"""Indexed skill matching between a resume and job requirement lists"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Iterable, Iterator, List, Tuple
+
+# Separator for the joined resume haystack; never appears inside a normalized skill
+_SEPARATOR = "\x00"
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase and trim a skill string."""
+    return skill.lower().strip()
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: finds every occurrence of a set of patterns in one pass over the text."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first pass to compute failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end_index, pattern_index) for every pattern occurrence in text."""
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_index in output[state]:
+                yield position, pattern_index
+
+
+class SkillMatcher:
+    """
+    Index a resume's skills once per request and match job requirement lists against it.
+
+    Matching follows the original substring semantics: a job skill matches exactly when
+    it equals a resume skill, and partially when it contains, or is contained in, a resume
+    skill that is not itself an exact match for that job. Resume skills are normalized a
+    single time; containment is answered by an Aho-Corasick scan of each job skill
+    (resume skill inside job skill) and a C-level search of one joined haystack
+    (job skill inside resume skill), instead of a Python loop over every pair.
+
+    The index only pays off on large lists: at typical sizes (tens of skills on each
+    side) a plain loop over the pairs is faster, so jobs with at most
+    SIMPLE_MATCH_MAX_PAIRS (job skill, resume skill) pairs are matched that way and
+    the index is only built once a job needs it.
+    """
+
+    SIMPLE_MATCH_MAX_PAIRS = 1500
+
+    def __init__(self, resume_skills: Iterable[str]):
+        normalized = {normalize_skill(skill) for skill in resume_skills if skill}
+        normalized.discard("")
+        self.resume_skills = sorted(normalized)
+        self.resume_skill_set = set(self.resume_skills)
+        self._automaton = None
+
+    def _build_index(self):
+        self._automaton = AhoCorasick(self.resume_skills)
+        self._haystack = _SEPARATOR.join(self.resume_skills)
+
+        # Start offset of each resume skill in the haystack, for mapping hits back to skills
+        self._offsets = []
+        offset = 0
+        for skill in self.resume_skills:
+            self._offsets.append(offset)
+            offset += len(skill) + 1
+
+    def _partially_matches(self, job_skill: str, job_skill_set: set) -> bool:
+        """True if job_skill contains, or is contained in, some non-exact resume skill (pairwise)."""
+        for resume_skill in self.resume_skills:
+            if (job_skill in resume_skill or resume_skill in job_skill) and resume_skill not in job_skill_set:
+                return True
+        return False
+
+    def _contains_resume_skill(self, job_skill: str, job_skill_set: set) -> bool:
+        """True if some non-exact resume skill occurs inside job_skill."""
+        for _, pattern_index in self._automaton.find_all(job_skill):
+            if self.resume_skills[pattern_index] not in job_skill_set:
+                return True
+        return False
+
+    def _contained_in_resume_skill(self, job_skill: str, job_skill_set: set) -> bool:
+        """True if job_skill occurs inside some non-exact resume skill."""
+        position = self._haystack.find(job_skill)
+        while position != -1:
+            skill_index = bisect_right(self._offsets, position) - 1
+            if self.resume_skills[skill_index] not in job_skill_set:
+                return True
+            # Skip to the next resume skill in the haystack
+            next_start = self._haystack.find(_SEPARATOR, position)
+            if next_start == -1:
+                return False
+            position = self._haystack.find(job_skill, next_start + 1)
+        return False
+
+    def match(self, job_skills: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Return (exact_matches, partial_matches) for a job's normalized requirement list."""
+        job_skills = [skill for skill in job_skills if skill]
+        job_skill_set = set(job_skills)
+        exact = job_skill_set & self.resume_skill_set
+
+        partial = []
+        seen = set()
+        indexed = len(job_skills) * len(self.resume_skills) > self.SIMPLE_MATCH_MAX_PAIRS
+        if indexed and self._automaton is None:
+            self._build_index()
+        for job_skill in job_skills:
+            if job_skill in exact or job_skill in seen:
+                continue
+            if indexed:
+                matched = self._contains_resume_skill(job_skill, job_skill_set) or \
+                    self._contained_in_resume_skill(job_skill, job_skill_set)
+            else:
+                matched = self._partially_matches(job_skill, job_skill_set)
+            if matched:
+                partial.append(job_skill)
+                seen.add(job_skill)
+
+        return list(exact), partial
@@ -0,0 +1,104 @@
+"""Resolve free-form skill strings to canonical taxonomy IDs"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+from data.skill_taxonomy import (
+    SKILLS,
+    TAXONOMY_VERSION,
+    FREE_TEXT_EXCLUDED_ALIASES,
+    MIN_FREE_TEXT_ALIAS_LENGTH
+)
+from utils.skill_matching import AhoCorasick
+
+_PARENTHETICAL = re.compile(r"\(([^)]*)\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_alias(text: str) -> str:
+    """Lowercase, collapse whitespace and trim surrounding punctuation."""
+    return _WHITESPACE.sub(" ", text.lower()).strip(" \t\n.,;:-*•")
+
+
+SKILL_NAMES: Dict[int, str] = {skill["id"]: skill["name"] for skill in SKILLS}
+
+ALIAS_TO_ID: Dict[str, int] = {}
+for _skill in SKILLS:
+    for _alias in [_skill["name"], *_skill["aliases"]]:
+        ALIAS_TO_ID[normalize_alias(_alias)] = _skill["id"]
+
+# Compiled once at import: scans free text for every unambiguous alias in a single pass
+_ALIASES = [
+    alias for alias in ALIAS_TO_ID
+    if len(alias) >= MIN_FREE_TEXT_ALIAS_LENGTH and alias not in FREE_TEXT_EXCLUDED_ALIASES
+]
+_ALIAS_AUTOMATON = AhoCorasick(_ALIASES)
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def find_skill_ids(text: str) -> Set[int]:
+    """Find every taxonomy skill mentioned in free text, respecting word boundaries."""
+    text = normalize_alias(text)
+    found = set()
+    for end, alias_index in _ALIAS_AUTOMATON.find_all(text):
+        alias = _ALIASES[alias_index]
+        start = end - len(alias) + 1
+        if _is_boundary(text, start - 1) and _is_boundary(text, end + 1):
+            found.add(ALIAS_TO_ID[alias])
+    return found
+
+
+def resolve_skill(skill: str) -> Optional[int]:
+    """Map a single skill string such as 'k8s' or 'Kubernetes (EKS)' to its canonical ID."""
+    normalized = normalize_alias(skill)
+    if not normalized:
+        return None
+    if normalized in ALIAS_TO_ID:
+        return ALIAS_TO_ID[normalized]
+    without_parenthetical = normalize_alias(_PARENTHETICAL.sub(" ", normalized))
+    if without_parenthetical in ALIAS_TO_ID:
+        return ALIAS_TO_ID[without_parenthetical]
+    for qualifier in _PARENTHETICAL.findall(normalized):
+        qualifier = normalize_alias(qualifier)
+        if qualifier in ALIAS_TO_ID:
+            return ALIAS_TO_ID[qualifier]
+    return None
+
+
+def resolve_skill_ids(skills: Iterable[str]) -> List[int]:
+    """
+    Map a list of skill strings to sorted, de-duplicated canonical IDs.
+
+    Strings that are not an alias themselves (e.g. '5+ years of Python and AWS')
+    are scanned for any aliases they mention.
+    """
+    ids = set()
+    for skill in skills:
+        if not skill:
+            continue
+        skill_id = resolve_skill(skill)
+        if skill_id is not None:
+            ids.add(skill_id)
+        else:
+            ids.update(find_skill_ids(skill))
+    return sorted(ids)
+
+
+def job_skill_ids(job: dict) -> List[int]:
+    """Canonical skill IDs for a job: from its requirements, or its description when none are listed."""
+    if job.get("requirements"):
+        return resolve_skill_ids(job["requirements"])
+    text = job.get("description") or job.get("summary") or ""
+    return sorted(find_skill_ids(text))
+
+
+def skill_id_fields(skill_ids: List[int]) -> dict:
+    """Fields stored on a resume or job document alongside its canonical skill IDs."""
+    return {"skill_ids": skill_ids, "skill_taxonomy_version": TAXONOMY_VERSION}
+
+
+def skill_names(skill_ids: Iterable[int]) -> List[str]:
+    """Canonical display names for a collection of skill IDs."""
+    return [SKILL_NAMES[skill_id] for skill_id in skill_ids if skill_id in SKILL_NAMES]
@@ -0,0 +1,19 @@
+"""Server-sent event helpers for streaming Gemini output to the browser"""
+
+import json
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data) -> str:
+    """Format one SSE frame; data is JSON-encoded so newlines in generated text survive."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of SSE frames, disabling proxy buffering so tokens arrive immediately."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
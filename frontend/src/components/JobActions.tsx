@@ -3,7 +3,7 @@ import { Button, Modal, CircularProgress, Alert, Box, Typography, Paper } from '
 import { Description, Edit } from '@mui/icons-material';
 import { useAuth } from '../context/AuthContext';
 import axios from 'axios';
-import { buildApiUrl } from '../config/api';
+import { buildApiUrl, postEventStream } from '../config/api';
 
 interface JobActionsProps {
   jobId: string;
@@ -22,12 +22,22 @@ const JobActions: React.FC<JobActionsProps> = ({ jobId, onApply }) => {
   const handleGenerateCoverLetter = async () => {
     setLoading('cover-letter');
     setError('');
+    setCoverLetter('');
     try {
-      const response = await axios.post(buildApiUrl(`api/jobs/${jobId}/cover-letter/${user?.email}`));
-      setCoverLetter(response.data.cover_letter);
-      setShowCoverLetter(true);
+      // Show the letter as it is generated instead of waiting for the full text
+      await postEventStream(`api/jobs/${jobId}/cover-letter/${user?.email}/stream`, (event, data) => {
+        if (event === 'token') {
+          setShowCoverLetter(true);
+          setCoverLetter(previous => previous + data.text);
+        } else if (event === 'done') {
+          setCoverLetter(data.cover_letter);
+        } else if (event === 'error') {
+          throw new Error(data.detail);
+        }
+      });
     } catch (err: any) {
-      setError(err.response?.data?.detail || 'Failed to generate cover letter');
+      setShowCoverLetter(false);
+      setError(err.message || 'Failed to generate cover letter');
     } finally {
       setLoading('');
     }
@@ -52,6 +52,7 @@ interface AIAnalysis {
   upskilling_suggestions: string;
   matching_roles: string;
   analysis_date: string;
+  cached?: boolean;
 }
 
 const ResumePage = () => {
@@ -524,6 +525,7 @@ const ResumePage = () => {
         </Typography>
         <Typography variant="caption" display="block" gutterBottom>
           Analysis performed on: {format(new Date(analysis.analysis_date), 'PPp')}
+          {analysis.cached && ' (unchanged resume, previous analysis reused)'}
         </Typography>
         
         <Accordion>
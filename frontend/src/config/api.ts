@@ -3,4 +3,37 @@ export const API_BASE_URL = 'https://jobassist-backend-46294121978.us-central1.r
 // Helper function to build API URLs
 export const buildApiUrl = (endpoint: string): string => {
     return `${API_BASE_URL}${endpoint.startsWith('/') ? endpoint : `/${endpoint}`}`;
-}; 
\ No newline at end of file
+}; 
+
+// POST to a server-sent-events endpoint and call onEvent for each event as it arrives
+export const postEventStream = async (
+    endpoint: string,
+    onEvent: (event: string, data: any) => void
+): Promise<void> => {
+    const response = await fetch(buildApiUrl(endpoint), { method: 'POST' });
+    if (!response.ok || !response.body) {
+        const error = await response.json().catch(() => ({}));
+        throw new Error(error.detail || `Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const event = frame.match(/^event: (.*)$/m)?.[1] || 'message';
+            const data = frame.match(/^data: (.*)$/m)?.[1];
+            if (data !== undefined) {
+                onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+};